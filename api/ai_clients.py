@@ -0,0 +1,104 @@
+"""
+Process-wide registry of AI provider clients
+
+Anthropic and OpenAI clients each own an HTTP connection pool, so building
+one per request pays for a new TLS handshake every time. Clients here are
+created once per (provider, API key fingerprint) and reused. Each user's
+resolved client is also cached, so warm requests skip the user_settings
+lookup; the settings router calls `ai_clients.invalidate()` when keys change.
+"""
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import UserSetting
+
+# Providers in order of preference, with the user setting holding each one's key
+PROVIDER_KEYS = (
+    ("anthropic", "anthropic_api_key"),
+    ("openai", "openai_api_key"),
+)
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short hash identifying an API key without keeping it as a dict key"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _create_client(provider: str, api_key: str):
+    """New SDK client, or None if the provider's package isn't installed"""
+    try:
+        if provider == "anthropic":
+            from anthropic import Anthropic
+            return Anthropic(api_key=api_key)
+        if provider == "openai":
+            from openai import OpenAI
+            return OpenAI(api_key=api_key)
+    except ImportError:
+        pass
+    return None
+
+
+class AIClientRegistry:
+    """Shared clients by (provider, key fingerprint) and the resolved client per user"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, str], object] = {}
+        self._resolved: Dict[int, Tuple[object, Optional[str]]] = {}
+        self._generations: Dict[int, int] = {}
+
+    def client(self, provider: str, api_key: str):
+        """Shared client for this provider and key, created on first use"""
+        cache_key = (provider, key_fingerprint(api_key))
+        with self._lock:
+            client = self._clients.get(cache_key)
+            if client is None:
+                client = _create_client(provider, api_key)
+                if client is not None:
+                    self._clients[cache_key] = client
+        return client
+
+    def get(self, db: Session, user_id: int) -> Tuple[object, Optional[str]]:
+        """(client, provider) for the user's configured key, or (None, None)"""
+        with self._lock:
+            resolved = self._resolved.get(user_id)
+            generation = self._generations.get(user_id, 0)
+        if resolved:
+            return resolved
+
+        resolved = self._resolve(db, user_id)
+        with self._lock:
+            # A settings change during the lookup wins; don't store a stale client
+            if self._generations.get(user_id, 0) == generation:
+                self._resolved[user_id] = resolved
+        return resolved
+
+    def invalidate(self, user_id: int):
+        """Forget the user's resolved client after their API keys change"""
+        with self._lock:
+            self._resolved.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def _resolve(self, db: Session, user_id: int) -> Tuple[object, Optional[str]]:
+        settings = get_settings()
+        user_keys = dict(db.query(UserSetting.setting_key, UserSetting.setting_value).filter(
+            UserSetting.user_id == user_id,
+            UserSetting.setting_key.in_([setting for _, setting in PROVIDER_KEYS])
+        ).all())
+
+        for provider, setting in PROVIDER_KEYS:
+            # A stored user setting overrides the environment, even when empty
+            api_key = user_keys[setting] if setting in user_keys else getattr(settings, setting)
+            if api_key:
+                client = self.client(provider, api_key)
+                if client is not None:
+                    return client, provider
+
+        return None, None
+
+
+ai_clients = AIClientRegistry()
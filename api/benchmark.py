@@ -0,0 +1,644 @@
+"""
+Benchmarks for the Job Search API
+
+Runs router functions directly against a throwaway SQLite database (or the
+database in BENCH_DATABASE_URL) so results are reproducible.
+
+Usage:
+    python -m api.benchmark batch --jobs 10000
+    python -m api.benchmark list --jobs 100000 --page 1000
+    python -m api.benchmark search --jobs 1000000 --query "kubernetes terraform"
+    python -m api.benchmark stream --tokens 300 --latency 0.02
+    python -m api.benchmark import --entries 50000
+    python -m api.benchmark import-stream --entries 500000
+    python -m api.benchmark load --clients 200 --query-delay 0.02
+    python -m api.benchmark etag --jobs 100000
+    python -m api.benchmark serialize --jobs 10000 --per-page 100
+    python -m api.benchmark dedup --jobs 10000
+"""
+import os
+import sys
+import time
+import random
+import socket
+import subprocess
+import json
+import argparse
+import tempfile
+import tracemalloc
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import orjson
+from sqlalchemy.orm import joinedload
+
+# Point the API at the benchmark database before any api module creates its engine
+_tmpdir = tempfile.mkdtemp(prefix="job_api_bench_")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{_tmpdir}/bench.db")
+
+from .database import SessionLocal, engine, Base, init_db  # noqa: E402
+from .models import Job, Company, JobApplication, ExcludedJob  # noqa: E402
+from .migration import import_entries  # noqa: E402
+from .routers.jobs import (  # noqa: E402
+    create_job, create_jobs_batch, list_jobs, encode_cursor, serialize_job_rows,
+    LIST_ORDER, LIST_JOB_COLUMNS, LIST_COMPANY_COLUMNS, LIST_COMPANY_LABELS,
+)
+from .schemas.job import JobCreate, JobResponse, JobListResponse  # noqa: E402
+
+
+# Words used to build varied job descriptions
+VOCABULARY = (
+    "kubernetes terraform aws azure gcp python golang java react postgres kafka spark airflow "
+    "platform infrastructure reliability security observability prometheus grafana datadog "
+    "engineer architect manager lead senior staff principal director remote hybrid onsite "
+    "team build scale design operate migrate automate mentor deliver customers product data"
+).split()
+
+
+def synthetic_jobs(count: int, prefix: str = "job") -> list:
+    """JobCreate payloads spread over a few hundred companies"""
+    rng = random.Random(prefix)
+    return [JobCreate(
+        external_id=f"{prefix}-{i}",
+        title=f"Senior Platform Engineer {i}",
+        location="Remote",
+        description=" ".join(rng.choices(VOCABULARY, k=60)),
+        url=f"https://example.com/jobs/{i}",
+        source="bench",
+        match_score=float(i % 100),
+        company_name=f"Company {i % 300}",
+    ) for i in range(count)]
+
+
+def reset_db():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS jobs_fts")
+    init_db()
+
+
+def bench_batch(args):
+    """Per-item create_job loop vs bulk upsert for POST /api/jobs/batch"""
+    reset_db()
+    payload = synthetic_jobs(args.legacy_jobs, prefix="legacy")
+    db = SessionLocal()
+    started = time.perf_counter()
+    for job_data in payload:
+        create_job(job_data, db)
+    legacy = time.perf_counter() - started
+    db.close()
+    print(f"create_job loop, {args.legacy_jobs} jobs: {legacy:.2f}s "
+          f"(~{legacy / args.legacy_jobs * args.jobs:.1f}s extrapolated to {args.jobs})")
+
+    payload = synthetic_jobs(args.jobs)
+    for label in ("insert", "update"):
+        db = SessionLocal()
+        started = time.perf_counter()
+        results = create_jobs_batch(payload, db)
+        elapsed = time.perf_counter() - started
+        db.close()
+        assert len(results) == args.jobs
+        print(f"bulk upsert ({label}), {args.jobs} jobs: {elapsed:.2f}s")
+
+
+def seed_jobs(count: int):
+    db = SessionLocal()
+    for start in range(0, count, 10_000):
+        create_jobs_batch(synthetic_jobs(min(10_000, count - start), prefix=f"seed{start}"), db)
+    db.close()
+
+
+def _time_list(repeat: int = 5, **params) -> float:
+    """Best-of-`repeat` latency of list_jobs in milliseconds"""
+    params = {"page": 1, "per_page": 50, "cursor": None, "count": "none", "source": None,
+              "company": None, "search": None, "min_score": None,
+              "include_applied": False, "include_excluded": False, **params}
+    best = float("inf")
+    for _ in range(repeat):
+        db = SessionLocal()
+        started = time.perf_counter()
+        list_jobs(db=db, **params)
+        best = min(best, time.perf_counter() - started)
+        db.close()
+    return best * 1000
+
+
+def bench_list(args):
+    """Offset vs cursor pagination depth, and the cost of the total count"""
+    reset_db()
+    seed_jobs(args.jobs)
+
+    # Cursor pointing just before the requested page
+    db = SessionLocal()
+    before = db.query(Job).order_by(*LIST_ORDER).offset((args.page - 1) * 50 - 1).first()
+    cursor = encode_cursor(before)
+    db.close()
+
+    print(f"page 1:               {_time_list():.1f} ms")
+    print(f"page {args.page} (offset):   {_time_list(page=args.page):.1f} ms")
+    print(f"page {args.page} (cursor):   {_time_list(cursor=cursor):.1f} ms")
+    print(f"page 1 + exact count: {_time_list(count='exact'):.1f} ms")
+
+
+def bench_search(args):
+    """Full-text search latency for the first page of results"""
+    reset_db()
+    seed_jobs(args.jobs)
+    ms = _time_list(search=args.query, count="none")
+    print(f"search {args.query!r} over {args.jobs} jobs: {ms:.1f} ms")
+
+
+class FakeStreamingClient:
+    """Anthropic-shaped client that produces `tokens` chunks, one every `latency` seconds"""
+
+    def __init__(self, tokens: int, latency: float):
+        self.tokens = tokens
+        self.latency = latency
+        self.messages = self
+
+    def _chunks(self):
+        for i in range(self.tokens):
+            time.sleep(self.latency)
+            yield f"word{i} "
+
+    def create(self, **kwargs):
+        return SimpleNamespace(content=[SimpleNamespace(text="".join(self._chunks()))])
+
+    @contextmanager
+    def stream(self, **kwargs):
+        yield SimpleNamespace(text_stream=self._chunks())
+
+
+def serve_app(app):
+    """Run the API on a free local port in a background thread; returns (server, base_url)"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def bench_stream(args):
+    """Time to first byte and total time, buffered vs streamed generation"""
+    import requests
+    from .main import app
+    from .routers.documents import ai_client
+
+    reset_db()
+    seed_jobs(1)
+    db = SessionLocal()
+    job_id = db.query(Job.id).scalar()
+    db.close()
+
+    client = FakeStreamingClient(args.tokens, args.latency)
+    app.dependency_overrides[ai_client] = lambda: (client, "anthropic")
+    server, base_url = serve_app(app)
+
+    payload = {"job_id": job_id, "document_type": "cover_letter", "regenerate": True}
+    try:
+        for stream in (False, True):
+            started = time.perf_counter()
+            with requests.post(f"{base_url}/api/documents/cover-letter", params={"stream": stream},
+                               json=payload, stream=True) as response:
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size=None)
+                next(chunks)
+                first_byte = time.perf_counter() - started
+                for _ in chunks:
+                    pass
+            total = time.perf_counter() - started
+            label = "streamed" if stream else "buffered"
+            print(f"{label}: first byte {first_byte * 1000:.0f} ms, complete {total * 1000:.0f} ms")
+    finally:
+        server.should_exit = True
+        app.dependency_overrides.clear()
+
+
+def localstorage_entries(count: int, prefix: str = "ls") -> tuple:
+    """(applied_jobs, applied_jobs_data, excluded_jobs): 60% applied, 40% excluded"""
+    applied = [f"{prefix}-{i}" for i in range(count * 3 // 5)]
+    excluded = [f"{prefix}-x{i}" for i in range(count - len(applied))]
+    data = {external_id: {
+        "title": f"Platform Engineer {i}",
+        "company": f"Company {i % 500}",
+        "location": "Remote",
+        "url": f"https://example.com/{external_id}",
+        "appliedAt": "2025-01-15T10:30:00Z",
+    } for i, external_id in enumerate(applied)}
+    return applied, data, excluded
+
+
+def _legacy_import(db, user_id, applied_jobs, applied_jobs_data, excluded_jobs):
+    """The per-entry import this benchmark replaced (SELECTs + commit per row)"""
+    for job_id in applied_jobs:
+        job_data = applied_jobs_data.get(job_id, {})
+        company_id = None
+        if job_data.get("company"):
+            company = db.query(Company).filter(Company.name == job_data["company"]).first()
+            if not company:
+                company = Company(name=job_data["company"], logo_url=job_data.get("companyLogo"))
+                db.add(company)
+                db.commit()
+                db.refresh(company)
+            company_id = company.id
+        job = db.query(Job).filter(Job.external_id == job_id).first()
+        if not job:
+            job = Job(external_id=job_id, company_id=company_id, title=job_data.get("title", "Unknown"),
+                      location=job_data.get("location"), url=job_data.get("url"), source="imported")
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+        if not db.query(JobApplication).filter(JobApplication.user_id == user_id,
+                                               JobApplication.job_id == job.id).first():
+            db.add(JobApplication(user_id=user_id, job_id=job.id))
+    for job_id in excluded_jobs:
+        job = db.query(Job).filter(Job.external_id == job_id).first()
+        if not job:
+            job = Job(external_id=job_id, title="Unknown", source="imported")
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+        if not db.query(ExcludedJob).filter(ExcludedJob.user_id == user_id,
+                                            ExcludedJob.job_id == job.id).first():
+            db.add(ExcludedJob(user_id=user_id, job_id=job.id))
+    db.commit()
+
+
+def bench_import(args):
+    """Per-entry vs set-based POST /api/migration/import"""
+    reset_db()
+    db = SessionLocal()
+    started = time.perf_counter()
+    _legacy_import(db, 1, *localstorage_entries(args.legacy_entries, prefix="legacy"))
+    legacy = time.perf_counter() - started
+    db.close()
+    print(f"per-entry import, {args.legacy_entries} entries: {legacy:.2f}s "
+          f"(~{legacy / args.legacy_entries * args.entries:.0f}s extrapolated to {args.entries})")
+
+    # Half the jobs already exist, as when localStorage mirrors jobs the API has fetched
+    entries = localstorage_entries(args.entries)
+    seed = [JobCreate(external_id=external_id, title="Existing job", source="imported")
+            for external_id in entries[0][::2]]
+    db = SessionLocal()
+    create_jobs_batch(seed, db)
+    db.close()
+
+    for label in ("first run", "re-import"):
+        db = SessionLocal()
+        started = time.perf_counter()
+        imported = import_entries(db, 1, *entries)
+        db.commit()
+        elapsed = time.perf_counter() - started
+        db.close()
+        print(f"set-based import ({label}), {args.entries} entries: {elapsed:.2f}s {imported}")
+
+
+def ndjson_export(count: int, prefix: str = "nd", fail_after: int = None):
+    """Yield a localStorage export as NDJSON lines (bytes), optionally dropping the connection.
+
+    Generated lazily, in the same shape as localstorage_entries, so the client
+    side of the benchmark uses constant memory.
+    """
+    applied = count * 3 // 5
+    for i in range(count):
+        if fail_after and i >= fail_after:
+            raise ConnectionAbortedError("simulated client failure")
+        if i < applied:
+            record = {"type": "applied", "id": f"{prefix}-{i}", "data": {
+                "title": f"Platform Engineer {i}",
+                "company": f"Company {i % 500}",
+                "location": "Remote",
+                "url": f"https://example.com/{prefix}-{i}",
+                "appliedAt": "2025-01-15T10:30:00Z",
+            }}
+        else:
+            record = {"type": "excluded", "id": f"{prefix}-x{i - applied}"}
+        yield json.dumps(record).encode() + b"\n"
+
+
+def bench_import_stream(args):
+    """Peak memory of JSON vs NDJSON streaming import, and resuming an interrupted stream"""
+    import requests
+    from .main import app
+
+    reset_db()
+    server, base_url = serve_app(app)
+    try:
+        applied, data, excluded = localstorage_entries(args.json_entries, prefix="json")
+        body = json.dumps({"applied_jobs": applied, "applied_jobs_data": data, "excluded_jobs": excluded})
+        del applied, data, excluded
+        tracemalloc.start()
+        started = time.perf_counter()
+        requests.post(f"{base_url}/api/migration/import", data=body,
+                      headers={"Content-Type": "application/json"}).raise_for_status()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"JSON import, {args.json_entries} entries ({len(body) / 1e6:.0f} MB): "
+              f"{elapsed:.1f}s, peak {peak / 1e6:.0f} MB")
+        del body
+
+        # Interrupted upload, then the same stream again under the same import_id
+        url = f"{base_url}/api/migration/import/stream"
+        params = {"import_id": "bench", "batch_size": args.batch_size}
+        try:
+            requests.post(url, params=params, data=ndjson_export(args.entries, fail_after=args.entries // 3))
+        except (requests.RequestException, ConnectionAbortedError):
+            pass
+        time.sleep(0.5)
+        progress = requests.get(f"{base_url}/api/migration/import/bench").json()
+        print(f"interrupted stream: {progress['lines_committed']} lines committed before the failure")
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = requests.post(url, params=params, data=ndjson_export(args.entries))
+        response.raise_for_status()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"resumed NDJSON stream, {args.entries} entries: {elapsed:.1f}s, peak {peak / 1e6:.0f} MB")
+        print(f"final progress: {response.json()}")
+    finally:
+        server.should_exit = True
+
+
+def create_load_app():
+    """App for `load` (run by uvicorn --factory): the same job lookup, sync and async.
+
+    /load/sync uses get_db in FastAPI's threadpool, like the current routers;
+    /load/async uses get_async_db on the event loop. BENCH_QUERY_DELAY adds a
+    server-side wait to every lookup, standing in for a remote database.
+    """
+    from fastapi import FastAPI, Depends
+    from sqlalchemy import event, select, text
+    from sqlalchemy.orm import Session, selectinload
+    from .config import get_settings
+    from .database import get_db, get_async_db, get_async_sessionmaker, PoolConcurrencyLimit
+    from .schemas.job import JobResponse
+
+    delay = float(os.getenv("BENCH_QUERY_DELAY", "0"))
+
+    def add_delay_function(dbapi_connection, connection_record):
+        dbapi_connection.create_function("bench_delay", 0, lambda: time.sleep(delay))
+
+    event.listen(engine, "connect", add_delay_function)
+    event.listen(get_async_sessionmaker().kw["bind"].sync_engine, "connect", add_delay_function)
+    lookup = select(Job).options(selectinload(Job.company)).where(Job.id == 1)
+    wait = text("SELECT bench_delay()")
+
+    app = FastAPI()
+    settings = get_settings()
+    app.add_middleware(PoolConcurrencyLimit, limit=settings.db_pool_size + settings.db_max_overflow)
+
+    @app.get("/load/sync", response_model=JobResponse)
+    def sync_job(db: Session = Depends(get_db)):
+        db.execute(wait)
+        return db.execute(lookup).scalar_one()
+
+    @app.get("/load/async", response_model=JobResponse)
+    async def async_job(db=Depends(get_async_db)):
+        await db.execute(wait)
+        return (await db.execute(lookup)).scalar_one()
+
+    return app
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench_load(args):
+    """p50/p99 latency of sync (threadpool) vs async routes under concurrent clients"""
+    import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    reset_db()
+    seed_jobs(1)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {**os.environ, "BENCH_DATABASE_URL": os.environ["DATABASE_URL"],
+           "BENCH_QUERY_DELAY": str(args.query_delay)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.benchmark:create_load_app", "--factory",
+         "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(f"{base_url}/load/sync", timeout=1)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+
+        def client(path: str) -> list:
+            latencies = []
+            with requests.Session() as session:
+                for _ in range(args.requests):
+                    started = time.perf_counter()
+                    session.get(f"{base_url}{path}").raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+            return latencies
+
+        for path in ("/load/sync", "/load/async"):
+            client(path)  # warm up the pools
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                latencies = [ms for result in pool.map(client, [path] * args.clients) for ms in result]
+            elapsed = time.perf_counter() - started
+            print(f"{path:<12} {len(latencies) / elapsed:7.0f} req/s  "
+                  f"p50 {_percentile(latencies, 50) * 1000:6.1f} ms  p99 {_percentile(latencies, 99) * 1000:6.1f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def bench_etag(args):
+    """Polling GET /api/jobs: full render vs cached body vs If-None-Match 304"""
+    from fastapi.testclient import TestClient
+    from .main import app
+    from .response_cache import table_versions
+
+    reset_db()
+    seed_jobs(args.jobs)
+    url = "/api/jobs?per_page=50&count=exact&min_score=20"
+
+    def best_of(headers=None, invalidate=False, repeat=10):
+        best = float("inf")
+        for _ in range(repeat):
+            if invalidate:
+                table_versions.bump("jobs")
+            started = time.perf_counter()
+            response = client.get(url, headers=headers or {})
+            best = min(best, time.perf_counter() - started)
+        return best * 1000, response
+
+    with TestClient(app) as client:
+        uncached, response = best_of(invalidate=True)
+        cached, _ = best_of()
+        not_modified, response_304 = best_of({"If-None-Match": response.headers["etag"]})
+    assert response_304.status_code == 304
+    print(f"{args.jobs} jobs: uncached {uncached:.1f} ms, cached 200 {cached:.1f} ms, "
+          f"304 {not_modified:.1f} ms ({len(response.content) / 1000:.0f} KB body)")
+
+
+def _legacy_list_page(db, per_page: int) -> bytes:
+    """First page of GET /api/jobs the ORM way: Job entities, lazy companies, Pydantic validation"""
+    jobs = db.query(Job).filter(Job.is_active == True).order_by(*LIST_ORDER).limit(per_page + 1).all()  # noqa: E712
+    jobs = jobs[:per_page]
+    response = JobListResponse(
+        jobs=[JobResponse.model_validate(job) for job in jobs],
+        page=1,
+        per_page=per_page,
+        next_cursor=encode_cursor(jobs[-1]),
+    )
+    return response.model_dump_json().encode()
+
+
+def bench_serialize(args):
+    """ORM entities + Pydantic vs column rows + orjson for a page of GET /api/jobs"""
+    reset_db()
+    seed_jobs(args.jobs)
+    params = {"page": 1, "per_page": args.per_page, "cursor": None, "count": "none", "source": None,
+              "company": None, "search": None, "min_score": None,
+              "include_applied": False, "include_excluded": False}
+
+    def best_of(render, repeat=20):
+        best = float("inf")
+        for _ in range(repeat):
+            db = SessionLocal()
+            started = time.perf_counter()
+            body = render(db)
+            best = min(best, time.perf_counter() - started)
+            db.close()
+        return best * 1000, body
+
+    legacy, legacy_body = best_of(lambda db: _legacy_list_page(db, args.per_page))
+    fast, fast_body = best_of(lambda db: list_jobs(db=db, **params).body)
+    assert json.loads(legacy_body) == json.loads(fast_body), "serialized pages differ"
+    print(f"{args.per_page} jobs per page: ORM + Pydantic {legacy:.1f} ms, "
+          f"rows + orjson {fast:.1f} ms ({legacy / fast:.1f}x, {len(fast_body) / 1000:.0f} KB)")
+
+    # Serialization alone, from already-fetched entities vs already-fetched rows
+    db = SessionLocal()
+    jobs = db.query(Job).options(joinedload(Job.company)).order_by(*LIST_ORDER).limit(args.per_page).all()
+    company_columns = [column.label(label) for column, label in zip(LIST_COMPANY_COLUMNS, LIST_COMPANY_LABELS)]
+    rows = db.query(*LIST_JOB_COLUMNS, *company_columns).outerjoin(Company, Job.company_id == Company.id)\
+        .order_by(*LIST_ORDER).limit(args.per_page).all()
+    db.close()
+    repeat = 200
+    started = time.perf_counter()
+    for _ in range(repeat):
+        JobListResponse(jobs=[JobResponse.model_validate(job) for job in jobs], page=1,
+                        per_page=args.per_page).model_dump_json()
+    pydantic = (time.perf_counter() - started) / repeat * 1000
+    started = time.perf_counter()
+    for _ in range(repeat):
+        orjson.dumps({"jobs": serialize_job_rows(rows, set(), set(), {}), "page": 1, "per_page": args.per_page},
+                     option=orjson.OPT_UTC_Z)
+    rows_orjson = (time.perf_counter() - started) / repeat * 1000
+    print(f"serialization only: Pydantic {pydantic:.2f} ms, rows + orjson {rows_orjson:.2f} ms "
+          f"({pydantic / rows_orjson:.1f}x)")
+
+
+def bench_dedup(args):
+    """POST /api/jobs/batch with the same postings re-listed by other sources"""
+    reset_db()
+    base = synthetic_jobs(args.jobs, prefix="dedup")
+    # Second source: new external ids, reformatted company/title/location, truncated description
+    relisted = [JobCreate(
+        external_id=f"other-{job.external_id}",
+        title=job.title.replace("Senior", "Sr."),
+        location="Remote (US)",
+        description=job.description[:300],
+        url=f"{job.url}?ref=other",
+        source="other",
+        company_name=f"{job.company_name}, Inc.",
+    ) for job in base]
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    create_jobs_batch(base, db)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    results = create_jobs_batch(relisted, db)
+    second = time.perf_counter() - started
+    rows = db.query(Job).count()
+    db.close()
+
+    collapsed = sum(result.source == "bench" for result in results)
+    print(f"{args.jobs} jobs: first batch {first:.2f}s, re-listed batch {second:.2f}s; "
+          f"{collapsed} of {args.jobs} re-listed items collapsed, {rows} rows in jobs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job Search API benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    batch = sub.add_parser("batch", help="Batch job upsert latency")
+    batch.add_argument("--jobs", type=int, default=10_000, help="Jobs per batch")
+    batch.add_argument("--legacy-jobs", type=int, default=1_000, help="Jobs for the per-item baseline")
+    batch.set_defaults(func=bench_batch)
+
+    listing = sub.add_parser("list", help="GET /api/jobs pagination depth")
+    listing.add_argument("--jobs", type=int, default=100_000, help="Jobs in the table")
+    listing.add_argument("--page", type=int, default=1_000, help="Deep page number to compare")
+    listing.set_defaults(func=bench_list)
+
+    search = sub.add_parser("search", help="Full-text search latency")
+    search.add_argument("--jobs", type=int, default=1_000_000, help="Jobs in the table")
+    search.add_argument("--query", default="kubernetes terraform", help="Search text")
+    search.set_defaults(func=bench_search)
+
+    stream = sub.add_parser("stream", help="Document generation time to first byte (fake provider)")
+    stream.add_argument("--tokens", type=int, default=300, help="Chunks the fake provider emits")
+    stream.add_argument("--latency", type=float, default=0.02, help="Seconds between chunks")
+    stream.set_defaults(func=bench_stream)
+
+    importing = sub.add_parser("import", help="localStorage migration import")
+    importing.add_argument("--entries", type=int, default=50_000, help="Applied + excluded ids")
+    importing.add_argument("--legacy-entries", type=int, default=1_000, help="Entries for the per-entry baseline")
+    importing.set_defaults(func=bench_import)
+
+    streaming = sub.add_parser("import-stream", help="Streaming NDJSON import memory and resume")
+    streaming.add_argument("--entries", type=int, default=500_000, help="Entries in the NDJSON stream")
+    streaming.add_argument("--json-entries", type=int, default=100_000, help="Entries for the JSON baseline")
+    streaming.add_argument("--batch-size", type=int, default=5000, help="Entries per transaction")
+    streaming.set_defaults(func=bench_import_stream)
+
+    load = sub.add_parser("load", help="Sync threadpool vs async session latency under load")
+    load.add_argument("--clients", type=int, default=200, help="Concurrent clients")
+    load.add_argument("--requests", type=int, default=20, help="Requests per client")
+    load.add_argument("--query-delay", type=float, default=0.02, help="Simulated database latency (s)")
+    load.set_defaults(func=bench_load)
+
+    etag = sub.add_parser("etag", help="GET /api/jobs response cache and 304s")
+    etag.add_argument("--jobs", type=int, default=100_000, help="Jobs in the table")
+    etag.set_defaults(func=bench_etag)
+
+    serialize = sub.add_parser("serialize", help="GET /api/jobs page serialization")
+    serialize.add_argument("--jobs", type=int, default=10_000, help="Jobs in the table")
+    serialize.add_argument("--per-page", type=int, default=100, help="Jobs per page")
+    serialize.set_defaults(func=bench_serialize)
+
+    dedup = sub.add_parser("dedup", help="Cross-source duplicates in POST /api/jobs/batch")
+    dedup.add_argument("--jobs", type=int, default=10_000, help="Jobs per batch")
+    dedup.set_defaults(func=bench_dedup)
+
+    args = parser.parse_args()
+    print(f"Database: {engine.url}", file=sys.stderr)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
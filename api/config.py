@@ -10,6 +10,23 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "postgresql://localhost:5432/job_search"
 
+    # Connection pool (per process) and per-statement limit in ms (0 = no limit, PostgreSQL only).
+    # DB-bound requests in flight are capped at pool size + overflow (see PoolConcurrencyLimit).
+    db_pool_size: int = 10
+    db_max_overflow: int = 30
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0
+
+    # Read replica for read-only endpoints (empty = use the primary), and how long after a
+    # write reads stay on the primary so they see it
+    read_database_url: str = ""
+    read_after_write_seconds: float = 5.0
+
+    # Async engine for routers using get_async_db; derived from database_url when empty
+    async_database_url: str = ""
+
     # AI APIs
     openai_api_key: str = ""
     anthropic_api_key: str = ""
@@ -18,6 +35,18 @@ class Settings(BaseSettings):
     adzuna_app_id: str = ""
     adzuna_app_key: str = ""
 
+    # Background document generation
+    generation_workers: int = 4
+    generation_queue_size: int = 100
+
+    # Generated document cache: in-memory entries and their lifetime in seconds
+    generation_cache_size: int = 1024
+    generation_cache_ttl: int = 86400
+
+    # GET /api/jobs response cache: entries kept and their lifetime in seconds
+    response_cache_size: int = 128
+    response_cache_ttl: int = 30
+
     # CORS
     allowed_origins: str = "http://localhost:8000,https://www.sudhakarchundu.org"
 
@@ -1,23 +1,132 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import logging
+import time
+from functools import lru_cache
+from typing import Tuple
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from .config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# Handle Railway's DATABASE_URL format (may use postgres:// instead of postgresql://)
-database_url = settings.database_url
-if database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(database_url)
+def normalize_url(url: str) -> str:
+    """Handle Railway's DATABASE_URL format (may use postgres:// instead of postgresql://)"""
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+database_url = normalize_url(settings.database_url)
+
+# Drivers used for the async engine when ASYNC_DATABASE_URL isn't set
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def engine_options(url: str) -> dict:
+    """create_engine / create_async_engine keyword arguments from Settings"""
+    url = make_url(url)
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+
+    # In-memory SQLite uses a single-connection pool that takes no sizing options
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+
+    if url.get_backend_name() == "postgresql" and settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+engine = create_engine(database_url, **engine_options(database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only endpoints use the replica when one is configured
+if settings.read_database_url:
+    read_database_url = normalize_url(settings.read_database_url)
+    read_engine = create_engine(read_database_url, **engine_options(read_database_url))
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+# monotonic() of the last commit on the primary, for read-after-write stickiness (per process)
+_last_write = 0.0
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session):
+    global _last_write
+    _last_write = time.monotonic()
+
 Base = declarative_base()
 
 
+class PoolConcurrencyLimit:
+    """ASGI middleware capping DB-bound requests in flight at the connection pool's capacity.
+
+    A sync route holds its connection across several threadpool hops (route,
+    response serialization, get_db cleanup). With more requests in flight than
+    connections, every thread can end up waiting on the pool while the requests
+    holding connections wait for a thread, until pool_timeout fails them all.
+    Excess requests wait here instead, on the event loop.
+
+    Only paths under `prefix` are limited, minus `exempt` (health checks, and
+    long-lived streams that open their own short sessions). A streamed response
+    (one started without a Content-Length) gives its slot back as soon as it
+    starts, so open streams never block other traffic.
+    """
+
+    def __init__(self, app, limit: int, prefix: str = "/", exempt: Tuple[str, ...] = ()):
+        self.app = app
+        self.limit = limit
+        self.prefix = prefix
+        self.exempt = frozenset(exempt)
+        self._slots = None
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not scope["path"].startswith(self.prefix)
+                or scope["path"] in self.exempt):
+            return await self.app(scope, receive, send)
+
+        if self._slots is None:
+            import asyncio
+            self._slots = asyncio.Semaphore(self.limit)
+        await self._slots.acquire()
+        held = True
+
+        def release():
+            nonlocal held
+            if held:
+                held = False
+                self._slots.release()
+
+        async def send_streaming_aware(message):
+            if message["type"] == "http.response.start" and not any(
+                name.lower() == b"content-length" for name, _ in message.get("headers", ())
+            ):
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_streaming_aware)
+        finally:
+            release()
+
+
 def get_db():
     """Dependency for getting database session"""
     db = SessionLocal()
@@ -27,10 +136,144 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """Dependency for read-only endpoints: a replica session, or the primary shortly after a write"""
+    recent_write = time.monotonic() - _last_write < settings.read_after_write_seconds
+    db = SessionLocal() if recent_write else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@lru_cache()
+def get_async_sessionmaker():
+    """AsyncSession factory, created on first use so the async driver stays optional"""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_url = settings.async_database_url
+    if not async_url:
+        url = make_url(database_url)
+        async_url = url.set(
+            drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}"
+        ).render_as_string(hide_password=False)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db():
+    """Dependency for getting an AsyncSession, for routers declared with `async def`"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def dialect_insert(db: Session, model):
+    """INSERT construct for the session's dialect, with ON CONFLICT support.
+
+    PostgreSQL and SQLite both provide `on_conflict_do_update` /
+    `on_conflict_do_nothing` with the same signature.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+# Columns added to existing tables after their first release, as (table, column).
+# create_all() skips tables that already exist, so init_db adds these (and their
+# indexes) to older databases; schema.sql has the matching ALTER TABLE statements.
+ADDED_COLUMNS = (
+    ("generated_documents", "cache_key"),
+    ("jobs", "dedup_key"),
+)
+
+
+def add_missing_columns(engine):
+    """ALTER TABLE ... ADD COLUMN for ADDED_COLUMNS missing from an existing database"""
+    inspector = inspect(engine)
+    for table_name, column_name in ADDED_COLUMNS:
+        if not inspector.has_table(table_name):
+            continue
+        if column_name in {column["name"] for column in inspector.get_columns(table_name)}:
+            continue
+        table = Base.metadata.tables[table_name]
+        column = table.c[column_name]
+        with engine.begin() as conn:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(engine.dialect)}"
+            )
+        for index in table.indexes:
+            if column_name in index.columns:
+                index.create(engine, checkfirst=True)
+
+
+# Unique keys that ON CONFLICT upserts rely on, as (table, columns, index name).
+# They are declared in the models, but databases created by an older init_db
+# don't have them; schema.sql has the matching CREATE UNIQUE INDEX statements.
+ADDED_UNIQUE_KEYS = (
+    ("jobs", ("external_id", "source"), "uq_jobs_external_id_source"),
+    ("job_applications", ("user_id", "job_id"), "uq_job_applications_user_id_job_id"),
+    ("excluded_jobs", ("user_id", "job_id"), "uq_excluded_jobs_user_id_job_id"),
+)
+
+
+def remove_duplicate_rows(conn, table_name: str, columns: Tuple[str, ...]) -> int:
+    """Delete all but the oldest row of each duplicate `columns` group.
+
+    Rows in other tables that reference a deleted row are pointed at the kept
+    one first. Returns the number of rows deleted.
+    """
+    key = ", ".join(columns)
+    not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+    duplicates = (f"SELECT id FROM {table_name} WHERE {not_null} "
+                  f"AND id NOT IN (SELECT MIN(id) FROM {table_name} GROUP BY {key})")
+    same_key = " AND ".join(f"kept.{column} = dup.{column}" for column in columns)
+
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        for fk in table.foreign_keys:
+            if fk.column.table.name != table_name or not inspector.has_table(table.name):
+                continue
+            ref = fk.parent.name
+            conn.exec_driver_sql(
+                f"UPDATE {table.name} SET {ref} = (SELECT MIN(kept.id) FROM {table_name} kept "
+                f"JOIN {table_name} dup ON {same_key} WHERE dup.id = {table.name}.{ref}) "
+                f"WHERE {ref} IN ({duplicates})"
+            )
+    return conn.exec_driver_sql(f"DELETE FROM {table_name} WHERE id IN ({duplicates})").rowcount
+
+
+def add_missing_unique_keys(engine):
+    """CREATE UNIQUE INDEX for ADDED_UNIQUE_KEYS missing from an existing database.
+
+    Duplicate rows that would block the index are removed first (see
+    remove_duplicate_rows) and logged.
+    """
+    inspector = inspect(engine)
+    for table_name, columns, index_name in ADDED_UNIQUE_KEYS:
+        if not inspector.has_table(table_name):
+            continue
+        unique = [c["column_names"] for c in inspector.get_unique_constraints(table_name)]
+        unique += [i["column_names"] for i in inspector.get_indexes(table_name) if i["unique"]]
+        if set(columns) in map(set, unique):
+            continue
+        with engine.begin() as conn:
+            removed = remove_duplicate_rows(conn, table_name, columns)
+            if removed:
+                logger.warning("Removed %d duplicate %s rows before adding UNIQUE(%s)",
+                               removed, table_name, ", ".join(columns))
+            conn.exec_driver_sql(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({', '.join(columns)})"
+            )
+
+
 def init_db():
-    """Create all tables if they don't exist"""
+    """Create all tables if they don't exist, and add columns and keys missing from older databases"""
     from . import models  # Import models to register them
+    from .search import init_search
     Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    add_missing_unique_keys(engine)
+    init_search(engine)
 
     # Seed default user if not exists
     db = SessionLocal()
@@ -0,0 +1,143 @@
+"""
+Cross-source duplicate detection for job listings
+
+The same posting often arrives from several sources under different external
+ids and URLs. Two stages catch it:
+
+- exact: a hash of the normalized (company, title, location), also stored in
+  jobs.dedup_key so new items can be matched against existing rows;
+- near: MinHash signatures of the description's opening words, bucketed by
+  LSH bands. Only postings that share a band are compared, and a match also
+  needs the same company and a similar title, which keeps company boilerplate
+  from merging different roles.
+
+Only postings from different sources are merged: a source listing the same
+role twice (e.g. one opening per team) keeps both. Each posting costs O(1)
+lookups on average, so a batch dedups in near-linear time.
+"""
+import re
+import hashlib
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# MinHash bins (signature length), split into LSH bands of DEDUP_ROWS values each
+DEDUP_PERMUTATIONS = 32
+DEDUP_ROWS = 4
+
+# Estimated description similarity (Jaccard) at which two postings are duplicates
+DEDUP_SIMILARITY = 0.8
+
+# Title token overlap (Jaccard) required for a near-duplicate
+DEDUP_TITLE_SIMILARITY = 0.5
+
+# Leading description words hashed; some sources truncate descriptions
+DEDUP_DESCRIPTION_WORDS = 50
+
+_TAGS = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"[a-z0-9]+")
+_COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "gmbh", "corp", "corporation", "co", "plc", "ag", "sa", "bv"}
+_TITLE_ABBREVIATIONS = {"sr": "senior", "jr": "junior", "mgr": "manager", "eng": "engineer", "dev": "developer"}
+
+_HASH_MASK = (1 << 64) - 1
+
+
+def _words(text: Optional[str], max_chars: Optional[int] = None) -> List[str]:
+    """Lowercase alphanumeric words with HTML tags removed, optionally from the first `max_chars` only"""
+    text = (text or "")[:max_chars * 2 if max_chars else None].lower()
+    if "<" in text:
+        text = _TAGS.sub(" ", text)
+    return _WORD.findall(text[:max_chars])
+
+
+def normalize_company(name: Optional[str]) -> str:
+    return " ".join(word for word in _words(name) if word not in _COMPANY_SUFFIXES)
+
+
+def normalize_title(title: Optional[str]) -> str:
+    return " ".join(_TITLE_ABBREVIATIONS.get(word, word) for word in _words(title))
+
+
+def normalize_location(location: Optional[str]) -> str:
+    words = _words(location)
+    return "remote" if "remote" in words else " ".join(words)
+
+
+def dedup_key(company: Optional[str], title: Optional[str], location: Optional[str]) -> Optional[str]:
+    """SHA-256 of the normalized (company, title, location); None without a company and title"""
+    company, title = normalize_company(company), normalize_title(title)
+    if not company or not title:
+        return None
+    payload = "\0".join([company, title, normalize_location(location)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def minhash_signature(description: Optional[str]) -> Optional[Tuple[int, ...]]:
+    """One-permutation MinHash of the word 3-grams in the description's opening; None if too short.
+
+    Each 3-gram hash lands in one of DEDUP_PERMUTATIONS bins and each bin keeps
+    its minimum, so the cost is one hash per 3-gram rather than one per 3-gram
+    per permutation. Empty bins borrow from the next filled bin (densification).
+    """
+    words = _words(description, DEDUP_DESCRIPTION_WORDS * 10)[:DEDUP_DESCRIPTION_WORDS]
+    if len(words) < 3:
+        return None
+    bins = [None] * DEDUP_PERMUTATIONS
+    # Built-in hash: signatures are only compared within one process
+    for i in range(len(words) - 2):
+        value = hash((words[i], words[i + 1], words[i + 2])) & _HASH_MASK
+        slot, value = value % DEDUP_PERMUTATIONS, value // DEDUP_PERMUTATIONS
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    filled = [slot for slot, value in enumerate(bins) if value is not None]
+    signature = list(bins)
+    for slot, value in enumerate(bins):
+        if value is None:
+            donor = next((f for f in filled if f > slot), filled[0])
+            signature[slot] = (bins[donor], (donor - slot) % DEDUP_PERMUTATIONS)
+    return tuple(signature)
+
+
+def _similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _title_similarity(a: str, b: str) -> float:
+    a_words, b_words = set(a.split()), set(b.split())
+    return len(a_words & b_words) / len(a_words | b_words) if a_words or b_words else 0.0
+
+
+class DedupIndex:
+    """Postings seen so far, by exact key and by LSH band"""
+
+    def __init__(self):
+        self._exact: Dict[str, List[Tuple[Hashable, str]]] = {}
+        self._bands: Dict[tuple, List[tuple]] = {}
+
+    def find_or_add(self, item: Hashable, source: str, company: Optional[str], title: Optional[str],
+                    location: Optional[str], description: Optional[str]) -> Optional[Hashable]:
+        """The earlier item from another source that `item` duplicates, or None after adding it"""
+        key = dedup_key(company, title, location)
+        if key is None:
+            return None
+        for other, other_source in self._exact.get(key, ()):
+            if other_source != source:
+                return other
+
+        company, title = normalize_company(company), normalize_title(title)
+        signature = minhash_signature(description)
+        bands = []
+        if signature is not None:
+            bands = [(start, signature[start:start + DEDUP_ROWS])
+                     for start in range(0, DEDUP_PERMUTATIONS, DEDUP_ROWS)]
+            for band in bands:
+                for other, other_source, other_company, other_title, other_signature in self._bands.get(band, ()):
+                    if (other_source != source
+                            and other_company == company
+                            and _title_similarity(other_title, title) >= DEDUP_TITLE_SIMILARITY
+                            and _similarity(other_signature, signature) >= DEDUP_SIMILARITY):
+                        return other
+
+        self._exact.setdefault(key, []).append((item, source))
+        entry = (item, source, company, title, signature)
+        for band in bands:
+            self._bands.setdefault(band, []).append(entry)
+        return None
@@ -0,0 +1,88 @@
+"""
+In-process cache of each user's applied and excluded job ids
+
+Used by list_jobs to skip anti-joins for users with nothing to filter and to
+flag jobs as applied/excluded without extra queries. Routers that write
+job_applications or excluded_jobs must call `user_job_sets.invalidate()`.
+Entries also expire after a TTL, which bounds staleness when several
+processes serve the API.
+"""
+import time
+import threading
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy.orm import Session
+
+from .models import JobApplication, ExcludedJob
+
+# Seconds before a cached entry is reloaded even without an invalidation
+USER_JOB_SETS_TTL = 60.0
+
+
+class JobIdBitmap:
+    """Compact set of job ids: one bit per id up to the largest id stored"""
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self, job_ids: Iterable[int] = ()):
+        self._bits = bytearray()
+        self._count = 0
+        for job_id in job_ids:
+            self.add(job_id)
+
+    def add(self, job_id: int):
+        byte, bit = divmod(job_id, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1))
+        if not self._bits[byte] & (1 << bit):
+            self._bits[byte] |= 1 << bit
+            self._count += 1
+
+    def __contains__(self, job_id: int) -> bool:
+        byte, bit = divmod(job_id, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class UserJobSets:
+    """Applied and excluded job ids per user, loaded lazily"""
+
+    def __init__(self, ttl: float = USER_JOB_SETS_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[float, JobIdBitmap, JobIdBitmap]] = {}
+        self._generations: Dict[int, int] = {}
+
+    def get(self, db: Session, user_id: int) -> Tuple[JobIdBitmap, JobIdBitmap]:
+        """(applied, excluded) job ids for `user_id`"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            generation = self._generations.get(user_id, 0)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1], entry[2]
+
+        loaded_at = time.monotonic()
+        applied = JobIdBitmap(job_id for (job_id,) in db.query(JobApplication.job_id).filter(
+            JobApplication.user_id == user_id,
+            JobApplication.job_id.isnot(None)
+        ))
+        excluded = JobIdBitmap(job_id for (job_id,) in db.query(ExcludedJob.job_id).filter(
+            ExcludedJob.user_id == user_id,
+            ExcludedJob.job_id.isnot(None)
+        ))
+        with self._lock:
+            # An invalidation during the load wins; don't store a possibly stale result
+            if self._generations.get(user_id, 0) == generation:
+                self._entries[user_id] = (loaded_at, applied, excluded)
+        return applied, excluded
+
+    def invalidate(self, user_id: int):
+        """Drop the cached sets after a write to the user's applications or exclusions"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+
+user_job_sets = UserJobSets()
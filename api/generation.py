@@ -0,0 +1,52 @@
+"""
+Background worker pool for LLM document generation
+
+LLM round-trips take seconds, so running them in request handlers ties up
+the server's threadpool and stalls unrelated endpoints. Generations run on
+this separate, bounded pool instead: async endpoints await the returned
+future, and background tasks record progress in the generation_tasks table
+for clients to poll.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .config import get_settings
+
+
+class GenerationQueue:
+    """Bounded pool: at most `workers` generations run and `max_pending` are accepted at once"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, fn: Callable, *args) -> Optional[Future]:
+        """Queue fn(*args) and return its Future; returns None instead of blocking when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="generation")
+                future = self._executor.submit(fn, *args)
+        except BaseException:
+            # Not queued (e.g. RuntimeError after shutdown), so the done callback will never free the slot
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+
+settings = get_settings()
+generation_queue = GenerationQueue(settings.generation_workers, settings.generation_queue_size)
@@ -0,0 +1,92 @@
+"""
+Content-addressed cache for LLM-generated documents
+
+Documents are keyed by a hash of everything that shapes the model's output:
+user, document type, provider, model and the rendered prompt (which embeds
+the profile and the truncated job description). Generated documents carry
+their key in generated_documents.cache_key, so the table is the durable
+cache; an in-process LRU with a TTL answers repeat requests without a query.
+
+A hit belongs to one job: two jobs with identical content share the key, so
+the second gets its own copy of the first one's text (see `content`) rather
+than the first job's document.
+"""
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import GeneratedDocument
+from .schemas.application import DocumentResponse
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(user_id: int, document_type: str, provider: str, model: str, prompt: str) -> str:
+    """SHA-256 of the generation inputs; whitespace-only prompt changes don't miss"""
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    payload = "\0".join([str(user_id), document_type, provider, model, normalized])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """LRU of recently generated documents, by (key, job id), in front of generated_documents"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def get(self, db: Session, key: str, job_id: int) -> Optional[DocumentResponse]:
+        """The job's cached document for `key`, checking memory first and then the database"""
+        with self._lock:
+            entry = self._entries.get((key, job_id))
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end((key, job_id))
+                return entry[1]
+
+        document = db.query(GeneratedDocument).filter(
+            GeneratedDocument.cache_key == key,
+            GeneratedDocument.job_id == job_id
+        ).order_by(GeneratedDocument.id.desc()).first()
+        if not document:
+            return None
+
+        snapshot = DocumentResponse.model_validate(document)
+        self._store((key, job_id), snapshot)
+        return snapshot
+
+    def content(self, db: Session, key: str) -> Optional[str]:
+        """Text of the latest document generated for `key` for any job, to copy instead of regenerating"""
+        row = db.query(GeneratedDocument.content).filter(
+            GeneratedDocument.cache_key == key
+        ).order_by(GeneratedDocument.id.desc()).first()
+        return row[0] if row else None
+
+    def put(self, document: GeneratedDocument) -> DocumentResponse:
+        """Remember a newly saved document; returns its response snapshot"""
+        snapshot = DocumentResponse.model_validate(document)
+        if document.cache_key:
+            self._store((document.cache_key, document.job_id), snapshot)
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: tuple, snapshot: DocumentResponse):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+settings = get_settings()
+generation_cache = GenerationCache(settings.generation_cache_size, settings.generation_cache_ttl)
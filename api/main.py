@@ -6,7 +6,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .database import init_db
+from .database import init_db, PoolConcurrencyLimit
+from .generation import generation_queue
+from .response_cache import ResponseCache
 from .routers import jobs_router, applications_router, documents_router, settings_router
 
 settings = get_settings()
@@ -17,6 +19,7 @@ async def lifespan(app: FastAPI):
     """Initialize database on startup"""
     init_db()
     yield
+    generation_queue.shutdown(wait=False)
 
 
 app = FastAPI(
@@ -26,7 +29,22 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# CORS middleware
+# Middleware, innermost first: the connection limit, the response cache (so cache hits
+# don't wait for a connection), then CORS so cached responses get CORS headers.
+# The limit covers /api routes except the health check and the NDJSON import stream,
+# which commits through its own short-lived sessions.
+app.add_middleware(
+    PoolConcurrencyLimit,
+    limit=settings.db_pool_size + settings.db_max_overflow,
+    prefix="/api/",
+    exempt=("/api/health", "/api/migration/import/stream"),
+)
+app.add_middleware(
+    ResponseCache,
+    paths={"/api/jobs": ("jobs", "user_jobs")},
+    maxsize=settings.response_cache_size,
+    ttl=settings.response_cache_ttl,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins.split(","),
@@ -55,13 +73,20 @@ def health():
 
 
 # Migration endpoint for importing localStorage data
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 from sqlalchemy.orm import Session
 from .database import get_db
-from .models import Job, Company, JobApplication, ExcludedJob
+from .exclusions import user_job_sets
+from .response_cache import table_versions
+from .migration import (
+    IMPORT_BATCH_SIZE, ImportBatch, import_entries, ndjson_lines, parse_line, start_import, commit_batch
+)
+from .models import ImportProgress
+from .schemas.application import ImportProgressResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from datetime import datetime
 
 
 class LocalStorageImport(BaseModel):
@@ -73,110 +98,65 @@ class LocalStorageImport(BaseModel):
 @app.post("/api/migration/import")
 def import_localstorage(data: LocalStorageImport, db: Session = Depends(get_db)):
     """Import data from localStorage"""
-    imported = {"applications": 0, "excluded": 0, "jobs_created": 0}
     user_id = 1
-
-    # Process applied jobs
-    for job_id in data.applied_jobs:
-        job_data = data.applied_jobs_data.get(job_id, {})
-
-        # Find or create company
-        company_id = None
-        if job_data.get("company"):
-            company = db.query(Company).filter(
-                Company.name == job_data["company"]
-            ).first()
-            if not company:
-                company = Company(
-                    name=job_data["company"],
-                    logo_url=job_data.get("companyLogo")
-                )
-                db.add(company)
-                db.commit()
-                db.refresh(company)
-            company_id = company.id
-
-        # Find or create job
-        job = db.query(Job).filter(
-            Job.external_id == job_id
-        ).first()
-
-        if not job:
-            job = Job(
-                external_id=job_id,
-                company_id=company_id,
-                title=job_data.get("title", "Unknown"),
-                location=job_data.get("location"),
-                department=job_data.get("department"),
-                url=job_data.get("url"),
-                source="imported"
-            )
-            db.add(job)
-            db.commit()
-            db.refresh(job)
-            imported["jobs_created"] += 1
-
-        # Create application if not exists
-        existing = db.query(JobApplication).filter(
-            JobApplication.user_id == user_id,
-            JobApplication.job_id == job.id
-        ).first()
-
-        if not existing:
-            applied_at = datetime.utcnow()
-            if job_data.get("appliedAt"):
-                try:
-                    applied_at = datetime.fromisoformat(job_data["appliedAt"].replace("Z", "+00:00"))
-                except:
-                    pass
-
-            application = JobApplication(
-                user_id=user_id,
-                job_id=job.id,
-                applied_at=applied_at
-            )
-            db.add(application)
-            imported["applications"] += 1
-
-    # Process excluded jobs
-    for job_id in data.excluded_jobs:
-        # Find or create job
-        job = db.query(Job).filter(
-            Job.external_id == job_id
-        ).first()
-
-        if not job:
-            job = Job(
-                external_id=job_id,
-                title="Unknown",
-                source="imported"
-            )
-            db.add(job)
-            db.commit()
-            db.refresh(job)
-            imported["jobs_created"] += 1
-
-        # Create exclusion if not exists
-        existing = db.query(ExcludedJob).filter(
-            ExcludedJob.user_id == user_id,
-            ExcludedJob.job_id == job.id
-        ).first()
-
-        if not existing:
-            exclusion = ExcludedJob(
-                user_id=user_id,
-                job_id=job.id
-            )
-            db.add(exclusion)
-            imported["excluded"] += 1
+    imported = import_entries(db, user_id, data.applied_jobs, data.applied_jobs_data, data.excluded_jobs)
 
     db.commit()
+    user_job_sets.invalidate(user_id)
+    table_versions.bump("jobs", "user_jobs")
     return {
         "message": "Import complete",
         "imported": imported
     }
 
 
+@app.post("/api/migration/import/stream", response_model=ImportProgressResponse)
+async def import_localstorage_stream(
+    request: Request,
+    import_id: Optional[str] = Query(None, max_length=64),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=50000)
+):
+    """Import a large localStorage export sent as NDJSON (see migration.ImportBatch).
+
+    The body is parsed as it arrives and applied in transactions of
+    `batch_size` entries. Pass an `import_id` to make the import resumable:
+    if it is interrupted, send the same stream again with the same id and
+    lines up to the last committed batch are skipped. Progress can be polled
+    with GET /api/migration/import/{import_id}.
+    """
+    user_id = 1
+    progress = await run_in_threadpool(start_import, user_id, import_id)
+    import_id = progress.import_id
+
+    batch = ImportBatch()
+    line_number = 0
+    try:
+        async for line in ndjson_lines(request.stream()):
+            line_number += 1
+            if line_number <= progress.lines_committed:
+                continue
+            parse_line(batch, line, line_number)
+            if len(batch) >= batch_size:
+                progress = await run_in_threadpool(commit_batch, import_id, batch, line_number)
+                batch = ImportBatch()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} (import {import_id} committed {progress.lines_committed} lines)")
+    except ClientDisconnect:
+        # Committed batches are kept; the client resumes with the same import_id
+        return progress
+
+    return await run_in_threadpool(commit_batch, import_id, batch, max(line_number, progress.lines_committed), True)
+
+
+@app.get("/api/migration/import/{import_id}", response_model=ImportProgressResponse)
+def get_import_progress(import_id: str, db: Session = Depends(get_db)):
+    """Progress of a streaming import"""
+    progress = db.get(ImportProgress, import_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return progress
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
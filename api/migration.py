@@ -0,0 +1,272 @@
+"""
+Set-based import of localStorage data (POST /api/migration/import)
+
+Existing jobs, companies, applications and exclusions are preloaded with a
+few IN queries per chunk of ids, and only the missing rows are inserted, in
+bulk, inside the caller's transaction.
+
+The streaming variant (POST /api/migration/import/stream) reads NDJSON
+incrementally and commits every `batch_size` entries together with an
+import_progress row, so memory stays bounded and a re-sent stream resumes
+after the last committed line.
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, dialect_insert
+from .exclusions import user_job_sets
+from .response_cache import table_versions
+from .models import Job, JobApplication, ExcludedJob, ImportProgress
+from .routers.jobs import _chunks, resolve_companies
+
+# Entries applied per transaction by the streaming import
+IMPORT_BATCH_SIZE = 5000
+
+# Longest NDJSON line accepted (bytes); bounds the parser's buffer
+MAX_IMPORT_LINE = 16 * 1024 * 1024
+
+
+def _parse_applied_at(value) -> datetime:
+    """localStorage appliedAt (ISO 8601, possibly with a Z suffix); now if missing or invalid"""
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (AttributeError, ValueError):
+            pass
+    return datetime.utcnow()
+
+
+def find_jobs(db: Session, external_ids: List[str]) -> Dict[str, int]:
+    """Map external ids to job ids (the oldest job wins if several sources share an id)"""
+    found = {}
+    for chunk in _chunks(external_ids):
+        rows = db.query(Job.external_id, Job.id).filter(Job.external_id.in_(chunk)).order_by(Job.id)
+        for external_id, job_id in rows:
+            found.setdefault(external_id, job_id)
+    return found
+
+
+def create_jobs(db: Session, rows: List[dict]) -> Dict[str, int]:
+    """Insert imported jobs, skipping any that already exist; returns external id -> job id"""
+    created = {}
+    for chunk in _chunks(rows):
+        stmt = dialect_insert(db, Job).on_conflict_do_nothing(
+            index_elements=["external_id", "source"]
+        ).returning(Job.external_id, Job.id)
+        created.update(db.execute(stmt, chunk).all())
+    return created
+
+
+def _link_jobs(db: Session, model, user_id: int, rows: List[dict]) -> int:
+    """Insert user -> job rows (applications or exclusions) that don't exist yet; returns how many"""
+    existing = set()
+    for chunk in _chunks([row["job_id"] for row in rows]):
+        existing.update(job_id for (job_id,) in db.query(model.job_id).filter(
+            model.user_id == user_id,
+            model.job_id.in_(chunk)
+        ))
+
+    missing = [row for row in rows if row["job_id"] not in existing]
+    inserted = 0
+    for chunk in _chunks(missing):
+        stmt = dialect_insert(db, model).on_conflict_do_nothing(
+            index_elements=["user_id", "job_id"]
+        ).returning(model.id)
+        inserted += len(db.execute(stmt, chunk).all())
+    return inserted
+
+
+def import_entries(
+    db: Session,
+    user_id: int,
+    applied_jobs: Iterable[str],
+    applied_jobs_data: Dict[str, dict],
+    excluded_jobs: Iterable[str]
+) -> Dict[str, int]:
+    """Import applied and excluded localStorage ids; flushes but does not commit.
+
+    Jobs that don't exist yet are created with source 'imported' (and their
+    company, for applied jobs); existing applications and exclusions are
+    left untouched. Returns counts of rows created.
+    """
+    applied = list(dict.fromkeys(applied_jobs))
+    excluded = list(dict.fromkeys(excluded_jobs))
+
+    job_ids = find_jobs(db, list(dict.fromkeys(applied + excluded)))
+
+    new_applied = [external_id for external_id in applied if external_id not in job_ids]
+    companies = {}
+    for external_id in new_applied:
+        job_data = applied_jobs_data.get(external_id, {})
+        if job_data.get("company"):
+            companies.setdefault(job_data["company"], job_data.get("companyLogo"))
+    company_ids = resolve_companies(db, companies)
+
+    new_jobs = []
+    for external_id in new_applied:
+        job_data = applied_jobs_data.get(external_id, {})
+        new_jobs.append({
+            "external_id": external_id,
+            "company_id": company_ids.get(job_data.get("company")),
+            "title": job_data.get("title", "Unknown"),
+            "location": job_data.get("location"),
+            "department": job_data.get("department"),
+            "url": job_data.get("url"),
+            "source": "imported",
+        })
+    applied_set = set(new_applied)
+    for external_id in excluded:
+        if external_id not in job_ids and external_id not in applied_set:
+            new_jobs.append({
+                "external_id": external_id,
+                "company_id": None,
+                "title": "Unknown",
+                "location": None,
+                "department": None,
+                "url": None,
+                "source": "imported",
+            })
+
+    created = create_jobs(db, new_jobs)
+    job_ids.update(created)
+    # Rows skipped on conflict were inserted concurrently; look them up
+    job_ids.update(find_jobs(db, [row["external_id"] for row in new_jobs if row["external_id"] not in job_ids]))
+
+    applications = [{
+        "user_id": user_id,
+        "job_id": job_ids[external_id],
+        "applied_at": _parse_applied_at(applied_jobs_data.get(external_id, {}).get("appliedAt")),
+    } for external_id in applied]
+    exclusions = [{"user_id": user_id, "job_id": job_ids[external_id]} for external_id in excluded]
+
+    return {
+        "applications": _link_jobs(db, JobApplication, user_id, applications),
+        "excluded": _link_jobs(db, ExcludedJob, user_id, exclusions),
+        "jobs_created": len(created),
+    }
+
+
+def _expect(value, kind: type, field: str):
+    if not isinstance(value, kind):
+        raise ValueError(f"expected {field} to be a JSON {'object' if kind is dict else 'array'}")
+    return value
+
+
+class ImportBatch:
+    """Entries parsed from NDJSON lines, waiting to be applied in one transaction.
+
+    A line is either a single entry, {"type": "applied", "id": ..., "data": {...}}
+    or {"type": "excluded", "id": ...}, or a chunk in the LocalStorageImport
+    shape ({"applied_jobs": [...], "applied_jobs_data": {...}, "excluded_jobs": [...]}).
+    """
+
+    def __init__(self):
+        self.applied: List[str] = []
+        self.applied_data: Dict[str, dict] = {}
+        self.excluded: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.applied) + len(self.excluded)
+
+    def add(self, record):
+        if not isinstance(record, dict):
+            raise ValueError("expected a JSON object")
+
+        if {"applied_jobs", "applied_jobs_data", "excluded_jobs"} & record.keys():
+            applied = _expect(record.get("applied_jobs", []), list, "applied_jobs")
+            applied_data = _expect(record.get("applied_jobs_data", {}), dict, "applied_jobs_data")
+            excluded = _expect(record.get("excluded_jobs", []), list, "excluded_jobs")
+            for external_id, data in applied_data.items():
+                _expect(data, dict, f"applied_jobs_data[{external_id!r}]")
+            self.applied.extend(str(external_id) for external_id in applied)
+            self.applied_data.update(applied_data)
+            self.excluded.extend(str(external_id) for external_id in excluded)
+        elif record.get("type") == "applied" and record.get("id") is not None:
+            data = record.get("data") and _expect(record["data"], dict, "data")
+            self.applied.append(str(record["id"]))
+            if data:
+                self.applied_data[str(record["id"])] = data
+        elif record.get("type") == "excluded" and record.get("id") is not None:
+            self.excluded.append(str(record["id"]))
+        else:
+            raise ValueError("expected an applied/excluded entry or an import chunk")
+
+
+async def ndjson_lines(chunks: AsyncIterator[bytes], max_line: int = MAX_IMPORT_LINE) -> AsyncIterator[bytes]:
+    """Split a byte stream into non-empty lines without buffering more than one line.
+
+    A partial line accumulates in a bytearray and only chunks containing a
+    newline are split, so a line spanning many chunks costs linear time.
+    """
+    buffer = bytearray()
+    async for chunk in chunks:
+        if b"\n" in chunk:
+            head, *lines, tail = chunk.split(b"\n")
+            buffer += head
+            for line in (bytes(buffer), *lines):
+                if line.strip():
+                    yield line
+            buffer = bytearray(tail)
+        else:
+            buffer += chunk
+        if len(buffer) > max_line:
+            raise ValueError(f"NDJSON line longer than {max_line} bytes")
+    if buffer.strip():
+        yield bytes(buffer)
+
+
+def parse_line(batch: ImportBatch, line: bytes, line_number: int):
+    try:
+        batch.add(json.loads(line))
+    except ValueError as e:
+        raise ValueError(f"Line {line_number}: {e}")
+
+
+def start_import(user_id: int, import_id: Optional[str]) -> ImportProgress:
+    """Progress row for `import_id`, created if new (a fresh id is generated when omitted)"""
+    db = SessionLocal()
+    try:
+        progress = db.get(ImportProgress, import_id) if import_id else None
+        if progress is None:
+            progress = ImportProgress(
+                import_id=import_id or uuid.uuid4().hex,
+                user_id=user_id,
+                status="running",
+                lines_committed=0,
+                applications=0,
+                excluded=0,
+                jobs_created=0
+            )
+            db.add(progress)
+            db.commit()
+            db.refresh(progress)
+        db.expunge(progress)
+        return progress
+    finally:
+        db.close()
+
+
+def commit_batch(import_id: str, batch: ImportBatch, lines_committed: int, final: bool = False) -> ImportProgress:
+    """Apply a batch and advance the import's progress in the same transaction"""
+    db = SessionLocal()
+    try:
+        progress = db.get(ImportProgress, import_id)
+        imported = import_entries(db, progress.user_id, batch.applied, batch.applied_data, batch.excluded)
+        progress.lines_committed = lines_committed
+        progress.applications += imported["applications"]
+        progress.excluded += imported["excluded"]
+        progress.jobs_created += imported["jobs_created"]
+        if final:
+            progress.status = "completed"
+        db.commit()
+        db.refresh(progress)
+        db.expunge(progress)
+        user_job_sets.invalidate(progress.user_id)
+        table_versions.bump("jobs", "user_jobs")
+        return progress
+    finally:
+        db.close()
@@ -1,6 +1,6 @@
 from .user import UserProfile
 from .job import Company, Job
-from .application import JobApplication, ExcludedJob, GeneratedDocument, UserSetting
+from .application import JobApplication, ExcludedJob, GeneratedDocument, GenerationTask, ImportProgress, UserSetting
 
 __all__ = [
     "UserProfile",
@@ -9,5 +9,7 @@ __all__ = [
     "JobApplication",
     "ExcludedJob",
     "GeneratedDocument",
+    "GenerationTask",
+    "ImportProgress",
     "UserSetting",
 ]
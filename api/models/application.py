@@ -1,7 +1,7 @@
 """
-Application, Exclusion, Document, and Settings models
+Application, Exclusion, Document, Generation task, Import progress, and Settings models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -9,6 +9,7 @@ from ..database import Base
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", name="uq_job_applications_user_id_job_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"))
@@ -24,6 +25,7 @@ class JobApplication(Base):
 
 class ExcludedJob(Base):
     __tablename__ = "excluded_jobs"
+    __table_args__ = (UniqueConstraint("user_id", "job_id", name="uq_excluded_jobs_user_id_job_id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"))
@@ -43,11 +45,42 @@ class GeneratedDocument(Base):
     document_type = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
     ai_model = Column(String(100))
+    cache_key = Column(String(64), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     job = relationship("Job", back_populates="documents")
 
 
+class GenerationTask(Base):
+    __tablename__ = "generation_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"))
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"))
+    document_type = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    error = Column(Text)
+    document_id = Column(Integer, ForeignKey("generated_documents.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    document = relationship("GeneratedDocument")
+
+
+class ImportProgress(Base):
+    __tablename__ = "import_progress"
+
+    import_id = Column(String(64), primary_key=True)
+    user_id = Column(Integer, ForeignKey("user_profiles.id", ondelete="CASCADE"))
+    status = Column(String(20), nullable=False, default="running")
+    lines_committed = Column(Integer, nullable=False, default=0)
+    applications = Column(Integer, nullable=False, default=0)
+    excluded = Column(Integer, nullable=False, default=0)
+    jobs_created = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class UserSetting(Base):
     __tablename__ = "user_settings"
 
@@ -1,7 +1,7 @@
 """
 Job and Company models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Numeric, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Numeric, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -22,6 +22,10 @@ class Company(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Upsert key for POST /api/jobs/batch (also declared in schema.sql)
+        UniqueConstraint("external_id", "source", name="uq_jobs_external_id_source"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String(255), nullable=False)
@@ -36,6 +40,8 @@ class Job(Base):
     posted_date = Column(DateTime(timezone=True))
     source = Column(String(50), nullable=False)
     match_score = Column(Numeric(5, 2))
+    # Hash of normalized (company, title, location); see api/dedup.py
+    dedup_key = Column(String(64), index=True)
     is_active = Column(Boolean, default=True)
     first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
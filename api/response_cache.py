@@ -0,0 +1,142 @@
+"""
+Response cache with strong ETags for frequently polled GET endpoints
+
+Cached responses are keyed by path, normalized query string and the
+current version of every table the endpoint reads. Writers bump those
+versions with `table_versions.bump()`, so a changed table simply stops
+matching old entries. A request whose If-None-Match matches the cached ETag
+gets a 304 without reaching the router (or the database).
+
+Versions are per process; entries also expire after a TTL, which bounds
+staleness when several processes serve the API.
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+
+class TableVersions:
+    """Monotonic change counter per logical table"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def bump(self, *tables: str):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+
+table_versions = TableVersions()
+
+
+def normalize_query(query_string: bytes) -> str:
+    """Sorted query string without blank values, so equivalent URLs share an entry"""
+    params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=False)
+    return urlencode(sorted(params))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """ASGI middleware caching 200 GET responses for the configured paths.
+
+    `paths` maps a request path to the tables its response depends on.
+    Must sit inside CORSMiddleware so cached responses still get CORS headers.
+    """
+
+    def __init__(self, app, paths: Dict[str, Tuple[str, ...]], maxsize: int, ttl: float):
+        self.app = app
+        self.paths = paths
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        tables = self.paths[scope["path"]]
+        key = (scope["path"], normalize_query(scope["query_string"]), table_versions.snapshot(tables))
+        headers = dict(scope["headers"])
+        if_none_match = headers.get(b"if-none-match", b"").decode("latin-1")
+
+        entry = self._get(key)
+        if entry is None:
+            entry = await self._render(scope, receive, send)
+            if entry is None:
+                return
+            self._put(key, entry)
+
+        etag, content_type, body = entry
+        if _etag_matches(if_none_match, etag):
+            await self._send(send, 304, etag, content_type, b"")
+        else:
+            await self._send(send, 200, etag, content_type, body)
+
+    async def _render(self, scope, receive, send):
+        """Run the endpoint and buffer its response; non-200 responses are passed through"""
+        start = None
+        chunks = []
+
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        if start is None or start["status"] != 200:
+            if start is not None:
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+            return None
+
+        content_type = dict(start["headers"]).get(b"content-type", b"application/json")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return etag, content_type, body
+
+    @staticmethod
+    async def _send(send, status: int, etag: str, content_type: bytes, body: bytes):
+        headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"cache-control", b"no-cache"),
+        ]
+        if status == 200:
+            headers += [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def _get(self, key):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                self._entries.move_to_end(key)
+                return cached[1]
+        return None
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
@@ -6,7 +6,9 @@ from sqlalchemy.orm import Session, joinedload
 from typing import Optional, List
 from datetime import datetime
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..exclusions import user_job_sets
+from ..response_cache import table_versions
 from ..models import Job, Company, JobApplication
 from ..schemas.application import (
     ApplicationCreate, ApplicationResponse, ApplicationListResponse
@@ -21,7 +23,7 @@ DEFAULT_USER_ID = 1
 @router.get("", response_model=ApplicationListResponse)
 def list_applications(
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """List all job applications"""
     query = db.query(JobApplication)\
@@ -76,6 +78,7 @@ def create_application(
         )
         db.add(job)
         db.commit()
+        table_versions.bump("jobs")
         db.refresh(job)
         data.job_id = job.id
 
@@ -107,6 +110,8 @@ def create_application(
     )
     db.add(application)
     db.commit()
+    user_job_sets.invalidate(DEFAULT_USER_ID)
+    table_versions.bump("user_jobs")
     db.refresh(application)
 
     # Load job relationship
@@ -153,6 +158,8 @@ def delete_application(application_id: int, db: Session = Depends(get_db)):
 
     db.delete(application)
     db.commit()
+    user_job_sets.invalidate(DEFAULT_USER_ID)
+    table_versions.bump("user_jobs")
     return {"message": "Application deleted"}
 
 
@@ -162,7 +169,7 @@ from ..schemas.application import ExcludedJobCreate, ExcludedJobResponse
 
 
 @router.get("/excluded", response_model=List[ExcludedJobResponse])
-def list_excluded(db: Session = Depends(get_db)):
+def list_excluded(db: Session = Depends(get_read_db)):
     """List all excluded jobs"""
     excluded = db.query(ExcludedJob)\
         .options(joinedload(ExcludedJob.job).joinedload(Job.company))\
@@ -207,6 +214,7 @@ def exclude_job(data: ExcludedJobCreate, db: Session = Depends(get_db)):
         )
         db.add(job)
         db.commit()
+        table_versions.bump("jobs")
         db.refresh(job)
         data.job_id = job.id
 
@@ -230,6 +238,8 @@ def exclude_job(data: ExcludedJobCreate, db: Session = Depends(get_db)):
     )
     db.add(excluded)
     db.commit()
+    user_job_sets.invalidate(DEFAULT_USER_ID)
+    table_versions.bump("user_jobs")
     db.refresh(excluded)
     return excluded
 
@@ -247,4 +257,6 @@ def restore_job(excluded_id: int, db: Session = Depends(get_db)):
 
     db.delete(excluded)
     db.commit()
+    user_job_sets.invalidate(DEFAULT_USER_ID)
+    table_versions.bump("user_jobs")
     return {"message": "Job restored"}
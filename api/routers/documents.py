@@ -1,14 +1,20 @@
 """
 Documents router - Generate and manage cover letters and resumes
 """
+import asyncio
+import json
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Iterator, Tuple, Union
 
-from ..database import get_db
-from ..models import Job, GeneratedDocument, UserSetting
-from ..schemas.application import DocumentCreate, DocumentResponse
-from ..config import get_settings
+from ..database import get_db, get_read_db, SessionLocal
+from ..models import Job, GeneratedDocument, GenerationTask
+from ..schemas.application import DocumentCreate, DocumentResponse, GenerationTaskResponse
+from ..ai_clients import ai_clients
+from ..generation import generation_queue
+from ..llm_cache import cache_key, generation_cache
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -47,45 +53,25 @@ USER_PROFILE = {
 
 
 def get_ai_client(db: Session):
-    """Get AI client based on user settings"""
-    settings = get_settings()
+    """Get AI client based on user settings (shared, see ai_clients)"""
+    return ai_clients.get(db, DEFAULT_USER_ID)
 
-    # Check user settings for API key
-    user_key = db.query(UserSetting).filter(
-        UserSetting.user_id == DEFAULT_USER_ID,
-        UserSetting.setting_key == "anthropic_api_key"
-    ).first()
-
-    api_key = user_key.setting_value if user_key else settings.anthropic_api_key
-
-    if api_key:
-        try:
-            from anthropic import Anthropic
-            return Anthropic(api_key=api_key), "anthropic"
-        except ImportError:
-            pass
-
-    # Fall back to OpenAI
-    user_key = db.query(UserSetting).filter(
-        UserSetting.user_id == DEFAULT_USER_ID,
-        UserSetting.setting_key == "openai_api_key"
-    ).first()
 
-    api_key = user_key.setting_value if user_key else settings.openai_api_key
+def ai_client(db: Session = Depends(get_db)):
+    """Dependency wrapper around get_ai_client (override it to inject a fake client)"""
+    return get_ai_client(db)
 
-    if api_key:
-        try:
-            from openai import OpenAI
-            return OpenAI(api_key=api_key), "openai"
-        except ImportError:
-            pass
 
-    return None, None
+# Model used for each provider
+MODELS = {
+    "anthropic": "claude-sonnet-4-20250514",
+    "openai": "gpt-4o",
+}
 
 
-def generate_cover_letter_content(job: Job, client, provider: str) -> str:
-    """Generate cover letter using AI"""
-    prompt = f"""Write a professional cover letter for the following job application.
+def cover_letter_prompt(job: Job) -> str:
+    """Prompt for a tailored cover letter"""
+    return f"""Write a professional cover letter for the following job application.
 
 APPLICANT PROFILE:
 Name: {USER_PROFILE['name']}
@@ -107,28 +93,10 @@ Requirements:
 
 Write the cover letter now:"""
 
-    try:
-        if provider == "anthropic":
-            response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.content[0].text
-        elif provider == "openai":
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000
-            )
-            return response.choices[0].message.content
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
-
 
-def generate_resume_content(job: Job, client, provider: str) -> str:
-    """Generate tailored resume using AI"""
-    prompt = f"""Create a tailored professional summary and skills section for the following job.
+def resume_prompt(job: Job) -> str:
+    """Prompt for a tailored resume summary and skills section"""
+    return f"""Create a tailored professional summary and skills section for the following job.
 
 APPLICANT PROFILE:
 Name: {USER_PROFILE['name']}
@@ -154,93 +122,358 @@ PROFESSIONAL SUMMARY:
 KEY SKILLS:
 [bullet list of top 10 relevant skills]"""
 
+
+def complete(client, provider: str, prompt: str, max_tokens: int) -> str:
+    """Send a single-turn prompt to the configured provider"""
     try:
         if provider == "anthropic":
             response = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=800,
+                model=MODELS[provider],
+                max_tokens=max_tokens,
                 messages=[{"role": "user", "content": prompt}]
             )
             return response.content[0].text
         elif provider == "openai":
             response = client.chat.completions.create(
-                model="gpt-4o",
+                model=MODELS[provider],
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=800
+                max_tokens=max_tokens
             )
             return response.choices[0].message.content
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
 
 
-@router.get("/{job_id}", response_model=List[DocumentResponse])
-def get_documents(job_id: int, db: Session = Depends(get_db)):
-    """Get all generated documents for a job"""
-    documents = db.query(GeneratedDocument).filter(
-        GeneratedDocument.user_id == DEFAULT_USER_ID,
-        GeneratedDocument.job_id == job_id
-    ).order_by(GeneratedDocument.created_at.desc()).all()
+def stream_completion(client, provider: str, prompt: str, max_tokens: int) -> Iterator[str]:
+    """Yield text chunks from the provider's streaming API as they arrive"""
+    if provider == "anthropic":
+        with client.messages.stream(
+            model=MODELS[provider],
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            yield from stream.text_stream
+    elif provider == "openai":
+        stream = client.chat.completions.create(
+            model=MODELS[provider],
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-    return [DocumentResponse.model_validate(doc) for doc in documents]
 
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-@router.post("/cover-letter", response_model=DocumentResponse)
-def generate_cover_letter(data: DocumentCreate, db: Session = Depends(get_db)):
-    """Generate a cover letter for a job"""
-    job = db.query(Job).filter(Job.id == data.job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
 
-    client, provider = get_ai_client(db)
-    if not client:
-        raise HTTPException(
-            status_code=400,
-            detail="No AI API key configured. Please add your Anthropic or OpenAI API key in settings."
-        )
+# Prompt builder and token limit by document type
+GENERATORS = {
+    "cover_letter": (cover_letter_prompt, 1000),
+    "resume": (resume_prompt, 800),
+}
 
-    content = generate_cover_letter_content(job, client, provider)
 
-    # Save document
+def document_key(job: Job, document_type: str, provider: str) -> Tuple[str, str]:
+    """(prompt, cache key) for a job's document"""
+    prompt = GENERATORS[document_type][0](job)
+    return prompt, cache_key(DEFAULT_USER_ID, document_type, provider, MODELS[provider], prompt)
+
+
+def generate_document(
+    db: Session,
+    job: Job,
+    document_type: str,
+    client,
+    provider: str,
+    regenerate: bool = False
+) -> DocumentResponse:
+    """Return the job's cached document for these inputs, or generate and save a new one.
+
+    If another job with identical content already has one, its text is saved
+    as this job's document without calling the provider.
+    Flushes but does not commit; the caller owns the transaction.
+    """
+    prompt, key = document_key(job, document_type, provider)
+    max_tokens = GENERATORS[document_type][1]
+
+    content = None
+    if not regenerate:
+        cached = generation_cache.get(db, key, job.id)
+        if cached:
+            return cached
+        content = generation_cache.content(db, key)
+
     document = GeneratedDocument(
         user_id=DEFAULT_USER_ID,
-        job_id=data.job_id,
-        document_type="cover_letter",
-        content=content,
-        ai_model=f"{provider}"
+        job_id=job.id,
+        document_type=document_type,
+        content=content if content is not None else complete(client, provider, prompt, max_tokens),
+        ai_model=f"{provider}",
+        cache_key=key
     )
     db.add(document)
-    db.commit()
+    db.flush()
     db.refresh(document)
+    return generation_cache.put(document)
+
+
+def stream_document(
+    db: Session,
+    job: Job,
+    document_type: str,
+    client,
+    provider: str,
+    regenerate: bool = False
+) -> StreamingResponse:
+    """Stream a document as Server-Sent Events, saving it once complete.
+
+    Emits `token` events ({"text": ...}) as chunks arrive, then one `done`
+    event with the saved document, or an `error` event if generation fails.
+    Closes `db` before returning; the document is saved with its own session.
+    A cached document, or text copied from another job with identical content
+    (as in generate_document), is sent as a single token event.
+    """
+    prompt, key = document_key(job, document_type, provider)
+    max_tokens = GENERATORS[document_type][1]
+    cached = content = None
+    if not regenerate:
+        cached = generation_cache.get(db, key, job.id)
+        if not cached:
+            content = generation_cache.content(db, key)
+    job_id = job.id
+    # FastAPI only closes `yield` dependencies after the response has finished; give the
+    # connection back now instead of holding it for the whole stream
+    db.close()
+
+    def events():
+        if cached:
+            yield sse_event("token", {"text": cached.content})
+            yield sse_event("done", cached.model_dump(mode="json"))
+            return
+
+        chunks = []
+        if content is not None:
+            chunks.append(content)
+            yield sse_event("token", {"text": content})
+        else:
+            try:
+                for text in stream_completion(client, provider, prompt, max_tokens):
+                    chunks.append(text)
+                    yield sse_event("token", {"text": text})
+            except Exception as e:
+                yield sse_event("error", {"detail": f"AI generation failed: {str(e)}"})
+                return
+
+        # The request's session was closed before streaming; save with a short-lived one
+        session = SessionLocal()
+        try:
+            document = GeneratedDocument(
+                user_id=DEFAULT_USER_ID,
+                job_id=job_id,
+                document_type=document_type,
+                content="".join(chunks),
+                ai_model=f"{provider}",
+                cache_key=key
+            )
+            session.add(document)
+            session.commit()
+            session.refresh(document)
+            yield sse_event("done", generation_cache.put(document).model_dump(mode="json"))
+        finally:
+            session.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    return document
 
+def run_generation_task(task_id: int, client, provider: str, regenerate: bool = False):
+    """Generate the document for a queued task (runs on the generation pool)"""
+    db = SessionLocal()
+    try:
+        task = db.query(GenerationTask).filter(GenerationTask.id == task_id).first()
+        if not task:
+            return
+        task.status = "running"
+        db.commit()
+
+        try:
+            job = db.query(Job).filter(Job.id == task.job_id).first()
+            document = generate_document(db, job, task.document_type, client, provider, regenerate)
+            task.document_id = document.id
+            task.status = "completed"
+        except Exception as e:
+            db.rollback()
+            task.status = "failed"
+            task.error = str(getattr(e, "detail", e))
+        db.commit()
+    finally:
+        db.close()
+
+
+def save_document(job_id: int, document_type: str, client, provider: str,
+                  regenerate: bool = False) -> DocumentResponse:
+    """Generate and commit a job's document in its own session (runs on the generation pool)"""
+    db = SessionLocal()
+    try:
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        document = generate_document(db, job, document_type, client, provider, regenerate)
+        db.commit()
+        return document
+    finally:
+        db.close()
+
+
+def start_document(
+    db: Session,
+    data: DocumentCreate,
+    document_type: str,
+    stream: bool,
+    ai
+) -> Union[StreamingResponse, DocumentResponse, None]:
+    """Validate a generation request: returns the stream for `stream`, else the cached
+    document, or None if it has to be generated. Closes `db` either way.
+    """
+    try:
+        job = db.query(Job).filter(Job.id == data.job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        client, provider = ai
+        if not client:
+            raise HTTPException(
+                status_code=400,
+                detail="No AI API key configured. Please add your Anthropic or OpenAI API key in settings."
+            )
+
+        if stream:
+            return stream_document(db, job, document_type, client, provider, data.regenerate)
+        if not data.regenerate:
+            _, key = document_key(job, document_type, provider)
+            return generation_cache.get(db, key, job.id)
+        return None
+    finally:
+        db.close()
+
+
+async def queue_document(data: DocumentCreate, document_type: str, stream: bool, db: Session, ai):
+    """Shared body of POST /cover-letter and /resume.
+
+    Cache hits are answered directly. Otherwise the generation runs on the
+    generation pool and is awaited here, so the LLM call holds neither a
+    threadpool thread nor the request's connection.
+    """
+    started = await run_in_threadpool(start_document, db, data, document_type, stream, ai)
+    if started is not None:
+        return started
+
+    client, provider = ai
+    future = generation_queue.submit(save_document, data.job_id, document_type, client, provider, data.regenerate)
+    if future is None:
+        raise HTTPException(status_code=503, detail="Generation queue is full, try again shortly")
+    return await asyncio.wrap_future(future)
+
+
+@router.post("/tasks", response_model=GenerationTaskResponse, status_code=202)
+def create_generation_task(
+    data: DocumentCreate,
+    db: Session = Depends(get_db),
+    ai=Depends(ai_client)
+):
+    """Queue a cover letter or resume for background generation.
+
+    Returns immediately; poll GET /documents/tasks/{id} until the status is
+    'completed' (the document is included) or 'failed'.
+    """
+    if data.document_type not in GENERATORS:
+        raise HTTPException(status_code=400, detail=f"Unknown document type: {data.document_type}")
 
-@router.post("/resume", response_model=DocumentResponse)
-def generate_resume(data: DocumentCreate, db: Session = Depends(get_db)):
-    """Generate a tailored resume for a job"""
     job = db.query(Job).filter(Job.id == data.job_id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    client, provider = get_ai_client(db)
+    client, provider = ai
     if not client:
         raise HTTPException(
             status_code=400,
             detail="No AI API key configured. Please add your Anthropic or OpenAI API key in settings."
         )
 
-    content = generate_resume_content(job, client, provider)
-
-    # Save document
-    document = GeneratedDocument(
+    task = GenerationTask(
         user_id=DEFAULT_USER_ID,
         job_id=data.job_id,
-        document_type="resume",
-        content=content,
-        ai_model=f"{provider}"
+        document_type=data.document_type,
+        status="pending"
     )
-    db.add(document)
+    db.add(task)
     db.commit()
-    db.refresh(document)
+    db.refresh(task)
+
+    if not generation_queue.submit(run_generation_task, task.id, client, provider, data.regenerate):
+        task.status = "failed"
+        task.error = "Generation queue is full"
+        db.commit()
+        raise HTTPException(status_code=503, detail="Generation queue is full, try again shortly")
+
+    return task
 
-    return document
+
+@router.get("/tasks/{task_id}", response_model=GenerationTaskResponse)
+def get_generation_task(task_id: int, db: Session = Depends(get_db)):
+    """Get the status of a generation task"""
+    task = db.query(GenerationTask).filter(
+        GenerationTask.id == task_id,
+        GenerationTask.user_id == DEFAULT_USER_ID
+    ).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.get("/{job_id}", response_model=List[DocumentResponse])
+def get_documents(job_id: int, db: Session = Depends(get_read_db)):
+    """Get all generated documents for a job"""
+    documents = db.query(GeneratedDocument).filter(
+        GeneratedDocument.user_id == DEFAULT_USER_ID,
+        GeneratedDocument.job_id == job_id
+    ).order_by(GeneratedDocument.created_at.desc()).all()
+
+    return [DocumentResponse.model_validate(doc) for doc in documents]
+
+
+@router.post("/cover-letter", response_model=DocumentResponse)
+async def generate_cover_letter(
+    data: DocumentCreate,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+    ai=Depends(ai_client)
+):
+    """Generate a cover letter for a job.
+
+    With `?stream=true` the text is sent as Server-Sent Events while it is
+    generated (see stream_document).
+    """
+    return await queue_document(data, "cover_letter", stream, db, ai)
+
+
+@router.post("/resume", response_model=DocumentResponse)
+async def generate_resume(
+    data: DocumentCreate,
+    stream: bool = False,
+    db: Session = Depends(get_db),
+    ai=Depends(ai_client)
+):
+    """Generate a tailored resume for a job.
+
+    With `?stream=true` the text is sent as Server-Sent Events while it is
+    generated (see stream_document).
+    """
+    return await queue_document(data, "resume", stream, db, ai)
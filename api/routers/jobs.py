@@ -1,48 +1,166 @@
 """
 Jobs router - CRUD operations for job listings
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+import json
+import base64
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import Optional, List
+from sqlalchemy import or_, and_, insert, func, exists
+from typing import Optional, List, Dict, Literal, Set, Tuple
 from datetime import datetime
+from decimal import Decimal
 
-from ..database import get_db
+from ..database import get_db, get_read_db, dialect_insert
+from ..dedup import DedupIndex, dedup_key
+from ..search import apply_search, search_snippets
+from ..exclusions import user_job_sets
+from ..response_cache import table_versions
 from ..models import Job, Company, JobApplication, ExcludedJob
-from ..schemas.job import JobCreate, JobResponse, JobListResponse
+from ..schemas.job import JobBase, JobCreate, JobResponse, JobListResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+# Rows per statement in bulk operations (keeps SQLite under its bound-parameter limit)
+BULK_CHUNK_SIZE = 500
+
+# Job columns a batch item can set; company is resolved separately
+JOB_FIELDS = list(JobBase.model_fields)
+
+# Columns selected by list_jobs, in JobResponse field order (the company goes after company_id)
+LIST_JOB_COLUMNS = (
+    Job.external_id, Job.title, Job.location, Job.department, Job.description, Job.salary,
+    Job.work_type, Job.url, Job.posted_date, Job.source, Job.match_score, Job.id, Job.company_id,
+    Job.is_active, Job.first_seen_at, Job.last_seen_at, Job.created_at,
+)
+_COMPANY_POSITION = LIST_JOB_COLUMNS.index(Job.company_id) + 1
+LIST_COMPANY_COLUMNS = (
+    Company.name, Company.board, Company.ats_type, Company.logo_url, Company.id, Company.created_at,
+)
+LIST_COMPANY_LABELS = tuple(f"company_{column.key}" for column in LIST_COMPANY_COLUMNS)
+
+# Listing order; id breaks ties so every row has a unique position for cursors
+LIST_ORDER = (
+    Job.match_score.desc().nullslast(),
+    Job.posted_date.desc().nullslast(),
+    Job.id.desc(),
+)
+
+
+def encode_cursor(job: Job) -> str:
+    """Opaque cursor for the position of `job` in LIST_ORDER"""
+    values = [
+        str(job.match_score) if job.match_score is not None else None,
+        job.posted_date.isoformat() if job.posted_date else None,
+        job.id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, posted, job_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            Decimal(score) if score is not None else None,
+            datetime.fromisoformat(posted) if posted else None,
+            int(job_id),
+        )
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(cursor: tuple):
+    """Filter for rows that come after `cursor` in LIST_ORDER.
+
+    Built inside-out from the id tie-breaker. NULL scores and dates sort last,
+    so a row is after a non-NULL cursor value if its value is smaller or NULL.
+    """
+    score, posted, job_id = cursor
+    clause = Job.id < job_id
+    for column, value in ((Job.posted_date, posted), (Job.match_score, score)):
+        if value is None:
+            clause = and_(column.is_(None), clause)
+        else:
+            clause = or_(column < value, column.is_(None), and_(column == value, clause))
+    return clause
+
+
+def serialize_job_rows(rows, applied, excluded, snippets: Dict[int, str]) -> List[dict]:
+    """JobResponse-shaped dicts straight from list_jobs row tuples (no ORM objects)"""
+    head_keys = [column.key for column in LIST_JOB_COLUMNS[:_COMPANY_POSITION]]
+    tail_keys = [column.key for column in LIST_JOB_COLUMNS[_COMPANY_POSITION:]]
+    company_keys = [column.key for column in LIST_COMPANY_COLUMNS]
+    split = len(LIST_JOB_COLUMNS)
+    company_id = split + company_keys.index("id")
+
+    results = []
+    for row in rows:
+        job = dict(zip(head_keys, row[:_COMPANY_POSITION]))
+        if job["match_score"] is not None:
+            job["match_score"] = float(job["match_score"])
+        job["company"] = dict(zip(company_keys, row[split:])) if row[company_id] is not None else None
+        job.update(zip(tail_keys, row[_COMPANY_POSITION:split]))
+        job["is_applied"] = job["id"] in applied
+        job["is_excluded"] = job["id"] in excluded
+        job["snippet"] = snippets.get(job["id"])
+        results.append(job)
+    return results
+
+
+def estimated_count(db: Session, query) -> Optional[int]:
+    """Planner row estimate for `query` (PostgreSQL only, None elsewhere)"""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.order_by(None).statement.compile(dialect=bind.dialect)
+    plan = db.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 
 @router.get("", response_model=JobListResponse)
 def list_jobs(
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    count: Literal["exact", "estimated", "none"] = "exact",
     source: Optional[str] = None,
     company: Optional[str] = None,
     search: Optional[str] = None,
     min_score: Optional[float] = None,
     include_applied: bool = False,
     include_excluded: bool = False,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """List jobs with optional filters"""
-    query = db.query(Job).filter(Job.is_active == True)
+    """List jobs with optional filters.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the following page;
+    cursor pages cost the same however deep they are, unlike `page`. `count`
+    selects an exact total, a planner estimate (PostgreSQL), or no total.
+
+    `search` runs a full-text query, orders results by relevance and adds a
+    highlighted snippet to each job. Search results are paged with `page`.
+
+    Rows are selected as plain columns with the company joined in, and the
+    response is serialized straight to JSON with orjson.
+    """
+    company_columns = [column.label(label) for column, label in zip(LIST_COMPANY_COLUMNS, LIST_COMPANY_LABELS)]
+    query = db.query(*LIST_JOB_COLUMNS, *company_columns)\
+        .outerjoin(Company, Job.company_id == Company.id)\
+        .filter(Job.is_active == True)
 
     # Apply filters
     if source:
         query = query.filter(Job.source == source)
 
     if company:
-        query = query.join(Company).filter(Company.name.ilike(f"%{company}%"))
+        query = query.filter(Company.name.ilike(f"%{company}%"))
 
-    if search:
-        query = query.filter(
-            or_(
-                Job.title.ilike(f"%{search}%"),
-                Job.description.ilike(f"%{search}%")
-            )
-        )
+    relevance = None
+    if search and search.strip():
+        query, relevance = apply_search(db, query, search)
 
     if min_score is not None:
         query = query.filter(Job.match_score >= min_score)
@@ -50,39 +168,62 @@ def list_jobs(
     # Get user_id (default to 1 for single-user)
     user_id = 1
 
-    # Exclude applied jobs unless requested
-    if not include_applied:
-        applied_ids = db.query(JobApplication.job_id).filter(
-            JobApplication.user_id == user_id
-        ).subquery()
-        query = query.filter(~Job.id.in_(applied_ids))
+    # Cached id sets let us skip the anti-joins when there is nothing to filter
+    applied, excluded = user_job_sets.get(db, user_id)
+
+    # Exclude applied jobs unless requested (NOT EXISTS probes the (user_id, job_id) key)
+    if not include_applied and applied:
+        query = query.filter(~exists().where(
+            JobApplication.user_id == user_id,
+            JobApplication.job_id == Job.id
+        ))
 
     # Exclude excluded jobs unless requested
-    if not include_excluded:
-        excluded_ids = db.query(ExcludedJob.job_id).filter(
-            ExcludedJob.user_id == user_id
-        ).subquery()
-        query = query.filter(~Job.id.in_(excluded_ids))
+    if not include_excluded and excluded:
+        query = query.filter(~exists().where(
+            ExcludedJob.user_id == user_id,
+            ExcludedJob.job_id == Job.id
+        ))
 
     # Get total count
-    total = query.count()
-
-    # Apply pagination and ordering
-    jobs = query.order_by(Job.match_score.desc().nullslast(), Job.posted_date.desc())\
-        .offset((page - 1) * per_page)\
-        .limit(per_page)\
-        .all()
-
-    return JobListResponse(
-        jobs=[JobResponse.model_validate(job) for job in jobs],
-        total=total,
-        page=page,
-        per_page=per_page
-    )
+    total = None
+    total_estimated = False
+    if count == "estimated":
+        total = estimated_count(db, query)
+        total_estimated = total is not None
+    if count == "exact" or (count == "estimated" and total is None):
+        total = query.count()
+
+    # Apply pagination and ordering; one extra row tells us whether there is a next page
+    if relevance is not None:
+        query = query.order_by(relevance.desc(), *LIST_ORDER).offset((page - 1) * per_page)
+    elif cursor:
+        query = query.order_by(*LIST_ORDER).filter(after_cursor(decode_cursor(cursor)))
+    else:
+        query = query.order_by(*LIST_ORDER).offset((page - 1) * per_page)
+    jobs = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(jobs) > per_page:
+        jobs = jobs[:per_page]
+        if relevance is None:
+            next_cursor = encode_cursor(jobs[-1])
+
+    snippets = search_snippets(db, [job.id for job in jobs], search) if relevance is not None else {}
+
+    content = orjson.dumps({
+        "jobs": serialize_job_rows(jobs, applied, excluded, snippets),
+        "total": total,
+        "total_estimated": total_estimated,
+        "page": page,
+        "per_page": per_page,
+        "next_cursor": next_cursor,
+    }, option=orjson.OPT_UTC_Z)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-def get_job(job_id: int, db: Session = Depends(get_db)):
+def get_job(job_id: int, db: Session = Depends(get_read_db)):
     """Get a single job by ID"""
     job = db.query(Job).filter(Job.id == job_id).first()
     if not job:
@@ -104,8 +245,12 @@ def create_job(job_data: JobCreate, db: Session = Depends(get_db)):
         for key, value in job_data.model_dump(exclude_unset=True).items():
             if key not in ["company_name", "company_logo"]:
                 setattr(existing, key, value)
+        existing.dedup_key = dedup_key(
+            existing.company.name if existing.company else None, existing.title, existing.location
+        )
         existing.last_seen_at = datetime.utcnow()
         db.commit()
+        table_versions.bump("jobs")
         db.refresh(existing)
         return existing
 
@@ -138,21 +283,196 @@ def create_job(job_data: JobCreate, db: Session = Depends(get_db)):
         url=job_data.url,
         posted_date=job_data.posted_date,
         source=job_data.source,
-        match_score=job_data.match_score
+        match_score=job_data.match_score,
+        dedup_key=dedup_key(job_data.company_name, job_data.title, job_data.location)
     )
     db.add(job)
     db.commit()
+    table_versions.bump("jobs")
     db.refresh(job)
     return job
 
 
+def _chunks(items: list, size: int = BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def resolve_companies(db: Session, companies: Dict[str, Optional[str]]) -> Dict[str, int]:
+    """Map company names to ids, creating missing companies in bulk.
+
+    `companies` maps name -> logo URL used when the company is created.
+    """
+    ids = {}
+    names = list(companies)
+    for chunk in _chunks(names):
+        for company in db.query(Company).filter(Company.name.in_(chunk)):
+            ids.setdefault(company.name, company.id)
+
+    missing = [{"name": name, "logo_url": companies[name]} for name in names if name not in ids]
+    for chunk in _chunks(missing):
+        for company in db.scalars(insert(Company).returning(Company), chunk):
+            ids[company.name] = company.id
+    return ids
+
+
+def stored_jobs(db: Session, keys: List[tuple]) -> Dict[tuple, tuple]:
+    """(title, location, company name) of the existing jobs among (external_id, source) keys"""
+    wanted = set(keys)
+    found = {}
+    for chunk in _chunks([external_id for external_id, _ in keys]):
+        rows = db.query(Job.external_id, Job.source, Job.title, Job.location, Company.name).outerjoin(
+            Company, Job.company_id == Company.id
+        ).filter(Job.external_id.in_(chunk))
+        for external_id, source, title, location, company in rows:
+            if (external_id, source) in wanted:
+                found[(external_id, source)] = (title, location, company)
+    return found
+
+
+def find_duplicates(
+    db: Session,
+    items: Dict[tuple, dict],
+    companies: Dict[tuple, Optional[str]],
+    stored: Set[tuple]
+) -> Tuple[Dict[tuple, tuple], Dict[tuple, int]]:
+    """Batch items (by (external_id, source)) that repeat a posting from another source.
+
+    Returns in-batch repeats mapped to the earlier key they duplicate, and
+    items matching an existing job's dedup_key under another source mapped to
+    that job's id. An item whose own (external_id, source) row already exists
+    (`stored`) is an update, never a duplicate.
+    """
+    index = DedupIndex()
+    repeats = {}
+    for key, fields in items.items():
+        original = index.find_or_add(
+            key, key[1], companies[key], fields.get("title"), fields.get("location"), fields.get("description")
+        )
+        if original is not None:
+            repeats[key] = original
+
+    keys = {key: fields["dedup_key"] for key, fields in items.items()
+            if fields.get("dedup_key") and key not in repeats}
+    matches = {}
+    for chunk in _chunks(list(set(keys.values()))):
+        rows = db.query(Job.dedup_key, Job.id, Job.external_id, Job.source).filter(
+            Job.dedup_key.in_(chunk),
+            Job.is_active == True
+        ).order_by(Job.id)
+        for key_hash, job_id, external_id, source in rows:
+            matches.setdefault(key_hash, []).append((job_id, (external_id, source)))
+
+    existing = {}
+    for key, key_hash in keys.items():
+        found = [job_id for job_id, (_, source) in matches.get(key_hash, []) if source != key[1]]
+        if found:
+            existing[key] = found[0]
+
+    # Items whose own row exists (re-sent, or with a changed title or location) are updates
+    repeats = {key: original for key, original in repeats.items() if key not in stored}
+    existing = {key: job_id for key, job_id in existing.items() if key not in stored}
+    return repeats, existing
+
+
 @router.post("/batch", response_model=List[JobResponse])
 def create_jobs_batch(jobs_data: List[JobCreate], db: Session = Depends(get_db)):
-    """Create or update multiple jobs"""
-    results = []
+    """Create or update multiple jobs in a single transaction.
+
+    Companies are resolved in bulk (and created only for new jobs), then jobs
+    are upserted with INSERT ... ON CONFLICT (external_id, source) DO UPDATE.
+    As with create_job, an existing job only gets the fields present in the
+    request and keeps its company; its dedup_key is computed from the values
+    it has after the update.
+
+    Cross-source duplicates (see api/dedup.py) are not written: an item that
+    repeats an earlier item, or an existing job under another external id or
+    source, returns that job instead, and existing jobs get last_seen_at
+    touched.
+    """
+    if not jobs_data:
+        return []
+
+    # Merge repeated (external_id, source) items in order, as sequential create_job calls would
+    fields_by_key = {}
+    company_by_key = {}
     for job_data in jobs_data:
-        result = create_job(job_data, db)
-        results.append(result)
+        key = (job_data.external_id, job_data.source)
+        fields = job_data.model_dump(exclude_unset=True)
+        fields_by_key[key] = {**fields_by_key.get(key, {}), **fields}
+        company_by_key.setdefault(key, (job_data.company_name, job_data.company_logo))
+
+    # Dedup keys from the values each row will have: existing rows keep their company
+    stored = stored_jobs(db, list(fields_by_key))
+    persisted_companies = {}
+    for key, fields in fields_by_key.items():
+        if key in stored:
+            title, location, company = stored[key]
+            title = fields.get("title", title)
+            location = fields["location"] if "location" in fields else location
+        else:
+            company, title, location = company_by_key[key][0], fields.get("title"), fields.get("location")
+        persisted_companies[key] = company
+        fields["dedup_key"] = dedup_key(company, title, location)
+
+    repeats, duplicates = find_duplicates(db, fields_by_key, persisted_companies, set(stored))
+    for key in [*repeats, *duplicates]:
+        del fields_by_key[key]
+        del company_by_key[key]
+
+    # Only inserted rows need a company; updates keep theirs
+    companies = {}
+    for key, (name, logo) in company_by_key.items():
+        if name and key not in stored:
+            companies.setdefault(name, logo)
+    company_ids = resolve_companies(db, companies)
+
+    # One statement per shape of request, so each updates exactly the fields it was sent
+    groups = {}
+    for key, fields in fields_by_key.items():
+        update_fields = frozenset(fields).intersection(JOB_FIELDS + ["dedup_key"]) - {"external_id", "source"}
+        groups.setdefault(update_fields, []).append(key)
+
+    jobs_by_key = {}
+    for update_fields, keys in groups.items():
+        rows = []
+        for key in keys:
+            fields = fields_by_key[key]
+            row = {field: fields.get(field) for field in JOB_FIELDS}
+            row["company_id"] = None if key in stored else company_ids.get(company_by_key[key][0])
+            row["dedup_key"] = fields.get("dedup_key")
+            rows.append(row)
+
+        stmt = dialect_insert(db, Job)
+        update = {field: stmt.excluded[field] for field in update_fields}
+        update["last_seen_at"] = func.now()
+        update["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=["external_id", "source"], set_=update)
+
+        # executemany form: compiled once, batched into multi-row INSERTs by SQLAlchemy
+        upserted = db.scalars(stmt.returning(Job), rows, execution_options={"populate_existing": True})
+        for job in upserted:
+            jobs_by_key[(job.external_id, job.source)] = job
+
+    # Duplicates of existing jobs: touch last_seen_at in bulk and answer with those jobs
+    if duplicates:
+        job_ids = list(set(duplicates.values()))
+        for chunk in _chunks(job_ids):
+            db.query(Job).filter(Job.id.in_(chunk)).update(
+                {Job.last_seen_at: func.now()}, synchronize_session=False
+            )
+        existing_jobs = {}
+        for chunk in _chunks(job_ids):
+            existing_jobs.update((job.id, job) for job in db.query(Job).populate_existing().filter(Job.id.in_(chunk)))
+        for key, job_id in duplicates.items():
+            jobs_by_key[key] = existing_jobs[job_id]
+    for key, original in repeats.items():
+        jobs_by_key[key] = jobs_by_key[original]
+
+    # Serialize before commit expires the loaded rows
+    results = [JobResponse.model_validate(jobs_by_key[(d.external_id, d.source)]) for d in jobs_data]
+    db.commit()
+    table_versions.bump("jobs")
     return results
 
 
@@ -165,4 +485,5 @@ def delete_job(job_id: int, db: Session = Depends(get_db)):
 
     job.is_active = False
     db.commit()
+    table_versions.bump("jobs")
     return {"message": "Job deleted"}
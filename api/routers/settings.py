@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from typing import Dict
 
-from ..database import get_db
+from ..database import get_db, get_read_db
+from ..ai_clients import ai_clients
 from ..models import UserSetting
 from ..schemas.settings import SettingsUpdate, SettingsResponse
 
@@ -16,7 +17,7 @@ DEFAULT_USER_ID = 1
 
 
 @router.get("", response_model=SettingsResponse)
-def get_settings(db: Session = Depends(get_db)):
+def get_settings(db: Session = Depends(get_read_db)):
     """Get user settings"""
     settings = db.query(UserSetting).filter(
         UserSetting.user_id == DEFAULT_USER_ID
@@ -65,6 +66,8 @@ def update_settings(data: SettingsUpdate, db: Session = Depends(get_db)):
                 db.add(setting)
 
     db.commit()
+    if data.anthropic_api_key is not None or data.openai_api_key is not None:
+        ai_clients.invalidate(DEFAULT_USER_ID)
     return get_settings(db)
 
 
@@ -75,4 +78,5 @@ def clear_settings(db: Session = Depends(get_db)):
         UserSetting.user_id == DEFAULT_USER_ID
     ).delete()
     db.commit()
+    ai_clients.invalidate(DEFAULT_USER_ID)
     return {"message": "Settings cleared"}
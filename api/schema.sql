@@ -43,12 +43,13 @@ CREATE TABLE IF NOT EXISTS jobs (
     posted_date TIMESTAMP WITH TIME ZONE,
     source VARCHAR(50) NOT NULL,
     match_score DECIMAL(5,2),
+    dedup_key VARCHAR(64),
     is_active BOOLEAN DEFAULT TRUE,
     first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     last_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(external_id, source)
+    CONSTRAINT uq_jobs_external_id_source UNIQUE(external_id, source)
 );
 
 -- Job applications table
@@ -61,7 +62,7 @@ CREATE TABLE IF NOT EXISTS job_applications (
     notes TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(user_id, job_id)
+    CONSTRAINT uq_job_applications_user_id_job_id UNIQUE(user_id, job_id)
 );
 
 -- Excluded jobs table
@@ -71,7 +72,7 @@ CREATE TABLE IF NOT EXISTS excluded_jobs (
     job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
     excluded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     reason VARCHAR(255),
-    UNIQUE(user_id, job_id)
+    CONSTRAINT uq_excluded_jobs_user_id_job_id UNIQUE(user_id, job_id)
 );
 
 -- Generated documents table
@@ -82,9 +83,36 @@ CREATE TABLE IF NOT EXISTS generated_documents (
     document_type VARCHAR(50) NOT NULL,
     content TEXT NOT NULL,
     ai_model VARCHAR(100),
+    cache_key VARCHAR(64),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Background document generation tasks
+CREATE TABLE IF NOT EXISTS generation_tasks (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES user_profiles(id) ON DELETE CASCADE,
+    job_id INTEGER REFERENCES jobs(id) ON DELETE CASCADE,
+    document_type VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    error TEXT,
+    document_id INTEGER REFERENCES generated_documents(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Progress of streaming localStorage imports, so interrupted imports can resume
+CREATE TABLE IF NOT EXISTS import_progress (
+    import_id VARCHAR(64) PRIMARY KEY,
+    user_id INTEGER REFERENCES user_profiles(id) ON DELETE CASCADE,
+    status VARCHAR(20) NOT NULL DEFAULT 'running',
+    lines_committed INTEGER NOT NULL DEFAULT 0,
+    applications INTEGER NOT NULL DEFAULT 0,
+    excluded INTEGER NOT NULL DEFAULT 0,
+    jobs_created INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- User settings table
 CREATE TABLE IF NOT EXISTS user_settings (
     id SERIAL PRIMARY KEY,
@@ -96,6 +124,15 @@ CREATE TABLE IF NOT EXISTS user_settings (
     UNIQUE(user_id, setting_key)
 );
 
+-- Columns added after the first release (CREATE TABLE IF NOT EXISTS leaves existing tables as they are)
+ALTER TABLE generated_documents ADD COLUMN IF NOT EXISTS cache_key VARCHAR(64);
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS dedup_key VARCHAR(64);
+
+-- Upsert keys for databases created without them (init_db removes duplicate rows first)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_jobs_external_id_source ON jobs(external_id, source);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_job_applications_user_id_job_id ON job_applications(user_id, job_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_excluded_jobs_user_id_job_id ON excluded_jobs(user_id, job_id);
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_jobs_company_id ON jobs(company_id);
 CREATE INDEX IF NOT EXISTS idx_jobs_source ON jobs(source);
@@ -103,11 +140,15 @@ CREATE INDEX IF NOT EXISTS idx_jobs_posted_date ON jobs(posted_date DESC);
 CREATE INDEX IF NOT EXISTS idx_jobs_match_score ON jobs(match_score DESC);
 CREATE INDEX IF NOT EXISTS idx_jobs_is_active ON jobs(is_active);
 CREATE INDEX IF NOT EXISTS idx_jobs_external_id ON jobs(external_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedup_key ON jobs(dedup_key);
+CREATE INDEX IF NOT EXISTS idx_jobs_listing_order ON jobs(match_score DESC NULLS LAST, posted_date DESC NULLS LAST, id DESC) WHERE is_active;
 CREATE INDEX IF NOT EXISTS idx_job_applications_user_id ON job_applications(user_id);
 CREATE INDEX IF NOT EXISTS idx_job_applications_status ON job_applications(status);
 CREATE INDEX IF NOT EXISTS idx_excluded_jobs_user_id ON excluded_jobs(user_id);
 CREATE INDEX IF NOT EXISTS idx_generated_documents_job_id ON generated_documents(job_id);
 CREATE INDEX IF NOT EXISTS idx_generated_documents_type ON generated_documents(document_type);
+CREATE INDEX IF NOT EXISTS idx_generated_documents_cache_key ON generated_documents(cache_key);
+CREATE INDEX IF NOT EXISTS idx_generation_tasks_status ON generation_tasks(status);
 
 -- Full text search index for job descriptions
 CREATE INDEX IF NOT EXISTS idx_jobs_fts ON jobs USING gin(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')));
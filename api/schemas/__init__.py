@@ -5,7 +5,7 @@ from .job import (
 from .application import (
     ApplicationBase, ApplicationCreate, ApplicationResponse,
     ExcludedJobCreate, ExcludedJobResponse,
-    DocumentCreate, DocumentResponse
+    DocumentCreate, DocumentResponse, GenerationTaskResponse, ImportProgressResponse
 )
 from .settings import SettingsUpdate, SettingsResponse
 
@@ -14,6 +14,6 @@ __all__ = [
     "CompanyBase", "CompanyCreate", "CompanyResponse",
     "ApplicationBase", "ApplicationCreate", "ApplicationResponse",
     "ExcludedJobCreate", "ExcludedJobResponse",
-    "DocumentCreate", "DocumentResponse",
+    "DocumentCreate", "DocumentResponse", "GenerationTaskResponse", "ImportProgressResponse",
     "SettingsUpdate", "SettingsResponse",
 ]
@@ -1,5 +1,5 @@
 """
-Application, Exclusion, and Document Pydantic schemas
+Application, Exclusion, Document, Generation task, and Import progress Pydantic schemas
 """
 from pydantic import BaseModel
 from typing import Optional, List
@@ -58,6 +58,8 @@ class DocumentCreate(BaseModel):
     document_type: str  # 'cover_letter' or 'resume'
     # Optional: provide job data if job doesn't exist yet
     job_data: Optional[dict] = None
+    # Skip the generation cache and always call the AI provider
+    regenerate: bool = False
 
 
 class DocumentResponse(BaseModel):
@@ -71,3 +73,29 @@ class DocumentResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class GenerationTaskResponse(BaseModel):
+    id: int
+    job_id: int
+    document_type: str
+    status: str  # 'pending', 'running', 'completed' or 'failed'
+    error: Optional[str] = None
+    document: Optional[DocumentResponse] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ImportProgressResponse(BaseModel):
+    import_id: str
+    status: str  # 'running' or 'completed'
+    lines_committed: int
+    applications: int
+    excluded: int
+    jobs_created: int
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -54,6 +54,8 @@ class JobResponse(JobBase):
     created_at: datetime
     is_applied: Optional[bool] = False
     is_excluded: Optional[bool] = False
+    # Highlighted match context, only set for full-text search results
+    snippet: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -61,6 +63,8 @@ class JobResponse(JobBase):
 
 class JobListResponse(BaseModel):
     jobs: List[JobResponse]
-    total: int
+    total: Optional[int] = None
+    total_estimated: bool = False
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,109 @@
+"""
+Full-text search over job titles and descriptions
+
+PostgreSQL uses the idx_jobs_fts GIN index from schema.sql; SQLite uses an
+FTS5 table kept in sync by triggers, so search can be tested locally.
+"""
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text, func, literal, literal_column, Integer, Float
+from sqlalchemy.orm import Session, Query
+
+from .models import Job
+
+# Must match the idx_jobs_fts expression in schema.sql exactly, or PostgreSQL won't use the index
+JOB_TSVECTOR = literal_column(
+    "to_tsvector('english', coalesce(jobs.title, '') || ' ' || coalesce(jobs.description, ''))"
+)
+
+# ts_headline / snippet() settings for highlighted search results
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5, StartSel=<mark>, StopSel=</mark>"
+SNIPPET_TOKENS = 20
+
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE jobs_fts USING fts5(
+        title, description, content='jobs', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def init_search(engine):
+    """Create the SQLite FTS5 index (PostgreSQL's GIN index comes from schema.sql)"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'"
+        ).first()
+        if exists:
+            return
+        for ddl in SQLITE_FTS_DDL:
+            conn.exec_driver_sql(ddl)
+        # Index rows that existed before the FTS table
+        conn.exec_driver_sql("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def _fts5_query(search: str) -> str:
+    """Quote each term so user input can't break FTS5 syntax (terms are ANDed)"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in search.split())
+
+
+def apply_search(db: Session, query: Query, search: str) -> Tuple[Query, object]:
+    """Filter `query` to jobs matching `search`.
+
+    Returns the filtered query and a relevance expression (higher is better)
+    to order by.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(literal_column("'english'"), search)
+        return query.filter(JOB_TSVECTOR.op("@@")(tsquery)), func.ts_rank(JOB_TSVECTOR, tsquery)
+
+    if dialect == "sqlite":
+        matches = text(
+            "SELECT rowid AS job_id, bm25(jobs_fts, 2.0, 1.0) AS rank FROM jobs_fts WHERE jobs_fts MATCH :search"
+        ).bindparams(search=_fts5_query(search)).columns(job_id=Integer, rank=Float).subquery()
+        # bm25() is lower for better matches; title hits count double
+        return query.join(matches, matches.c.job_id == Job.id), -matches.c.rank
+
+    return query.filter(Job.title.ilike(f"%{search}%") | Job.description.ilike(f"%{search}%")), literal(0)
+
+
+def search_snippets(db: Session, job_ids: List[int], search: str) -> Dict[int, str]:
+    """Highlighted description fragments for a page of search results"""
+    if not job_ids:
+        return {}
+
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        rows = db.execute(text(
+            "SELECT id, ts_headline('english', coalesce(description, ''), "
+            "websearch_to_tsquery('english', :search), :options) "
+            "FROM jobs WHERE id = ANY(:ids)"
+        ), {"search": search, "options": HEADLINE_OPTIONS, "ids": list(job_ids)})
+        return dict(rows.all())
+
+    if dialect == "sqlite":
+        placeholders = ", ".join(str(int(job_id)) for job_id in job_ids)
+        rows = db.execute(text(
+            f"SELECT rowid, snippet(jobs_fts, 1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS}) "
+            f"FROM jobs_fts WHERE jobs_fts MATCH :search AND rowid IN ({placeholders})"
+        ), {"search": _fts5_query(search)})
+        return dict(rows.all())
+
+    return {}
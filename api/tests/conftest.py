@@ -0,0 +1,35 @@
+"""
+Shared fixtures: the API runs against a throwaway SQLite database
+"""
+import os
+import tempfile
+
+# Must be set before api.config is imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+import pytest
+from sqlalchemy import text
+
+from api.database import Base, SessionLocal, engine, init_db
+from api.llm_cache import generation_cache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield engine
+
+
+@pytest.fixture
+def db():
+    """A session on empty tables"""
+    generation_cache.clear()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name != "user_profiles":
+                conn.execute(text(f"DELETE FROM {table.name}"))
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,91 @@
+"""
+init_db migrations for databases created by an older schema
+"""
+import os
+import tempfile
+
+from sqlalchemy import create_engine, inspect
+
+from api.database import add_missing_columns, add_missing_unique_keys
+
+
+def test_add_missing_columns_upgrades_old_tables():
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "old.db"))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, external_id VARCHAR(255) NOT NULL, "
+            "title VARCHAR(500) NOT NULL, source VARCHAR(50) NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE generated_documents (id INTEGER PRIMARY KEY, job_id INTEGER, "
+            "document_type VARCHAR(50) NOT NULL, content TEXT NOT NULL)"
+        )
+
+    add_missing_columns(engine)
+    add_missing_columns(engine)  # idempotent
+
+    inspector = inspect(engine)
+    assert "dedup_key" in {column["name"] for column in inspector.get_columns("jobs")}
+    assert any(index["column_names"] == ["dedup_key"] for index in inspector.get_indexes("jobs"))
+    assert "cache_key" in {column["name"] for column in inspector.get_columns("generated_documents")}
+    assert any(index["column_names"] == ["cache_key"] for index in inspector.get_indexes("generated_documents"))
+
+
+def test_add_missing_unique_keys_upgrades_baseline_jobs():
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "baseline.db"))
+    with engine.begin() as conn:
+        # jobs as the baseline init_db created it: no UNIQUE(external_id, source)
+        conn.exec_driver_sql(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, external_id VARCHAR(255) NOT NULL, "
+            "title VARCHAR(500) NOT NULL, source VARCHAR(50) NOT NULL, dedup_key VARCHAR(64))"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE job_applications (id INTEGER PRIMARY KEY, user_id INTEGER, job_id INTEGER)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO jobs (id, external_id, title, source) VALUES "
+            "(1, 'a', 'Engineer', 'greenhouse'), (2, 'a', 'Engineer', 'greenhouse'), "
+            "(3, 'a', 'Engineer', 'lever')"
+        )
+        conn.exec_driver_sql("INSERT INTO job_applications (user_id, job_id) VALUES (1, 2)")
+
+    add_missing_unique_keys(engine)
+    add_missing_unique_keys(engine)  # idempotent
+
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql("SELECT id FROM jobs ORDER BY id").scalars().all() == [1, 3]
+        assert conn.exec_driver_sql("SELECT job_id FROM job_applications").scalar() == 1
+        conn.exec_driver_sql(
+            "INSERT INTO jobs (external_id, title, source) VALUES ('a', 'Staff Engineer', 'greenhouse') "
+            "ON CONFLICT (external_id, source) DO UPDATE SET title = excluded.title"
+        )
+        assert conn.exec_driver_sql("SELECT title FROM jobs WHERE id = 1").scalar() == "Staff Engineer"
+
+
+def test_add_missing_unique_keys_dedupes_user_job_pairs():
+    engine = create_engine("sqlite:///" + os.path.join(tempfile.mkdtemp(), "baseline.db"))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, external_id VARCHAR(255) NOT NULL, "
+            "title VARCHAR(500) NOT NULL, source VARCHAR(50) NOT NULL)"
+        )
+        for table in ("job_applications", "excluded_jobs"):
+            conn.exec_driver_sql(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, user_id INTEGER, job_id INTEGER)")
+        conn.exec_driver_sql(
+            "INSERT INTO jobs (id, external_id, title, source) VALUES "
+            "(1, 'a', 'Engineer', 'greenhouse'), (2, 'a', 'Engineer', 'greenhouse')"
+        )
+        # The second application becomes a duplicate once job 2 is merged into job 1
+        conn.exec_driver_sql("INSERT INTO job_applications (user_id, job_id) VALUES (1, 1), (1, 2)")
+        conn.exec_driver_sql("INSERT INTO excluded_jobs (user_id, job_id) VALUES (1, 1), (1, 1), (2, 1)")
+
+    add_missing_unique_keys(engine)
+
+    with engine.begin() as conn:
+        assert conn.exec_driver_sql("SELECT user_id, job_id FROM job_applications").all() == [(1, 1)]
+        assert conn.exec_driver_sql("SELECT user_id, job_id FROM excluded_jobs ORDER BY id").all() == [(1, 1), (2, 1)]
+        for table, count in (("job_applications", 1), ("excluded_jobs", 2)):
+            conn.exec_driver_sql(
+                f"INSERT INTO {table} (user_id, job_id) VALUES (1, 1) ON CONFLICT (user_id, job_id) DO NOTHING"
+            )
+            assert conn.exec_driver_sql(f"SELECT COUNT(*) FROM {table}").scalar() == count
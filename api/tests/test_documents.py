@@ -0,0 +1,118 @@
+"""
+Document generation: the content-addressed cache and the jobs it answers for
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from api.models import Job
+from api.routers.documents import generate_cover_letter, get_documents
+from api.schemas.application import DocumentCreate
+
+
+class FakeAnthropic:
+    """Counts completions; each returns a distinct text"""
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=f"Cover letter {self.calls}")])
+
+
+def add_job(db, external_id):
+    job = Job(external_id=external_id, source="test", title="Platform Engineer",
+              description="Run our Kubernetes platform")
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def generate(job_id, db, ai, **params):
+    return asyncio.run(generate_cover_letter(DocumentCreate(job_id=job_id, document_type="cover_letter"),
+                                             db=db, ai=ai, **params))
+
+
+def test_cached_document_is_per_job(db):
+    first, second = add_job(db, "1"), add_job(db, "2")
+    client = FakeAnthropic()
+    ai = (client, "anthropic")
+
+    one = generate(first, db, ai)
+    again = generate(first, db, ai)
+    assert again.id == one.id and client.calls == 1
+
+    # Same title and description, so the same cache key: the text is reused, the document is job 2's own
+    two = generate(second, db, ai)
+    assert client.calls == 1
+    assert two.job_id == second and two.id != one.id
+    assert two.content == one.content
+    assert [doc.id for doc in get_documents(second, db=db)] == [two.id]
+    assert [doc.id for doc in get_documents(first, db=db)] == [one.id]
+
+
+class FakeAnthropicStream(FakeAnthropic):
+    """Streams two chunks; records whether the request session was still open mid-stream"""
+
+    def __init__(self, db):
+        super().__init__()
+        self.db = db
+        self.session_open = None
+
+    @contextmanager
+    def stream(self, **kwargs):
+        self.session_open = self.db.in_transaction()
+        yield SimpleNamespace(text_stream=iter(["Dear ", "team"]))
+
+
+def test_stream_releases_request_session(db):
+    job_id = add_job(db, "1")
+    db.query(Job).count()  # the session now holds a connection
+    client = FakeAnthropicStream(db)
+
+    response = generate(job_id, db, (client, "anthropic"), stream=True)
+
+    async def read():
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    body = asyncio.run(read())
+
+    assert client.session_open is False
+    assert "event: done" in body
+    assert [doc.content for doc in get_documents(job_id, db=db)] == ["Dear team"]
+
+
+class SlowAnthropic(FakeAnthropic):
+    """Blocks each completion until released, recording the thread it ran on"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.threads = []
+
+    def create(self, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(5)
+        return super().create(**kwargs)
+
+
+def test_generation_runs_on_the_generation_pool(db):
+    job_id = add_job(db, "1")
+    client = SlowAnthropic()
+
+    async def request_while_generating():
+        pending = asyncio.ensure_future(generate_cover_letter(
+            DocumentCreate(job_id=job_id, document_type="cover_letter"), db=db, ai=(client, "anthropic")))
+        # The event loop keeps running while the LLM call is in flight
+        while not client.threads:
+            await asyncio.sleep(0.01)
+        client.release.set()
+        return await pending
+
+    document = asyncio.run(request_while_generating())
+
+    assert client.threads[0].startswith("generation")
+    assert document.job_id == job_id and document.content == "Cover letter 1"
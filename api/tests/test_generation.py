@@ -0,0 +1,26 @@
+"""
+The bounded generation pool
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.generation import GenerationQueue
+
+
+class RejectingExecutor(ThreadPoolExecutor):
+    def submit(self, fn, *args, **kwargs):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+
+def test_rejected_submit_gives_its_slot_back():
+    queue = GenerationQueue(workers=1, max_pending=1)
+    queue._executor = RejectingExecutor(max_workers=1)
+    with pytest.raises(RuntimeError):
+        queue.submit(print)
+
+    queue._executor = None
+    try:
+        assert queue.submit(lambda: None)
+    finally:
+        queue.shutdown()
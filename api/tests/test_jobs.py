@@ -0,0 +1,55 @@
+"""
+POST /api/jobs/batch: upserts and cross-source dedup
+"""
+from api.dedup import dedup_key
+from api.models import Company, Job
+from api.routers.jobs import create_jobs_batch
+from api.schemas.job import JobCreate
+
+DESCRIPTION = "We are hiring a backend engineer to build and run our payments platform on Kubernetes and Postgres"
+
+
+def listing(external_id, source, description=DESCRIPTION, **fields):
+    return JobCreate(external_id=external_id, source=source, company_name="Acme Inc", title="Backend Engineer",
+                     location="Remote", description=description, **fields)
+
+
+def test_cross_source_duplicate_returns_existing_job(db):
+    first, = create_jobs_batch([listing("1", "a")], db)
+    result = create_jobs_batch([listing("9", "b")], db)
+    assert [(job.id, job.external_id) for job in result] == [(first.id, "1")]
+
+
+def test_same_source_listings_are_not_merged(db):
+    result = create_jobs_batch([
+        listing("1", "a"),
+        listing("2", "a", description="A second opening on the platform team, working on the ledger and reporting"),
+        listing("3", "b"),
+    ], db)
+    assert [job.external_id for job in result] == ["1", "2", "1"]
+    assert result[0].id != result[1].id
+    assert result[2].id == result[0].id
+
+    # An existing row from the same source doesn't swallow a new listing either
+    fourth, = create_jobs_batch([listing("4", "a")], db)
+    assert fourth.external_id == "4"
+
+
+def test_own_row_is_updated_not_replaced(db):
+    create_jobs_batch([listing("1", "a"), listing("2", "b")], db)
+    # "2" was a duplicate of "1"; once stored under its own key it is always updated in place
+    create_jobs_batch([listing("2", "b", salary="100k")], db)
+    updated, = create_jobs_batch([listing("1", "a", salary="120k")], db)
+    assert (updated.external_id, updated.salary) == ("1", "120k")
+
+
+def test_update_keeps_company_and_key_from_stored_values(db):
+    original, = create_jobs_batch([listing("1", "a")], db)
+    companies = db.query(Company).count()
+
+    # Re-sent under another company name: still an update, so no new company and the same key
+    updated, = create_jobs_batch([listing("1", "a").model_copy(update={"company_name": "Other Corp"})], db)
+    assert updated.id == original.id
+    assert updated.company_id == original.company_id
+    assert db.query(Company).count() == companies
+    assert db.get(Job, updated.id).dedup_key == dedup_key("Acme Inc", "Backend Engineer", "Remote")
@@ -0,0 +1,54 @@
+"""
+NDJSON import stream parsing
+"""
+import asyncio
+import time
+
+import pytest
+
+from api.migration import ImportBatch, ndjson_lines, parse_line
+
+
+def split(chunks, max_line=1 << 20):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [line async for line in ndjson_lines(stream(), max_line)]
+
+    return asyncio.run(collect())
+
+
+def test_lines_across_chunk_boundaries():
+    chunks = [b'{"a"', b": 1}\n\n{", b'"b": 2}\n{"c": 3}', b"\n", b'{"d": 4}']
+    assert split(chunks) == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}', b'{"d": 4}']
+
+
+def test_long_line_in_small_chunks_is_linear():
+    line = b"x" * 4_000_000
+    chunks = [line[i:i + 64] for i in range(0, len(line), 64)] + [b"\nnext\n"]
+    started = time.perf_counter()
+    assert split(chunks, max_line=len(line)) == [line, b"next"]
+    assert time.perf_counter() - started < 5
+
+
+def test_line_limit():
+    with pytest.raises(ValueError):
+        split([b"x" * 10, b"x" * 10], max_line=15)
+
+
+@pytest.mark.parametrize("line", [
+    b"[1, 2]",
+    b'"x"',
+    b'{"type": "applied", "id": 1, "data": [1, 2]}',
+    b'{"type": "applied", "id": 1, "data": "x"}',
+    b'{"applied_jobs": "abc"}',
+    b'{"applied_jobs_data": [1, 2]}',
+    b'{"applied_jobs": ["1"], "applied_jobs_data": {"1": "x"}}',
+])
+def test_non_object_values_are_rejected_with_line_number(line):
+    batch = ImportBatch()
+    with pytest.raises(ValueError, match="^Line 7: expected"):
+        parse_line(batch, line, 7)
+    assert len(batch) == 0
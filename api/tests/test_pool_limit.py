@@ -0,0 +1,48 @@
+"""
+PoolConcurrencyLimit: which requests take a slot, and for how long
+"""
+import asyncio
+
+from api.database import PoolConcurrencyLimit
+
+
+def run_requests(limit, paths, app):
+    """Start a request per path at once; returns the paths in completion order"""
+    middleware = PoolConcurrencyLimit(app, limit=limit, prefix="/api/", exempt=("/api/health",))
+    done = []
+
+    async def request(path):
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        await middleware({"type": "http", "path": path}, receive, send)
+        done.append(path)
+
+    async def main():
+        await asyncio.wait_for(asyncio.gather(*(request(path) for path in paths)), timeout=5)
+
+    asyncio.run(main())
+    return done
+
+
+def test_health_and_streams_do_not_hold_slots():
+    finish_stream = None
+
+    async def app(scope, receive, send):
+        nonlocal finish_stream
+        if scope["path"] == "/api/stream":
+            finish_stream = asyncio.Event()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await finish_stream.wait()
+        else:
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"0")]})
+            if finish_stream is not None and scope["path"] == "/api/jobs":
+                finish_stream.set()
+        await send({"type": "http.response.body", "body": b""})
+
+    # With one slot, /api/jobs only finishes if the open stream released its slot
+    done = run_requests(1, ["/api/stream", "/api/health", "/api/jobs"], app)
+    assert done == ["/api/health", "/api/jobs", "/api/stream"]
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Job Search Automation Tool
+---------------------------------------------
+Runs the tool's hot paths against local stub servers and synthetic data so
+results are reproducible and never touch the real job APIs.
+
+Usage:
+    python benchmark.py fetch --latency 0.5
+    python benchmark.py incremental --jobs 5000 --changed 0.1
+    python benchmark.py http-cache --latency 0.5
+    python benchmark.py memory --jobs 200000
+    python benchmark.py output --jobs 1000000
+    python benchmark.py adzuna-pages --pages 200
+    python benchmark.py match --jobs 10000 100000 --extra-skills 150
+    python benchmark.py rank --jobs 100000 --top 10
+    python benchmark.py dedup --postings 10000 100000
+    python benchmark.py parallel --jobs 200000 --workers 1 2 4 8 16
+    python benchmark.py generate --jobs 20 --latency 0.5 --concurrency 1 8
+"""
+
+import os
+import json
+import hashlib
+import time
+import random
+import argparse
+import threading
+import tempfile
+import tracemalloc
+import pickle
+from types import SimpleNamespace
+from dataclasses import dataclass, asdict
+from typing import Optional
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import job_automation
+from job_automation import (
+    JobSearcher, JobMatcher, JobListing, ResumeProfile, DocumentGenerator, ADZUNA_PAGE_SIZE,
+    TITLE_KEYWORDS, AHOCORASICK_AVAILABLE, IngestState, HTTPCache, OfflineCacheMiss, JobBatch, dedupe_jobs,
+    generate_documents, save_results, OUTPUT_FORMATS, JobWriter, load_results, check_output_format
+)
+
+# Words used to build synthetic job descriptions
+_VOCABULARY = (
+    "we are hiring a senior engineer to join our team and build scalable cloud infrastructure "
+    "kubernetes terraform aws azure gcp python golang java react frontend backend data pipelines "
+    "experience with ci/cd github actions jenkins monitoring prometheus grafana datadog on-call "
+    "strong communication skills benefits include healthcare 401k remote flexible hours equity "
+    "<p> </p> <li> <ul> responsibilities requirements qualifications preferred bachelor degree"
+).split()
+_TITLES = ["Senior Platform Engineer", "Cloud Architect", "Frontend Developer", "Data Analyst",
+           "Director of Infrastructure", "SRE Lead", "Product Manager", "ML Engineer"]
+
+
+def _fake_posting(i: int) -> dict:
+    """A single posting with the fields every source shares"""
+    return {
+        "title": f"Senior Platform Engineer {i}",
+        "company_name": f"Company {i % 50}",
+        "description": "Kubernetes Terraform AWS GPU infrastructure " * 20,
+        "url": f"https://example.com/jobs/{i}",
+    }
+
+
+def _stub_payloads(count: int) -> dict:
+    """Response bodies for each source, keyed by path prefix"""
+    now = datetime.now().isoformat()
+    postings = [_fake_posting(i) for i in range(count)]
+    return {
+        "/remotive": {"jobs": [{**p, "publication_date": now} for p in postings]},
+        "/arbeitnow": {"data": [{**p, "created_at": now, "location": "Berlin"} for p in postings]},
+        "/adzuna": {"results": [{
+            "title": p["title"],
+            "company": {"display_name": p["company_name"]},
+            "location": {"display_name": "New York"},
+            "description": p["description"],
+            "redirect_url": p["url"],
+            "created": now,
+        } for p in postings]},
+    }
+
+
+class StubServer:
+    """Threaded local HTTP server answering every source with injected latency.
+
+    Responses carry an ETag and honour If-None-Match; `requests` counts GETs
+    and `bytes_sent` counts body bytes.
+    """
+
+    def __init__(self, payloads: dict, latency: dict):
+        self.set_payloads(payloads)
+        self.requests = 0
+        self.bytes_sent = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests += 1
+                path = urlparse(self.path).path
+                prefix = next((p for p in server.bodies if path.startswith(p)), None)
+                if prefix is None:
+                    self.send_error(404)
+                    return
+                time.sleep(latency.get(prefix, 0))
+                body, etag = server.bodies[prefix]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                server.bytes_sent += len(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def set_payloads(self, payloads: dict):
+        bodies = {prefix: json.dumps(body).encode() for prefix, body in payloads.items()}
+        self.bodies = {prefix: (body, f'"{hashlib.sha256(body).hexdigest()[:16]}"')
+                       for prefix, body in bodies.items()}
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeAdzunaServer:
+    """Local Adzuna clone serving `pages` full pages, newest first.
+
+    Page N holds postings created N hours ago, so the `max_days_old` window
+    ends after `days * 24` pages.
+    """
+
+    def __init__(self, pages: int, latency: float = 0.0):
+        now = datetime.now()
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                page = int(url.path.rstrip("/").rsplit("/", 1)[-1])
+                size = int(parse_qs(url.query).get("results_per_page", [ADZUNA_PAGE_SIZE])[0])
+                created = (now - timedelta(hours=page)).isoformat()
+                results = [] if page > pages else [{
+                    "title": f"Cloud Architect {page}-{i}",
+                    "company": {"display_name": f"Company {i}"},
+                    "location": {"display_name": "Remote"},
+                    "description": "Kubernetes Terraform AWS platform engineering " * 40,
+                    "redirect_url": f"https://example.com/{page}/{i}",
+                    "created": created,
+                } for i in range(size)]
+                body = json.dumps({"results": results}).encode()
+                time.sleep(latency)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    __enter__ = StubServer.__enter__
+    __exit__ = StubServer.__exit__
+
+
+def synthetic_jobs(count: int, words: int = 500, seed: int = 42) -> list:
+    """Deterministic JobListings with description-sized random text"""
+    rng = random.Random(seed)
+    return [JobListing(
+        title=rng.choice(_TITLES),
+        company=f"Company {i % 500}",
+        location=rng.choice(["Remote", "New York", "Berlin", "London"]),
+        description=" ".join(rng.choices(_VOCABULARY, k=words)),
+        url=f"https://example.com/jobs/{i}",
+        posted_date=datetime.now().isoformat(),
+        source=rng.choice(["Remotive", "Arbeitnow", "Adzuna"]),
+    ) for i in range(count)]
+
+
+def _legacy_match_score(matcher: JobMatcher, job: JobListing) -> float:
+    """The original per-keyword `in` scan, kept as the reference implementation"""
+    text = f"{job.title} {job.description}".lower()
+    matches = sum(1 for kw in matcher.skill_keywords if kw in text and len(kw) > 2)
+    title_matches = sum(2 for kw in TITLE_KEYWORDS if kw in job.title.lower())
+    max_possible = len(matcher.skill_keywords) + len(TITLE_KEYWORDS) * 2
+    return round(min(100, ((matches + title_matches) / max_possible) * 100 * 2), 1)
+
+
+def bench_fetch(args):
+    """Sequential vs concurrent multi-source fetch"""
+    os.environ.setdefault("ADZUNA_APP_ID", "bench")
+    os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+
+    latency = {"/remotive": args.latency, "/arbeitnow": args.latency * 0.6, "/adzuna": args.latency * 0.8}
+    with StubServer(_stub_payloads(args.jobs), latency) as server:
+        endpoints = {
+            "Remotive": f"{server.url}/remotive",
+            "Arbeitnow": f"{server.url}/arbeitnow",
+            "Adzuna": f"{server.url}/adzuna",
+        }
+
+        searcher = JobSearcher(endpoints=endpoints)
+        started = time.perf_counter()
+        searcher.search_remotive("platform")
+        searcher.search_github_jobs_api("platform")
+        # The stub serves a single Adzuna page
+        searcher.search_adzuna("platform", max_pages=1)
+        sequential = time.perf_counter() - started
+        searcher.close()
+
+        searcher = JobSearcher(endpoints=endpoints)
+        started = time.perf_counter()
+        searcher.search_all("platform", max_pages=1)
+        concurrent = time.perf_counter() - started
+        searcher.close()
+
+    print(f"\nSlowest source latency: {max(latency.values()):.2f}s")
+    print(f"Sequential: {sequential:.2f}s")
+    print(f"Concurrent: {concurrent:.2f}s ({sequential / concurrent:.1f}x faster)")
+
+
+def bench_incremental(args):
+    """Full re-ingestion vs incremental runs over unchanged and partly changed feeds"""
+    os.environ.setdefault("ADZUNA_APP_ID", "bench")
+    os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+    profile = ResumeProfile()
+    matcher = JobMatcher(profile)
+    payloads = _stub_payloads(args.jobs)
+
+    def run(server, state=None) -> tuple:
+        endpoints = {source: f"{server.url}/{source.lower()}" for source in ("Remotive", "Arbeitnow", "Adzuna")}
+        searcher = JobSearcher(endpoints=endpoints, state=state)
+        sent = server.bytes_sent
+        started = time.perf_counter()
+        searcher.search_all("platform", max_pages=1)
+        to_score = state.diff(searcher.jobs) if state else searcher.jobs
+        matcher.rank_jobs(to_score)
+        if state:
+            state.record(searcher.jobs, searcher.completed)
+            state.save()
+        elapsed = time.perf_counter() - started
+        searcher.close()
+        scores = sorted((job.source, job.url, job.match_score) for job in searcher.jobs)
+        return elapsed, server.bytes_sent - sent, len(to_score), scores
+
+    def report(label, result):
+        elapsed, sent, scored, _ = result
+        print(f"{label:<28} {elapsed * 1000:7.0f} ms  {sent / 1e6:6.1f} MB  {scored:6d} jobs scored")
+
+    with tempfile.TemporaryDirectory() as tmpdir, StubServer(payloads, {}) as server:
+        state_path = os.path.join(tmpdir, "state.json")
+        report("full (no state)", run(server))
+        report("incremental, first run", run(server, IngestState(state_path, profile)))
+        unchanged = run(server, IngestState(state_path, profile))
+        report("incremental, unchanged", unchanged)
+
+        # Edit a fraction of the postings in every feed
+        rng = random.Random(42)
+        for i in rng.sample(range(args.jobs), int(args.jobs * args.changed)):
+            for key, field in (("/remotive", "jobs"), ("/arbeitnow", "data"), ("/adzuna", "results")):
+                payloads[key][field][i]["description"] = "GPU " + payloads[key][field][i]["description"]
+        server.set_payloads(payloads)
+        changed = run(server, IngestState(state_path, profile))
+        report(f"incremental, {args.changed:.0%} changed", changed)
+        full = run(server)
+    assert changed[3] == full[3], "incremental scores differ from a full run"
+
+
+def bench_http_cache(args):
+    """Network fetch vs fresh cache hits vs stale revalidation vs offline replay"""
+    os.environ.setdefault("ADZUNA_APP_ID", "bench")
+    os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+    latency = {"/remotive": args.latency, "/arbeitnow": args.latency * 0.6, "/adzuna": args.latency * 0.8}
+
+    with tempfile.TemporaryDirectory() as cache_dir, StubServer(_stub_payloads(args.jobs), latency) as server:
+        endpoints = {source: f"{server.url}/{source.lower()}" for source in ("Remotive", "Arbeitnow", "Adzuna")}
+
+        def run(label, cache):
+            searcher = JobSearcher(endpoints=endpoints, cache=cache)
+            before, sent = server.requests, server.bytes_sent
+            started = time.perf_counter()
+            searcher.search_all("platform", max_pages=1)
+            elapsed = time.perf_counter() - started
+            searcher.close()
+            print(f"{label:<22} {elapsed * 1000:7.0f} ms  {server.requests - before} requests  "
+                  f"{(server.bytes_sent - sent) / 1000:6.0f} KB")
+            return sorted(json.dumps(asdict(job), sort_keys=True) for job in searcher.jobs)
+
+        network = run("network (cold cache)", HTTPCache(cache_dir))
+        fresh = run("fresh cache hits", HTTPCache(cache_dir))
+        revalidated = run("stale, 304 revalidated", HTTPCache(cache_dir, ttls={s: 0 for s in endpoints}))
+        offline = run("offline replay", HTTPCache(cache_dir, offline=True))
+        assert network == fresh == revalidated == offline, "cached runs returned different jobs"
+
+        # Offline mode never falls through to the network
+        with tempfile.TemporaryDirectory() as empty_dir:
+            searcher = JobSearcher(endpoints=endpoints, cache=HTTPCache(empty_dir, offline=True))
+            before = server.requests
+            try:
+                searcher._fetch_remotive("platform")
+                raise AssertionError("offline miss reached the network")
+            except OfflineCacheMiss:
+                pass
+            assert server.requests == before
+
+
+def bench_adzuna_pages(args):
+    """Stream Adzuna pages into matching and NDJSON output; peak memory should stay flat"""
+    os.environ.setdefault("ADZUNA_APP_ID", "bench")
+    os.environ.setdefault("ADZUNA_APP_KEY", "bench")
+    matcher = JobMatcher(ResumeProfile())
+    output = os.path.join(args.output, "adzuna_stream.ndjson")
+    os.makedirs(args.output, exist_ok=True)
+
+    with FakeAdzunaServer(args.pages) as server:
+        for max_pages in (args.pages // 10 or 1, args.pages):
+            searcher = JobSearcher(endpoints={"Adzuna": server.url})
+            tracemalloc.start()
+            started = time.perf_counter()
+            count = 0
+            with JobWriter(output, "ndjson") as writer:
+                # days is large enough that every page is inside the window
+                for page in searcher.iter_adzuna_pages("cloud", days=args.pages, max_pages=max_pages):
+                    writer.write_jobs(matcher.rank_jobs(page))
+                    count += len(page)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            searcher.close()
+            print(f"{max_pages:>5} pages / {count:>6} jobs: {elapsed:.2f}s, peak {peak / 1e6:.1f} MB")
+
+        # Early stop: a 1-day window covers only the first 24 hourly pages
+        searcher = JobSearcher(endpoints={"Adzuna": server.url})
+        pages = sum(1 for _ in searcher.iter_adzuna_pages("cloud", days=1, max_pages=args.pages))
+        searcher.close()
+        print(f"days=1 stopped after {pages} of {args.pages} pages")
+
+
+def bench_match(args):
+    """Per-keyword scan vs compiled keyword matcher; scores must be identical"""
+    profile = ResumeProfile()
+    # Pad the profile to model a richer skills list
+    profile.skills += [f"Tool{i} Framework{i}" for i in range(args.extra_skills // 2)]
+    matcher = JobMatcher(profile)
+    print(f"Aho-Corasick available: {AHOCORASICK_AVAILABLE}, {len(matcher.skill_keywords)} keywords")
+
+    for count in args.jobs:
+        jobs = synthetic_jobs(count)
+
+        started = time.perf_counter()
+        legacy = [_legacy_match_score(matcher, job) for job in jobs]
+        legacy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        compiled = [matcher.calculate_match_score(job) for job in jobs]
+        compiled_time = time.perf_counter() - started
+
+        assert compiled == legacy, "compiled matcher scores differ from the reference"
+        print(f"{count:>7} jobs: legacy {legacy_time:.2f}s, compiled {compiled_time:.2f}s "
+              f"({legacy_time / compiled_time:.1f}x)")
+
+
+def bench_rank(args):
+    """Per-job scoring + full sort vs batch scoring + top-K selection"""
+    matcher = JobMatcher(ResumeProfile())
+    jobs = synthetic_jobs(args.jobs, words=args.words)
+
+    started = time.perf_counter()
+    for job in jobs:
+        job.match_score = _legacy_match_score(matcher, job)
+    legacy = sorted(jobs, key=lambda x: x.match_score or 0, reverse=True)
+    legacy_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ranked = matcher.rank_jobs(jobs)
+    full_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    top = matcher.rank_jobs(jobs, top=args.top)
+    top_time = time.perf_counter() - started
+
+    assert [id(j) for j in ranked] == [id(j) for j in legacy], "batch ranking differs from the reference"
+    assert [id(j) for j in top] == [id(j) for j in legacy[:args.top]], "top-K differs from the reference"
+    print(f"{args.jobs} jobs: legacy {legacy_time:.2f}s, batch {full_time:.2f}s, "
+          f"batch top-{args.top} {top_time:.2f}s")
+
+
+def cross_source_jobs(postings: int, seed: int = 42) -> list:
+    """Each posting listed by one to three sources, formatted the way each source does.
+
+    The url is "<posting>/<source>", so duplicates can be checked afterwards.
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(postings):
+        title = rng.choice(_TITLES)
+        description = " ".join(rng.choices(_VOCABULARY, k=150))
+        for source in rng.sample(["Remotive", "Arbeitnow", "Adzuna"], rng.randint(1, 3)):
+            jobs.append(JobListing(
+                title={"Remotive": title, "Arbeitnow": title.replace("Senior", "Sr."), "Adzuna": title}[source],
+                company={"Remotive": f"Company {i}", "Arbeitnow": f"Company {i} GmbH", "Adzuna": f"COMPANY {i}, Inc."}[source],
+                location={"Remotive": "Remote", "Arbeitnow": "Berlin", "Adzuna": "Remote (US)"}[source],
+                description={"Remotive": f"<p>{description}</p>", "Arbeitnow": description[:500],
+                             "Adzuna": description}[source],
+                url=f"{i}/{source}",
+                posted_date=datetime.now().isoformat(),
+                source=source,
+            ))
+    rng.shuffle(jobs)
+    return jobs
+
+
+def bench_dedup(args):
+    """Cross-source dedup time and accuracy, and the ranking work it saves"""
+    matcher = JobMatcher(ResumeProfile())
+    for postings in args.postings:
+        jobs = cross_source_jobs(postings)
+
+        started = time.perf_counter()
+        unique = dedupe_jobs(jobs)
+        dedup_time = time.perf_counter() - started
+
+        kept = {job.url.split("/")[0] for job in unique}
+        merged = postings - len(kept)
+        extra = len(unique) - len(kept)
+
+        started = time.perf_counter()
+        matcher.rank_jobs(jobs)
+        rank_all = time.perf_counter() - started
+        started = time.perf_counter()
+        matcher.rank_jobs(unique)
+        rank_unique = time.perf_counter() - started
+
+        print(f"{postings} postings / {len(jobs)} listings: dedup {dedup_time:.2f}s -> {len(unique)} kept "
+              f"({extra} duplicates missed, {merged} postings wrongly merged); "
+              f"ranking {rank_all:.2f}s -> {rank_unique:.2f}s")
+
+
+@dataclass
+class LegacyJobListing:
+    """JobListing as it was before slots, for the memory comparison"""
+    title: str
+    company: str
+    location: str
+    description: str
+    url: str
+    posted_date: str
+    source: str
+    salary: Optional[str] = None
+    match_score: Optional[float] = None
+
+
+def _raw_listings(count: int, words: int) -> list:
+    """JSON lines as a source would return them, so every decoded string is a separate object"""
+    return [json.dumps(asdict(job)) for job in synthetic_jobs(count, words=words)]
+
+
+def _build_retained(lines: list, build) -> tuple:
+    """(object, bytes allocated per listing) for `build` applied to decoded lines"""
+    tracemalloc.start()
+    built = build(json.loads(line) for line in lines)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, current / len(lines)
+
+
+def _save_peak(jobs, save) -> tuple:
+    """(seconds, peak bytes, JSON bytes) of one save"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        tracemalloc.start()
+        started = time.perf_counter()
+        json_file = save(jobs, output_dir)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        with open(json_file, "rb") as f:
+            return elapsed, peak, f.read()
+
+
+def _legacy_save(jobs, output_dir):
+    json_file = os.path.join(output_dir, "jobs.json")
+    with open(json_file, "w") as f:
+        json.dump([asdict(job) for job in jobs], f, indent=2)
+    return json_file
+
+
+def bench_memory(args):
+    """Memory per listing and save cost: dataclass vs slotted JobListing vs columnar JobBatch"""
+    lines = _raw_listings(args.jobs, args.words)
+    description_bytes = sum(len(json.loads(line)["description"]) + 49 for line in lines[:1000]) / 1000
+
+    legacy, legacy_mem = _build_retained(lines, lambda rows: [LegacyJobListing(**row) for row in rows])
+    slotted, slotted_mem = _build_retained(lines, lambda rows: [JobListing(**row) for row in rows])
+    batch, batch_mem = _build_retained(lines, lambda rows: JobBatch.from_jobs(JobListing(**row) for row in rows))
+    print(f"{args.jobs} listings, ~{description_bytes:.0f} bytes of description each")
+    for label, mem in (("dataclass", legacy_mem), ("slotted JobListing", slotted_mem), ("JobBatch", batch_mem)):
+        print(f"  {label:<20} {mem:7.0f} bytes/listing ({mem - description_bytes:5.0f} excluding description)")
+
+    matcher = JobMatcher(ResumeProfile())
+    started = time.perf_counter()
+    ranked = matcher.rank_jobs(slotted)
+    list_time = time.perf_counter() - started
+    started = time.perf_counter()
+    ranked_batch = matcher.rank_batch(batch)
+    batch_time = time.perf_counter() - started
+    assert ranked_batch.url == [job.url for job in ranked], "rank_batch order differs from rank_jobs"
+    assert ranked_batch.match_score == [job.match_score for job in ranked], "rank_batch scores differ"
+    print(f"  ranking: list {list_time:.2f}s, JobBatch {batch_time:.2f}s")
+
+    legacy_by_url = {job.url: job for job in legacy}
+    legacy = [legacy_by_url[job.url] for job in ranked]
+    for job, ranked_job in zip(legacy, ranked):
+        job.match_score = ranked_job.match_score
+    saved = {}
+    for label, jobs, save in (("asdict + json.dump", legacy, _legacy_save),
+                              ("save_results(list)", ranked, lambda jobs, out: save_results(jobs, out)[0]),
+                              ("save_results(JobBatch)", ranked_batch, lambda jobs, out: save_results(jobs, out)[0])):
+        elapsed, peak, saved[label] = _save_peak(jobs, save)
+        print(f"  {label:<24} {elapsed:.2f}s, peak {peak / 1e6:.0f} MB")
+    assert len(set(saved.values())) == 1, "saved JSON differs"
+
+
+def _rss_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure_in_child(func):
+    """(result, seconds, peak RSS growth in bytes) of func() run in a forked child (Linux only).
+
+    The child shares the parent's pages, so its growth over the RSS at fork is
+    what func itself allocated; the high-water mark is reset first.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        baseline = _rss_kb("VmRSS")
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        peak = (_rss_kb("VmHWM") - baseline) * 1024
+        with os.fdopen(write_fd, "wb") as out:
+            pickle.dump((result, elapsed, peak), out)
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        payload = pipe.read()
+    os.waitpid(pid, 0)
+    return pickle.loads(payload)
+
+
+def _legacy_load(path):
+    """The loader before this change: parse the whole JSON array into JobListings"""
+    with open(path) as f:
+        return [JobListing(**row) for row in json.load(f)]
+
+
+def _save_formats(args, formats: list, output_dir: str) -> dict:
+    """Save synthetic jobs with the old json.dump and each format; returns label -> path.
+
+    The jobs are local, so they are freed before the load runs and don't inflate its RSS baseline.
+    """
+    jobs = synthetic_jobs(args.jobs, words=args.words)
+    rng = random.Random(7)
+    for job in jobs:
+        job.match_score = round(rng.random() * 100, 1)
+
+    def save(fmt):
+        path = os.path.join(output_dir, f"jobs.{fmt}")
+        with JobWriter(path, fmt) as writer:
+            writer.write_jobs(jobs)
+        return path
+
+    files = {}
+    print(f"{args.jobs} jobs, {args.words}-word descriptions")
+    print(f"  {'save':<22} {'time':>7} {'peak RSS':>9} {'size':>9}")
+    for label, func in [("json.dump (before)", lambda: _legacy_save(jobs, output_dir))] + \
+                       [(fmt, lambda fmt=fmt: save(fmt)) for fmt in formats]:
+        path, elapsed, peak = _measure_in_child(func)
+        files[label] = path
+        print(f"  {label:<22} {elapsed:6.2f}s {peak / 1e6:6.0f} MB {os.path.getsize(path) / 1e6:6.0f} MB")
+    return files
+
+
+def bench_output(args):
+    """Save time, peak RSS and size per output format, then load + re-rank from each file"""
+    matcher = JobMatcher(ResumeProfile())
+
+    formats = []
+    for fmt in OUTPUT_FORMATS:
+        try:
+            check_output_format(fmt)
+            formats.append(fmt)
+        except ValueError as e:
+            print(f"skipping {fmt}: {e}")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        files = _save_formats(args, formats, output_dir)
+
+        print(f"  {'load + re-rank':<22} {'load':>7} {'total':>7} {'peak RSS':>9}")
+        for label, path in files.items():
+            def rerank(path=path, legacy=label == "json.dump (before)"):
+                started = time.perf_counter()
+                loaded = _legacy_load(path) if legacy else load_results(path)
+                load_time = time.perf_counter() - started
+                ranked = matcher.rank_jobs(loaded) if legacy else matcher.rank_batch(loaded)
+                return len(ranked), load_time
+
+            (count, load_time), elapsed, peak = _measure_in_child(rerank)
+            assert count == args.jobs, f"{label}: loaded {count} jobs"
+            print(f"  {label:<22} {load_time:6.2f}s {elapsed:6.2f}s {peak / 1e6:6.0f} MB")
+
+
+def bench_parallel(args):
+    """Scoring throughput as the process pool grows"""
+    matcher = JobMatcher(ResumeProfile())
+    jobs = synthetic_jobs(args.jobs)
+    print(f"{os.cpu_count()} CPUs available")
+
+    reference = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        if workers == 1:
+            top = matcher.rank_jobs(jobs, top=args.top)
+        else:
+            top = matcher.rank_jobs_parallel(jobs, workers=workers, top=args.top)
+        elapsed = time.perf_counter() - started
+
+        ids = [id(j) for j in top]
+        reference = reference or ids
+        assert ids == reference, "parallel top-K differs from the single-process ranking"
+        print(f"{workers:>3} workers: {elapsed:.2f}s ({args.jobs / elapsed:,.0f} jobs/s)")
+
+
+class FakeRateLimitError(Exception):
+    """Stands in for the SDKs' 429 error (same status_code attribute)"""
+    status_code = 429
+    response = None
+
+
+class FakeLLMClient:
+    """Anthropic-shaped client with fixed latency that rejects a fraction of calls with 429"""
+
+    def __init__(self, latency: float, error_rate: float, seed: int = 42):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.calls = 0
+        self.rejected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.messages = self
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            reject = self._rng.random() < self.error_rate
+            self.rejected += reject
+        time.sleep(self.latency)
+        if reject:
+            raise FakeRateLimitError("rate limited")
+        return SimpleNamespace(content=[SimpleNamespace(text="Dear Hiring Manager, ...")])
+
+
+def bench_generate(args):
+    """--generate wall time as concurrency grows, against a fake LLM"""
+    # Keep injected retries short so they don't dominate the measurement
+    job_automation.GENERATION_BACKOFF_BASE = args.latency / 4
+    jobs = synthetic_jobs(args.jobs, words=50)
+    serial = 2 * args.jobs * args.latency
+    print(f"{args.jobs} jobs x 2 documents, {args.latency}s per call, "
+          f"{args.error_rate:.0%} rate-limited (serial lower bound {serial:.1f}s)")
+
+    for concurrency in args.concurrency:
+        client = FakeLLMClient(args.latency, args.error_rate)
+        generator = DocumentGenerator(ResumeProfile(), rate=args.rate)
+        generator.client, generator.provider = client, "anthropic"
+        with tempfile.TemporaryDirectory() as docs_dir:
+            started = time.perf_counter()
+            written = generate_documents(generator, jobs, docs_dir, concurrency=concurrency)
+            elapsed = time.perf_counter() - started
+        assert len(written) == 2 * args.jobs
+        print(f"concurrency {concurrency:>2}: {elapsed:.2f}s "
+              f"({client.calls} calls, {client.rejected} retried after 429)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job Search Automation benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    fetch = sub.add_parser("fetch", help="Sequential vs concurrent source fetch")
+    fetch.add_argument("--latency", type=float, default=0.5, help="Injected latency of the slowest source")
+    fetch.add_argument("--jobs", type=int, default=200, help="Postings returned per source")
+    fetch.set_defaults(func=bench_fetch)
+
+    incremental = sub.add_parser("incremental", help="Conditional requests and content-hash change detection")
+    incremental.add_argument("--jobs", type=int, default=5000, help="Postings returned per source")
+    incremental.add_argument("--changed", type=float, default=0.1, help="Fraction of postings edited")
+    incremental.set_defaults(func=bench_incremental)
+
+    http_cache = sub.add_parser("http-cache", help="On-disk response cache and offline replay")
+    http_cache.add_argument("--latency", type=float, default=0.5, help="Injected latency of the slowest source")
+    http_cache.add_argument("--jobs", type=int, default=200, help="Postings returned per source")
+    http_cache.set_defaults(func=bench_http_cache)
+
+    pages = sub.add_parser("adzuna-pages", help="Paginated Adzuna streaming memory profile")
+    pages.add_argument("--pages", type=int, default=200, help="Pages served by the fake Adzuna server")
+    pages.add_argument("--output", default="bench_results", help="Directory for the NDJSON output")
+    pages.set_defaults(func=bench_adzuna_pages)
+
+    match = sub.add_parser("match", help="Keyword matching speed at scale")
+    match.add_argument("--jobs", type=int, nargs="+", default=[10_000, 100_000], help="Batch sizes")
+    match.add_argument("--extra-skills", type=int, default=0, help="Synthetic keywords added to the profile")
+    match.set_defaults(func=bench_match)
+
+    rank = sub.add_parser("rank", help="Batch scoring and top-K ranking")
+    rank.add_argument("--jobs", type=int, default=100_000, help="Number of synthetic jobs")
+    rank.add_argument("--top", type=int, default=10, help="Top-K size")
+    rank.add_argument("--words", type=int, default=500, help="Words per synthetic description")
+    rank.set_defaults(func=bench_rank)
+
+    dedup = sub.add_parser("dedup", help="Cross-source duplicate collapsing")
+    dedup.add_argument("--postings", type=int, nargs="+", default=[10_000, 100_000], help="Distinct postings")
+    dedup.set_defaults(func=bench_dedup)
+
+    memory = sub.add_parser("memory", help="Per-listing memory and save cost of the job containers")
+    memory.add_argument("--jobs", type=int, default=200_000, help="Number of synthetic listings")
+    memory.add_argument("--words", type=int, default=100, help="Words per synthetic description")
+    memory.set_defaults(func=bench_memory)
+
+    output = sub.add_parser("output", help="save_results formats: time, peak RSS, size and reload")
+    output.add_argument("--jobs", type=int, default=1_000_000, help="Number of synthetic jobs")
+    output.add_argument("--words", type=int, default=50, help="Words per synthetic description")
+    output.set_defaults(func=bench_output)
+
+    parallel = sub.add_parser("parallel", help="Multi-process scoring throughput")
+    parallel.add_argument("--jobs", type=int, default=200_000, help="Number of synthetic jobs")
+    parallel.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes to try")
+    parallel.add_argument("--top", type=int, default=10, help="Top-K size")
+    parallel.set_defaults(func=bench_parallel)
+
+    generate = sub.add_parser("generate", help="Concurrent --generate pipeline with a fake LLM")
+    generate.add_argument("--jobs", type=int, default=20, help="Jobs to generate documents for")
+    generate.add_argument("--latency", type=float, default=0.5, help="Seconds per fake LLM call")
+    generate.add_argument("--error-rate", type=float, default=0.1, help="Fraction of calls answered with 429")
+    generate.add_argument("--rate", type=float, default=50.0, help="Token bucket rate (requests/s)")
+    generate.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels")
+    generate.set_defaults(func=bench_generate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,31 @@ Author: Sudhakar Chundu
 
 import os
 import json
+import hashlib
+import time
+import heapq
+import random
+import queue
+import sys
+import io
+import gzip
+import mmap
 import argparse
+import threading
+from operator import itemgetter
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED,
+    TimeoutError as FuturesTimeout
+)
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Iterator, Optional
 import requests
-from dataclasses import dataclass, asdict
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, asdict, fields
+
+# Duplicate detection is shared with the API (api/dedup.py), so both agree on what a duplicate is
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from api.dedup import DedupIndex
 
 # Optional imports - install as needed
 try:
@@ -30,10 +50,41 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
-@dataclass
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+@dataclass(slots=True)
 class JobListing:
-    """Represents a job listing"""
+    """Represents a job listing (slotted: no per-instance __dict__)"""
     title: str
     company: str
     location: str
@@ -45,6 +96,73 @@ class JobListing:
     match_score: Optional[float] = None
 
 
+JOB_LISTING_FIELDS = tuple(field.name for field in fields(JobListing))
+
+
+def job_dict(job: JobListing) -> dict:
+    """Shallow field dict of a job; unlike asdict() it doesn't deep-copy (every field is immutable)"""
+    return {name: getattr(job, name) for name in JOB_LISTING_FIELDS}
+
+
+class JobBatch:
+    """Columnar container for large job sets: one list per JobListing field.
+
+    Source, company and location repeat across listings, so they are interned
+    and each distinct value is stored once. Rows are materialized as
+    JobListing only on access; JobMatcher.rank_batch and save_results work on
+    the columns directly.
+    """
+
+    INTERNED = ("source", "company", "location")
+
+    def __init__(self):
+        for name in JOB_LISTING_FIELDS:
+            setattr(self, name, [])
+
+    @classmethod
+    def from_jobs(cls, jobs) -> "JobBatch":
+        batch = cls()
+        for job in jobs:
+            batch.append(job)
+        return batch
+
+    def append(self, job: JobListing):
+        self.add(**job_dict(job))
+
+    def add(self, **values):
+        """Append one row from field values (missing optional fields default to None)"""
+        for name in JOB_LISTING_FIELDS:
+            value = values.get(name)
+            if name in self.INTERNED and isinstance(value, str):
+                value = sys.intern(value)
+            getattr(self, name).append(value)
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(range(len(self))[index])
+        return JobListing(*(getattr(self, name)[index] for name in JOB_LISTING_FIELDS))
+
+    def __iter__(self) -> Iterator[JobListing]:
+        return (self[i] for i in range(len(self)))
+
+    def rows(self) -> Iterator[dict]:
+        """Row dicts in JobListing field order, built one at a time"""
+        columns = [getattr(self, name) for name in JOB_LISTING_FIELDS]
+        for values in zip(*columns):
+            yield dict(zip(JOB_LISTING_FIELDS, values))
+
+    def take(self, indices) -> "JobBatch":
+        """New batch of the given rows, in that order (strings are shared, not copied)"""
+        batch = JobBatch()
+        for name in JOB_LISTING_FIELDS:
+            column = getattr(self, name)
+            setattr(batch, name, [column[i] for i in indices])
+        return batch
+
+
 @dataclass
 class ResumeProfile:
     """Your resume profile for matching"""
@@ -104,129 +222,846 @@ class ResumeProfile:
             ]
 
 
+# Source endpoints - overridable per JobSearcher for local stubs and benchmarks
+DEFAULT_ENDPOINTS = {
+    "Remotive": "https://remotive.com/api/remote-jobs",
+    "Arbeitnow": "https://www.arbeitnow.com/api/job-board-api",
+    "Adzuna": "https://api.adzuna.com/v1/api/jobs",
+}
+
+# Per-source (connect, read) timeouts in seconds
+DEFAULT_TIMEOUTS = {
+    "Remotive": (5, 20),
+    "Arbeitnow": (5, 20),
+    "Adzuna": (5, 15),
+}
+
+# Overall wall-clock budget for a concurrent search across all sources
+DEFAULT_DEADLINE = 45.0
+
+# Adzuna pagination: results per page (API maximum) and how many pages to walk
+ADZUNA_PAGE_SIZE = 50
+DEFAULT_ADZUNA_MAX_PAGES = 20
+
+
+def make_session(pool_size: int = 4) -> requests.Session:
+    """Create a keep-alive session with a small connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "job-automation/1.0"})
+    return session
+
+
+# On-disk cache of raw source responses: seconds each source's responses stay fresh
+DEFAULT_HTTP_CACHE_TTLS = {
+    "Remotive": 1800,
+    "Arbeitnow": 1800,
+    "Adzuna": 600,
+}
+DEFAULT_HTTP_CACHE_SIZE = 200 * 1024 * 1024   # bytes, least recently used entries evicted first
+
+# Query parameters left out of cache metadata (they're still part of the hashed key)
+_SECRET_PARAMS = {"app_id", "app_key"}
+
+
+class OfflineCacheMiss(Exception):
+    """A request in offline mode had no cached response"""
+
+
+class HTTPCache:
+    """Size-bounded LRU disk cache of raw GET responses.
+
+    Entries are keyed by a SHA-256 of the URL and query parameters, and each
+    file holds a JSON header line followed by the body. A hit refreshes the
+    file's mtime, which orders eviction. Entries past their source's TTL are
+    revalidated with If-None-Match / If-Modified-Since when the server sent
+    validators. In `offline` mode every entry is served regardless of age and
+    a miss raises OfflineCacheMiss instead of touching the network.
+    """
+
+    def __init__(self, cache_dir: str, ttls: Optional[dict] = None,
+                 max_bytes: int = DEFAULT_HTTP_CACHE_SIZE, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.ttls = {**DEFAULT_HTTP_CACHE_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        query = json.dumps(sorted((params or {}).items()), default=str)
+        return hashlib.sha256(f"{url}\0{query}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.http")
+
+    def load(self, key: str) -> Optional[tuple]:
+        """(header, body, age in seconds) of a cached response, or None"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = f.read()
+            age = time.time() - header["fetched_at"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return header, body, age
+
+    def is_fresh(self, source: str, age: float) -> bool:
+        return self.offline or age < self.ttls.get(source, 0)
+
+    def store(self, key: str, url: str, params: Optional[dict], response: requests.Response):
+        header = {
+            "url": url,
+            "params": {k: v for k, v in (params or {}).items() if k not in _SECRET_PARAMS},
+            "fetched_at": time.time(),
+            "headers": {name: response.headers[name]
+                        for name in ("Content-Type", "ETag", "Last-Modified") if name in response.headers},
+        }
+        self._write(key, header, response.content)
+        self._evict()
+
+    def touch(self, key: str, header: dict, body: bytes):
+        """Restart an entry's TTL after a 304 revalidation"""
+        self._write(key, {**header, "fetched_at": time.time()}, body)
+
+    def _write(self, key: str, header: dict, body: bytes):
+        path = self._path(key)
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".http"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    @staticmethod
+    def response(url: str, header: dict, body: bytes) -> requests.Response:
+        """A requests.Response replaying a cached entry"""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers.update(header.get("headers", {}))
+        response.url = url
+        response.encoding = "utf-8"
+        return response
+
+
+# Incremental mode: per-source validators, watermark and job hashes (under the output directory)
+INGEST_STATE_FILE = ".ingest_state.json"
+
+
+def _posted_at(value: str) -> Optional[datetime]:
+    """Naive datetime for a source's ISO 8601 posted date, or None if unparseable"""
+    try:
+        return datetime.fromisoformat((value or "").replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def job_key(job: JobListing) -> str:
+    """Identity of a posting within its source"""
+    return job.url or f"{job.title}\0{job.company}"
+
+
+def job_content_hash(job: JobListing) -> str:
+    """Hash of the fields that affect scoring and output (not match_score)"""
+    fields = [job.title, job.company, job.location, job.description, job.url,
+              job.posted_date, str(job.salary or "")]
+    return hashlib.sha256("\0".join(fields).encode("utf-8")).hexdigest()
+
+
+class IngestState:
+    """Incremental ingestion state, persisted as JSON between runs.
+
+    Per source it keeps the ETag / Last-Modified of the last full response,
+    a watermark (newest posted date seen) and, per job, a content hash, the
+    last score and when the job was first and last seen. Validators are only reused for
+    the same query. Scores are invalidated when the resume profile changes.
+    """
+
+    def __init__(self, path: str, profile: ResumeProfile):
+        self.path = path
+        self.profile_hash = hashlib.sha256(
+            json.dumps(asdict(profile), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        self._lock = threading.Lock()
+        self.sources = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if data.get("profile") == self.profile_hash:
+                    self.sources = data.get("sources", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable ingest state {path}: {e}")
+
+    def _source(self, source: str, query: Optional[str] = None) -> dict:
+        record = self.sources.setdefault(source, {"query": query, "jobs": {}})
+        if query is not None and record.get("query") != query:
+            # A different query has different validators and postings
+            record = self.sources[source] = {"query": query, "jobs": {}}
+        return record
+
+    def conditional_headers(self, source: str, query: str) -> dict:
+        """If-None-Match / If-Modified-Since for the last response to this query"""
+        with self._lock:
+            record = self._source(source, query)
+            headers = {}
+            if record.get("etag"):
+                headers["If-None-Match"] = record["etag"]
+            if record.get("last_modified"):
+                headers["If-Modified-Since"] = record["last_modified"]
+            return headers
+
+    def store_validators(self, source: str, query: str, response: requests.Response):
+        with self._lock:
+            record = self._source(source, query)
+            record["etag"] = response.headers.get("ETag")
+            record["last_modified"] = response.headers.get("Last-Modified")
+
+    def watermark(self, source: str, query: str) -> Optional[datetime]:
+        """Newest posted date seen from this source for this query in a previous run"""
+        with self._lock:
+            value = self._source(source, query).get("watermark")
+        return _posted_at(value) if value else None
+
+    def cached_jobs(self, source: str, cutoff: datetime) -> list:
+        """Jobs kept from previous runs that were posted on or after `cutoff`"""
+        with self._lock:
+            stored = list(self.sources.get(source, {}).get("jobs", {}).values())
+        jobs = []
+        for entry in stored:
+            posted = _posted_at(entry["job"]["posted_date"])
+            if posted is None or posted >= cutoff:
+                jobs.append(JobListing(**entry["job"]))
+        return jobs
+
+    def diff(self, jobs: list) -> list:
+        """Jobs that are new or changed since the last run.
+
+        Unchanged jobs get their stored match_score back, so only the
+        returned jobs need scoring.
+        """
+        changed = []
+        with self._lock:
+            for job in jobs:
+                entry = self.sources.get(job.source, {}).get("jobs", {}).get(job_key(job))
+                # Duplicates are recorded unscored (see main); they need scoring if kept later
+                if entry and entry["hash"] == job_content_hash(job) and entry["job"]["match_score"] is not None:
+                    job.match_score = entry["job"]["match_score"]
+                else:
+                    changed.append(job)
+        return changed
+
+    def record(self, jobs: list, sources):
+        """Replace the stored jobs of each fetched source with this run's (scored) jobs.
+
+        Every job's last-seen time is touched with one timestamp; first-seen is
+        kept from earlier runs. Sources that failed or timed out keep their
+        previous state.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        by_source = {source: [] for source in sources}
+        for job in jobs:
+            if job.source in by_source:
+                by_source[job.source].append(job)
+
+        with self._lock:
+            for source, source_jobs in by_source.items():
+                record = self._source(source)
+                previous = record.get("jobs", {})
+                stored = {}
+                for job in source_jobs:
+                    key = job_key(job)
+                    content_hash = job_content_hash(job)
+                    entry = previous.get(key)
+                    if entry and entry["hash"] == content_hash and entry["job"]["match_score"] == job.match_score:
+                        # Unchanged: keep the stored copy instead of re-serializing the job
+                        entry["last_seen"] = now
+                        stored[key] = entry
+                        continue
+                    stored[key] = {
+                        "hash": content_hash,
+                        "first_seen": entry["first_seen"] if entry else now,
+                        "last_seen": now,
+                        "job": job_dict(job),
+                    }
+                record["jobs"] = stored
+                posted = [d for d in (_posted_at(job.posted_date) for job in source_jobs) if d]
+                if posted:
+                    newest = max(posted)
+                    watermark = _posted_at(record.get("watermark") or "")
+                    if watermark is None or newest > watermark:
+                        record["watermark"] = newest.isoformat()
+
+    def save(self):
+        """Write the state atomically"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"profile": self.profile_hash, "sources": self.sources}
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            # dumps() uses the C encoder; dump() to a file would encode in Python
+            f.write(json.dumps(data))
+        os.replace(tmp_path, self.path)
+
+
 class JobSearcher:
     """Fetches jobs from various sources"""
 
-    def __init__(self):
+    def __init__(self, endpoints: Optional[dict] = None, timeouts: Optional[dict] = None,
+                 state: Optional[IngestState] = None, cache: Optional[HTTPCache] = None,
+                 on_jobs: Optional[Callable[[list], None]] = None):
         self.jobs = []
+        self.endpoints = {**DEFAULT_ENDPOINTS, **(endpoints or {})}
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        # Incremental mode: conditional requests and jobs kept from earlier runs
+        self.state = state
+        # Raw responses cached on disk (and replayed in offline mode)
+        self.cache = cache
+        # Sources whose fetch completed (in search_all: before the deadline)
+        self.completed = set()
+        # Called on the fetching thread with each batch of jobs as it arrives (each
+        # Adzuna page, each whole feed), so the caller can process them while
+        # other pages and sources are still downloading. Batches handed to it are
+        # not kept in self.jobs, so memory doesn't grow with the number of results
+        self.on_jobs = on_jobs
+        # One pooled session per source so concurrent fetches never share a connection
+        self.sessions = {source: make_session() for source in self.endpoints}
+        # Set when search_all's deadline passes: abandoned fetches stop paging, and
+        # their late results and validators are dropped. _lock makes that check
+        # atomic with deliveries, completion and close()
+        self._stopped = threading.Event()
+        self._lock = threading.RLock()
+        # Validators of fetched feeds, stored in the ingest state once the source completes
+        self._validators = {}
+        # Sources whose search_all thread is still running, and whether close() was called
+        self._running = set()
+        self._closed = False
+
+    def close(self):
+        """Release pooled connections.
+
+        A source abandoned at the deadline may still be mid-request; its thread
+        closes its own session when it ends.
+        """
+        with self._lock:
+            self._closed = True
+            idle = [session for source, session in self.sessions.items() if source not in self._running]
+        for session in idle:
+            session.close()
+
+    def _get(self, source: str, url: str, params: Optional[dict] = None,
+             headers: Optional[dict] = None) -> requests.Response:
+        """GET through the source's pooled session with its timeout (and the disk cache, if any)"""
+        if self.cache is None:
+            response = self.sessions[source].get(url, params=params, headers=headers,
+                                                 timeout=self.timeouts.get(source))
+            response.raise_for_status()
+            return response
+
+        key = self.cache.key(url, params)
+        cached = self.cache.load(key)
+        if cached and self.cache.is_fresh(source, cached[2]):
+            return self.cache.response(url, cached[0], cached[1])
+        if self.cache.offline:
+            raise OfflineCacheMiss(f"No cached response for {source} {url}")
+
+        # Revalidate a stale entry, unless the caller sent its own conditional headers
+        revalidating = False
+        if cached and not headers:
+            saved = cached[0].get("headers", {})
+            headers = {}
+            if saved.get("ETag"):
+                headers["If-None-Match"] = saved["ETag"]
+            if saved.get("Last-Modified"):
+                headers["If-Modified-Since"] = saved["Last-Modified"]
+            revalidating = bool(headers)
+
+        response = self.sessions[source].get(url, params=params, headers=headers,
+                                             timeout=self.timeouts.get(source))
+        response.raise_for_status()
+        if response.status_code == 304:
+            if revalidating:
+                self.cache.touch(key, cached[0], cached[1])
+                return self.cache.response(url, cached[0], cached[1])
+            return response
+        self.cache.store(key, url, params, response)
+        return response
+
+    def _get_feed(self, source: str, query: str, params: Optional[dict] = None) -> Optional[dict]:
+        """Fetch a whole-feed source; None if unchanged (304) since the last incremental run"""
+        if self.state is None:
+            return self._get(source, self.endpoints[source], params).json()
+
+        headers = self.state.conditional_headers(source, query)
+        response = self._get(source, self.endpoints[source], params, headers)
+        if response.status_code == 304:
+            return None
+        data = response.json()
+        # Stored by _complete: validators for jobs that never get recorded would
+        # make the next run reuse stale ones
+        self._validators[source] = (query, response)
+        return data
+
+    def _complete(self, source: str) -> bool:
+        """Mark a source's fetch as done and store its validators; False once the deadline has passed"""
+        with self._lock:
+            if self._stopped.is_set():
+                return False
+            self.completed.add(source)
+            if source in self._validators:
+                self.state.store_validators(source, *self._validators.pop(source))
+            return True
+
+    def _deliver(self, jobs: list) -> list:
+        """Hand a batch to on_jobs; returns what the fetcher should keep (nothing once handed over)"""
+        if self.on_jobs is None:
+            return jobs
+        with self._lock:
+            # Batches from a source abandoned at the deadline are dropped
+            if jobs and not self._stopped.is_set():
+                self.on_jobs(jobs)
+        return []
+
+    def search_all(self, keywords: str, days: int = 7, deadline: float = DEFAULT_DEADLINE,
+                   max_pages: int = DEFAULT_ADZUNA_MAX_PAGES) -> list:
+        """Search every source concurrently.
+
+        Each source runs in its own thread over its own keep-alive session, so the
+        wall-clock time is roughly that of the slowest source. Sources that have
+        not finished when `deadline` seconds have elapsed are abandoned and their
+        results dropped. With on_jobs, results go to it instead of self.jobs.
+
+        Abandoned sources stop after their current request and deliver nothing
+        more. Their threads are daemons, so they don't hold up the process at exit.
+        """
+        fetchers = {
+            "Remotive": lambda: self._deliver(self._fetch_remotive(keywords)),
+            "Arbeitnow": lambda: self._deliver(self._fetch_arbeitnow(keywords)),
+            "Adzuna": lambda: self._fetch_adzuna(keywords, days=days, max_pages=max_pages),
+        }
+
+        def run(source: str, fetch: Callable[[], list], future: Future):
+            try:
+                jobs = fetch()
+                with self._lock:
+                    # Either the source completes before the deadline, results and all, or not at all
+                    if self._complete(source):
+                        future.set_result(jobs)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._running.discard(source)
+                    closed = self._closed
+                if closed:
+                    self.sessions[source].close()
+
+        def collect(future: Future):
+            source = futures[future]
+            pending.discard(source)
+            try:
+                self.jobs.extend(future.result())
+            except Exception as e:
+                print(f"Error fetching from {source}: {e}")
+
+        started = time.monotonic()
+        self._stopped.clear()
+        futures = {}
+        for source, fetch in fetchers.items():
+            future = Future()
+            future.set_running_or_notify_cancel()
+            futures[future] = source
+            with self._lock:
+                self._running.add(source)
+            threading.Thread(target=run, args=(source, fetch, future),
+                             name=f"job-source-{source}", daemon=True).start()
+        pending = set(futures.values())
+
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                collect(future)
+        except FuturesTimeout:
+            with self._lock:
+                self._stopped.set()
+            # Sources that finished between the timeout and the stop still count
+            for future, source in futures.items():
+                if source in pending and future.done():
+                    collect(future)
+            print(f"Deadline of {deadline:.0f}s reached, skipping: {', '.join(sorted(pending))}")
+
+        print(f"Searched {len(fetchers)} sources in {time.monotonic() - started:.2f}s")
+        return self.jobs
 
-    def search_adzuna(self, keywords: str, location: str = "us", days: int = 7) -> list:
+    def search_adzuna(self, keywords: str, location: str = "us", days: int = 7,
+                      max_pages: int = DEFAULT_ADZUNA_MAX_PAGES) -> list:
         """Search jobs using Adzuna API (free tier available)"""
+        try:
+            self.jobs.extend(self._fetch_adzuna(keywords, location, days, max_pages))
+            self._complete("Adzuna")
+        except Exception as e:
+            print(f"Error fetching from Adzuna: {e}")
+
+        return self.jobs
+
+    def _fetch_adzuna(self, keywords: str, location: str = "us", days: int = 7,
+                      max_pages: int = DEFAULT_ADZUNA_MAX_PAGES) -> list:
+        # Incremental mode pages back only to the last run's newest posting, then reuses stored jobs
+        since = None
+        if self.state is not None:
+            since = self.state.watermark("Adzuna", f"{keywords}\0{location}")
+
+        # Each page goes to on_jobs as soon as it arrives; only without on_jobs are pages collected
+        found = []
+        seen = set()
+        fetched = 0
+        for page in self.iter_adzuna_pages(keywords, location, days, max_pages, since=since):
+            if self._stopped.is_set():
+                break
+            fetched += len(page)
+            if since is not None:
+                seen.update(job_key(job) for job in page)
+            found.extend(self._deliver(page))
+
+        if since is not None:
+            cutoff = datetime.now() - timedelta(days=days)
+            cached = [job for job in self.state.cached_jobs("Adzuna", cutoff) if job_key(job) not in seen]
+            found.extend(self._deliver(cached))
+            print(f"Found {fetched + len(cached)} jobs from Adzuna ({fetched} fetched since last run)")
+        else:
+            print(f"Found {fetched} jobs from Adzuna")
+        return found
+
+    def iter_adzuna_pages(self, keywords: str, location: str = "us", days: int = 7,
+                          max_pages: int = DEFAULT_ADZUNA_MAX_PAGES, prefetch: int = 2,
+                          since: Optional[datetime] = None) -> Iterator[list]:
+        """Lazily yield Adzuna result pages as lists of JobListing.
+
+        A background thread fetches pages into a queue holding at most `prefetch`
+        pages, so it stays a little ahead of the consumer but blocks when the
+        consumer falls behind; memory is bounded by `prefetch` pages however many
+        pages exist. Results are sorted by date, so paging stops at the first
+        page that reaches past the `days` window (or past `since`, when given),
+        at a short page, or after `max_pages`. Closing the generator early stops
+        the fetcher.
+        """
         app_id = os.getenv("ADZUNA_APP_ID")
         app_key = os.getenv("ADZUNA_APP_KEY")
 
         if not app_id or not app_key:
             print("Adzuna API credentials not found. Set ADZUNA_APP_ID and ADZUNA_APP_KEY")
-            return []
+            return
 
-        url = f"https://api.adzuna.com/v1/api/jobs/{location}/search/1"
         params = {
             "app_id": app_id,
             "app_key": app_key,
             "what": keywords,
             "max_days_old": days,
-            "results_per_page": 50,
+            "results_per_page": ADZUNA_PAGE_SIZE,
             "sort_by": "date"
         }
+        cutoff = datetime.now() - timedelta(days=days)
+        if since is not None:
+            cutoff = max(cutoff, since)
+
+        pages = queue.Queue(maxsize=max(1, prefetch))
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            # Block while the queue is full, but give up once the consumer has gone
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for page_number in range(1, max_pages + 1):
+                    if self._stopped.is_set():
+                        break
+                    url = f"{self.endpoints['Adzuna']}/{location}/search/{page_number}"
+                    results = self._get("Adzuna", url, params).json().get("results", [])
+
+                    page, expired = self._parse_adzuna_page(results, cutoff)
+                    if page and not put(page):
+                        return
+                    if expired or len(results) < ADZUNA_PAGE_SIZE:
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+
+        producer = threading.Thread(target=produce, name="adzuna-pages", daemon=True)
+        producer.start()
 
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            while True:
+                item = pages.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _parse_adzuna_page(results: list, cutoff: datetime) -> tuple:
+        """Convert one page of Adzuna results, dropping jobs older than `cutoff`.
+
+        Returns (jobs, expired) where `expired` means the page reached past the
+        cutoff, so later pages (sorted by date) can be skipped.
+        """
+        page = []
+        expired = False
+        for job in results:
+            # Adzuna sends null for missing values, which .get() defaults don't cover
+            created = job.get("created") or ""
+            try:
+                posted = datetime.fromisoformat(created.replace("Z", "+00:00"))
+                if posted.replace(tzinfo=None) < cutoff:
+                    expired = True
+                    continue
+            except ValueError:
+                pass
+
+            page.append(JobListing(
+                title=job.get("title") or "",
+                company=(job.get("company") or {}).get("display_name") or "",
+                location=(job.get("location") or {}).get("display_name") or "",
+                description=job.get("description") or "",
+                url=job.get("redirect_url") or "",
+                posted_date=created,
+                source="Adzuna",
+                salary=None if job.get("salary_max") is None else str(job["salary_max"])
+            ))
+        return page, expired
+
+    def search_remotive(self, keywords: str) -> list:
+        """Search remote jobs from Remotive (free, no API key needed)"""
+        try:
+            self.jobs.extend(self._fetch_remotive(keywords))
+            self._complete("Remotive")
+        except Exception as e:
+            print(f"Error fetching from Remotive: {e}")
 
-            for job in data.get("results", []):
-                self.jobs.append(JobListing(
+        return self.jobs
+
+    def _fetch_remotive(self, keywords: str) -> list:
+        params = {"search": keywords}
+        data = self._get_feed("Remotive", keywords, params)
+
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        if data is None:
+            found = self.state.cached_jobs("Remotive", seven_days_ago)
+            print(f"Remotive unchanged since last run, reusing {len(found)} jobs")
+            return found
+
+        found = []
+        for job in data.get("jobs", []):
+            posted = datetime.fromisoformat(job.get("publication_date", "").replace("Z", "+00:00"))
+            if posted.replace(tzinfo=None) >= seven_days_ago:
+                found.append(JobListing(
                     title=job.get("title", ""),
-                    company=job.get("company", {}).get("display_name", ""),
-                    location=job.get("location", {}).get("display_name", ""),
+                    company=job.get("company_name", ""),
+                    location="Remote",
                     description=job.get("description", ""),
-                    url=job.get("redirect_url", ""),
-                    posted_date=job.get("created", ""),
-                    source="Adzuna",
-                    salary=job.get("salary_max")
+                    url=job.get("url", ""),
+                    posted_date=job.get("publication_date", ""),
+                    source="Remotive",
+                    salary=job.get("salary")
                 ))
 
-            print(f"Found {len(data.get('results', []))} jobs from Adzuna")
+        print(f"Found {len(found)} remote jobs from Remotive")
+        return found
 
+    def search_github_jobs_api(self, keywords: str) -> list:
+        """Search jobs from public job APIs"""
+        try:
+            self.jobs.extend(self._fetch_arbeitnow(keywords))
+            self._complete("Arbeitnow")
         except Exception as e:
-            print(f"Error fetching from Adzuna: {e}")
+            print(f"Error fetching from Arbeitnow: {e}")
 
         return self.jobs
 
-    def search_remotive(self, keywords: str) -> list:
-        """Search remote jobs from Remotive (free, no API key needed)"""
-        url = "https://remotive.com/api/remote-jobs"
-        params = {"search": keywords}
+    def _fetch_arbeitnow(self, keywords: str) -> list:
+        # Using Arbeitnow as GitHub Jobs API is deprecated
+        data = self._get_feed("Arbeitnow", keywords)
+
+        keywords_lower = keywords.lower().split()
+        seven_days_ago = datetime.now() - timedelta(days=7)
+        if data is None:
+            found = self.state.cached_jobs("Arbeitnow", seven_days_ago)
+            print(f"Arbeitnow unchanged since last run, reusing {len(found)} jobs")
+            return found
+
+        found = []
+        for job in data.get("data", []):
+            title_lower = job.get("title", "").lower()
+            desc_lower = job.get("description", "").lower()
+
+            if any(kw in title_lower or kw in desc_lower for kw in keywords_lower):
+                try:
+                    posted = datetime.fromisoformat(job.get("created_at", "").replace("Z", "+00:00"))
+                    if posted.replace(tzinfo=None) < seven_days_ago:
+                        continue
+                except:
+                    pass
+
+                found.append(JobListing(
+                    title=job.get("title", ""),
+                    company=job.get("company_name", ""),
+                    location=job.get("location", ""),
+                    description=job.get("description", "")[:500],
+                    url=job.get("url", ""),
+                    posted_date=job.get("created_at", ""),
+                    source="Arbeitnow"
+                ))
 
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            seven_days_ago = datetime.now() - timedelta(days=7)
-
-            for job in data.get("jobs", []):
-                posted = datetime.fromisoformat(job.get("publication_date", "").replace("Z", "+00:00"))
-                if posted.replace(tzinfo=None) >= seven_days_ago:
-                    self.jobs.append(JobListing(
-                        title=job.get("title", ""),
-                        company=job.get("company_name", ""),
-                        location="Remote",
-                        description=job.get("description", ""),
-                        url=job.get("url", ""),
-                        posted_date=job.get("publication_date", ""),
-                        source="Remotive",
-                        salary=job.get("salary")
-                    ))
-
-            print(f"Found {len([j for j in self.jobs if j.source == 'Remotive'])} remote jobs from Remotive")
+        print(f"Found {len(found)} jobs from Arbeitnow")
+        return found
 
-        except Exception as e:
-            print(f"Error fetching from Remotive: {e}")
 
-        return self.jobs
+def _dedup_rank(job: JobListing) -> tuple:
+    """Which copy of a duplicated posting to keep (lowest first): the longest description,
+    ties broken by source and URL so the choice doesn't depend on arrival order"""
+    return -len(job.description or ""), job.source, job_key(job)
 
-    def search_github_jobs_api(self, keywords: str) -> list:
-        """Search jobs from public job APIs"""
-        # Using Arbeitnow as GitHub Jobs API is deprecated
-        url = "https://www.arbeitnow.com/api/job-board-api"
 
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
+def dedupe_jobs(jobs: list) -> list:
+    """Collapse the same posting seen from several sources, keeping the copy
+    chosen by _dedup_rank. Input order is kept.
+    """
+    index = DedupIndex()
+    keep = set()
+    for i in sorted(range(len(jobs)), key=lambda i: _dedup_rank(jobs[i])):
+        job = jobs[i]
+        if index.find_or_add(i, job.source, job.company, job.title, job.location, job.description) is None:
+            keep.add(i)
+    return [job for i, job in enumerate(jobs) if i in keep]
 
-            keywords_lower = keywords.lower().split()
-            seven_days_ago = datetime.now() - timedelta(days=7)
 
-            for job in data.get("data", []):
-                title_lower = job.get("title", "").lower()
-                desc_lower = job.get("description", "").lower()
+class JobDeduper:
+    """Cross-source dedup for jobs that arrive in batches (pages, feeds).
 
-                if any(kw in title_lower or kw in desc_lower for kw in keywords_lower):
-                    try:
-                        posted = datetime.fromisoformat(job.get("created_at", "").replace("Z", "+00:00"))
-                        if posted.replace(tzinfo=None) < seven_days_ago:
-                            continue
-                    except:
-                        pass
-
-                    self.jobs.append(JobListing(
-                        title=job.get("title", ""),
-                        company=job.get("company_name", ""),
-                        location=job.get("location", ""),
-                        description=job.get("description", "")[:500],
-                        url=job.get("url", ""),
-                        posted_date=job.get("created_at", ""),
-                        source="Arbeitnow"
-                    ))
-
-            print(f"Found {len([j for j in self.jobs if j.source == 'Arbeitnow'])} jobs from Arbeitnow")
+    `jobs` holds one copy of each posting seen so far, in arrival order. As in
+    dedupe_jobs, a later copy that _dedup_rank prefers replaces the kept one, so
+    the same copy is kept (and its stored score reused) whatever order sources
+    arrive in.
+    """
 
-        except Exception as e:
-            print(f"Error fetching from Arbeitnow: {e}")
+    def __init__(self):
+        self.jobs = []
+        self._index = DedupIndex()
 
-        return self.jobs
+    def add(self, jobs: list) -> list:
+        """Add a batch; returns the jobs from it that were kept (new postings and replacements)"""
+        kept = []
+        for job in jobs:
+            other = self._index.find_or_add(len(self.jobs), job.source, job.company, job.title,
+                                            job.location, job.description)
+            if other is None:
+                self.jobs.append(job)
+                kept.append(job)
+            elif _dedup_rank(job) < _dedup_rank(self.jobs[other]):
+                self.jobs[other] = job
+                kept.append(job)
+        return kept
+
+
+# Title words that earn a bonus when they appear in a job title
+TITLE_KEYWORDS = ["architect", "director", "manager", "lead", "senior", "principal",
+                  "cloud", "platform", "sre", "devops", "infrastructure", "ai", "ml"]
+
+
+# Jobs per task sent to each scoring worker
+DEFAULT_SCORING_CHUNK = 5000
+
+# Below this many keywords, one C-level `in` per keyword beats an automaton scan. Measured
+# on 100-500 word descriptions: 24 keywords 0.85-1.1x, 32 keywords 1.0-1.3x, the default
+# profile's 39 keywords 1.1-1.5x. Scanning the text dominates either way, so the gain stays
+# modest until the keyword list is much longer
+AHOCORASICK_MIN_KEYWORDS = 32
+
+
+class KeywordMatcher:
+    """Counts how many of a fixed set of keywords occur in a text.
+
+    Uses substring semantics (same as `kw in text`). With pyahocorasick
+    installed and enough keywords, they are compiled into one Aho-Corasick
+    automaton so each text is scanned once regardless of keyword count;
+    otherwise it falls back to one `in` per keyword.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        self._automaton = None
+
+        if AHOCORASICK_AVAILABLE and len(self.keywords) >= AHOCORASICK_MIN_KEYWORDS:
+            self._automaton = ahocorasick.Automaton()
+            for i, kw in enumerate(self.keywords):
+                self._automaton.add_word(kw, 1 << i)
+            self._automaton.make_automaton()
+
+    def count(self, text: str) -> int:
+        """Number of distinct keywords found in `text`"""
+        if self._automaton is None:
+            return sum(1 for kw in self.keywords if kw in text)
+        return bin(self.mask(text)).count("1")
+
+    def mask(self, text: str) -> int:
+        """Bitmask of the keywords found in `text` (bit i = self.keywords[i])"""
+        if self._automaton is None:
+            return sum(1 << i for i, kw in enumerate(self.keywords) if kw in text)
+
+        # Collect the distinct hits in C rather than OR-ing them in a Python loop
+        return sum(set(map(itemgetter(1), self._automaton.iter(text))))
+
+    def term_matrix(self, texts) -> "np.ndarray":
+        """Presence matrix (len(texts) x len(self.keywords)) of uint8 0/1 values"""
+        masks = [self.mask(text) for text in texts]
+        matrix = np.zeros((len(masks), len(self.keywords)), dtype=np.uint8)
+        shifts = np.arange(64, dtype=np.uint64)
+
+        # Unpack the Python int masks 64 keywords at a time
+        for start in range(0, len(self.keywords), 64):
+            width = min(64, len(self.keywords) - start)
+            words = np.fromiter(((m >> start) & 0xFFFFFFFFFFFFFFFF for m in masks),
+                                dtype=np.uint64, count=len(masks))
+            matrix[:, start:start + width] = (words[:, None] >> shifts[:width]) & np.uint64(1)
+        return matrix
 
 
 class JobMatcher:
@@ -237,60 +1072,316 @@ class JobMatcher:
         self.skill_keywords = self._extract_keywords()
 
     def _extract_keywords(self) -> set:
-        """Extract keywords from skills"""
+        """Extract keywords from skills and compile the matchers used for scoring"""
         keywords = set()
         for skill in self.profile.skills:
             # Split by common delimiters and add individual words
             words = skill.lower().replace(",", " ").replace("(", " ").replace(")", " ").split()
             keywords.update(words)
+
+        # Very short tokens ("go", "&") match almost anything, so they never score
+        self._skill_matcher = KeywordMatcher(kw for kw in keywords if len(kw) > 2)
+        self._title_matcher = KeywordMatcher(TITLE_KEYWORDS)
+        self._max_possible = len(keywords) + len(TITLE_KEYWORDS) * 2
         return keywords
 
     def calculate_match_score(self, job: JobListing) -> float:
         """Calculate how well a job matches the profile (0-100)"""
-        text = f"{job.title} {job.description}".lower()
+        return self._score_text(job.title, job.description)
+
+    def _score_text(self, title: str, description: str) -> float:
+        text = f"{title} {description}".lower()
 
         # Count matching keywords
-        matches = sum(1 for kw in self.skill_keywords if kw in text and len(kw) > 2)
+        matches = self._skill_matcher.count(text)
 
         # Bonus for title matches
-        title_keywords = ["architect", "director", "manager", "lead", "senior", "principal",
-                         "cloud", "platform", "sre", "devops", "infrastructure", "ai", "ml"]
-        title_matches = sum(2 for kw in title_keywords if kw in job.title.lower())
+        title_matches = 2 * self._title_matcher.count(title.lower())
 
-        # Calculate score
-        max_possible = len(self.skill_keywords) + len(title_keywords) * 2
-        score = min(100, ((matches + title_matches) / max_possible) * 100 * 2)
+        return self._score(matches + title_matches)
 
+    def _score(self, raw: int) -> float:
+        """Convert weighted keyword hits into a 0-100 score"""
+        score = min(100, (raw / self._max_possible) * 100 * 2)
         return round(score, 1)
 
-    def rank_jobs(self, jobs: list) -> list:
-        """Rank jobs by match score"""
+    def score_batch(self, jobs: list) -> "np.ndarray":
+        """Score a whole batch of jobs at once.
+
+        Builds a job x keyword term matrix (skill keywords against title and
+        description, title keywords against the title) and multiplies it by the
+        profile weight vector. Raw hit counts are small integers, so they are
+        mapped to scores through a lookup table built with `_score`, which keeps
+        results identical to `calculate_match_score`.
+        """
+        return self.score_pairs([(job.title, job.description) for job in jobs])
+
+    def score_pairs(self, pairs: list) -> "np.ndarray":
+        """Batch-score (title, description) pairs; see `score_batch`"""
+        texts = [f"{title} {description}".lower() for title, description in pairs]
+        titles = [title.lower() for title, _ in pairs]
+
+        terms = np.hstack([self._skill_matcher.term_matrix(texts),
+                           self._title_matcher.term_matrix(titles)])
+        weights = np.array([1] * len(self._skill_matcher.keywords) +
+                           [2] * len(self._title_matcher.keywords), dtype=np.int32)
+        raw = terms @ weights
+
+        table = np.array([self._score(r) for r in range(int(weights.sum()) + 1)])
+        return table[raw]
+
+    def score_jobs(self, jobs: list):
+        """Set every job's match_score; returns the scores as an array with NumPy, else None"""
+        if NUMPY_AVAILABLE:
+            scores = self.score_batch(jobs)
+            for job, score in zip(jobs, scores.tolist()):
+                job.match_score = score
+            return scores
+
         for job in jobs:
             job.match_score = self.calculate_match_score(job)
+        return None
+
+    def rank_jobs(self, jobs: list, top: Optional[int] = None) -> list:
+        """Rank jobs by match score, keeping only the best `top` if given.
 
+        Every job gets its match_score set. Ties keep their input order.
+        """
+        scores = self.score_jobs(jobs)
+        if scores is not None:
+            return [jobs[i] for i in top_k_indices(scores, top)]
+
+        if top is not None:
+            return heapq.nlargest(top, jobs, key=lambda x: x.match_score or 0)
+        return sorted(jobs, key=lambda x: x.match_score or 0, reverse=True)
+
+    def rank_batch(self, batch: JobBatch, top: Optional[int] = None) -> JobBatch:
+        """Rank a JobBatch like `rank_jobs`, scoring its title/description columns directly.
+
+        Fills the batch's match_score column and returns the ranked rows as a new batch.
+        """
+        if NUMPY_AVAILABLE:
+            scores = self.score_pairs(list(zip(batch.title, batch.description)))
+            batch.match_score = scores.tolist()
+            return batch.take(top_k_indices(scores, top).tolist())
+
+        batch.match_score = [self._score_text(title, description)
+                             for title, description in zip(batch.title, batch.description)]
+        order = sorted(range(len(batch)), key=lambda i: batch.match_score[i] or 0, reverse=True)
+        return batch.take(order[:top] if top is not None else order)
+
+    def rank_jobs_parallel(self, jobs: list, workers: Optional[int] = None, top: Optional[int] = None,
+                           chunk_size: int = DEFAULT_SCORING_CHUNK) -> list:
+        """Rank jobs like `rank_jobs`, scoring chunks across a process pool.
+
+        Each worker builds its own JobMatcher from the profile once, at start-up,
+        so only (title, description) pairs travel to the workers and only scores
+        come back. At most two chunks per worker are in flight, and results are
+        merged as they arrive: scores are written back to the jobs and, with
+        `top`, a streaming top-K reducer keeps only the best candidates.
+        """
+        best = self._score_parallel(jobs, workers, top, chunk_size)
+        if best is not None:
+            return [jobs[i] for i in best.indices()]
         return sorted(jobs, key=lambda x: x.match_score or 0, reverse=True)
 
+    def score_jobs_parallel(self, jobs: list, workers: Optional[int] = None,
+                            chunk_size: int = DEFAULT_SCORING_CHUNK):
+        """Set every job's match_score like `score_jobs`, across a process pool, without ranking"""
+        self._score_parallel(jobs, workers, None, chunk_size)
+
+    def _score_parallel(self, jobs: list, workers: Optional[int], top: Optional[int],
+                        chunk_size: int) -> Optional["TopK"]:
+        """Score jobs in a process pool; with `top`, returns a TopK of the best"""
+        workers = workers or os.cpu_count() or 1
+        best = TopK(top) if top is not None else None
+        chunks = ((start, [(job.title, job.description) for job in jobs[start:start + chunk_size]])
+                  for start in range(0, len(jobs), chunk_size))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_scoring_worker,
+                                 initargs=(self.profile,)) as pool:
+            in_flight = set()
+            for start, pairs in chunks:
+                in_flight.add(pool.submit(_score_chunk, start, pairs, top))
+                if len(in_flight) >= workers * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._merge_chunks(jobs, finished, best)
+            self._merge_chunks(jobs, in_flight, best)
+        return best
+
+    @staticmethod
+    def _merge_chunks(jobs: list, futures, best: Optional["TopK"]):
+        for future in futures:
+            start, scores, candidates = future.result()
+            for job, score in zip(jobs[start:start + len(scores)], scores):
+                job.match_score = score
+            if best is not None:
+                for index in candidates:
+                    best.push(jobs[index].match_score, index)
+
+
+class TopK:
+    """Streaming top-K reducer over (score, index) pairs; ties favour the lower index"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap = []
+
+    def push(self, score: float, index: int):
+        item = (score, -index)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def indices(self) -> list:
+        """Indices of the best scores seen so far, best first"""
+        return [-neg_index for _, neg_index in sorted(self._heap, reverse=True)]
+
+
+# Per-process matcher for rank_jobs_parallel, built once by the pool initializer
+_worker_matcher = None
+
+
+def _init_scoring_worker(profile: ResumeProfile):
+    global _worker_matcher
+    _worker_matcher = JobMatcher(profile)
+
+
+def _score_chunk(start: int, pairs: list, top: Optional[int]) -> tuple:
+    """Score one chunk in a worker; returns (start, scores, best global indices)"""
+    if NUMPY_AVAILABLE:
+        scores = _worker_matcher.score_pairs(pairs)
+        best = top_k_indices(scores, top).tolist() if top is not None else []
+        scores = scores.tolist()
+    else:
+        scores = [_worker_matcher._score_text(title, description) for title, description in pairs]
+        best = heapq.nlargest(top, range(len(scores)), key=scores.__getitem__) if top is not None else []
+    return start, scores, [start + i for i in best]
+
+
+def top_k_indices(scores: "np.ndarray", k: Optional[int] = None) -> "np.ndarray":
+    """Indices of the `k` highest scores, best first, ties in index order.
+
+    Uses argpartition to find the k-th best score and only sorts the jobs at or
+    above it, instead of sorting the whole batch. With k=None, returns the full
+    stable ranking.
+    """
+    n = len(scores)
+    if k is None or k >= n:
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+
+    threshold = scores[np.argpartition(scores, n - k)[n - k]]
+    candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+
+
+# Model used for document generation by each provider
+GENERATION_MODELS = {
+    "openai": "gpt-4o",
+    "anthropic": "claude-sonnet-4-20250514",
+}
+
+# Seconds a cached generated document stays valid
+GENERATION_CACHE_TTL = 7 * 24 * 3600
+
+# Concurrent LLM calls in --generate mode, and each provider's request rate limit
+DEFAULT_GENERATION_CONCURRENCY = 4
+DEFAULT_GENERATION_RATES = {
+    "openai": 5.0,      # requests per second
+    "anthropic": 5.0,
+}
+
+# Retries for rate-limited (429) and server-error (5xx) responses
+GENERATION_MAX_RETRIES = 4
+GENERATION_BACKOFF_BASE = 1.0   # seconds; doubles per attempt, with full jitter
+GENERATION_BACKOFF_MAX = 30.0
+
+
+def generation_cache_key(provider: str, model: str, prompt: str) -> str:
+    """SHA-256 of the generation inputs; whitespace-only prompt changes still hit.
+
+    The prompt embeds the profile and the truncated job description, so any
+    change to either produces a new key.
+    """
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{provider}\0{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class TokenBucket:
+    """Thread-safe rate limiter: `rate` acquisitions per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """True for rate limiting (429) and server errors (5xx) from either SDK"""
+    status = getattr(error, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+    delay = random.uniform(0, min(GENERATION_BACKOFF_MAX, GENERATION_BACKOFF_BASE * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
 
 class DocumentGenerator:
     """Generates tailored resumes and cover letters using AI"""
 
-    def __init__(self, profile: ResumeProfile):
+    def __init__(self, profile: ResumeProfile, cache_dir: Optional[str] = None,
+                 cache_ttl: float = GENERATION_CACHE_TTL, rate: Optional[float] = None,
+                 offline: bool = False):
         self.profile = profile
         self.client = None
         self.provider = None
-
-        # Try to initialize AI client
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        # Offline: only cached documents; a miss falls back to the template
+        self.offline = offline
+        self._memo = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # Try to initialize AI client (retries are handled by _complete, not the SDK)
         if OPENAI_AVAILABLE and os.getenv("OPENAI_API_KEY"):
-            self.client = OpenAI()
+            self.client = OpenAI(max_retries=0)
             self.provider = "openai"
             print("Using OpenAI for document generation")
         elif ANTHROPIC_AVAILABLE and os.getenv("ANTHROPIC_API_KEY"):
-            self.client = Anthropic()
+            self.client = Anthropic(max_retries=0)
             self.provider = "anthropic"
             print("Using Anthropic for document generation")
         else:
             print("No AI API key found. Set OPENAI_API_KEY or ANTHROPIC_API_KEY for AI-powered generation")
 
+        self.rate_limiter = TokenBucket(rate or DEFAULT_GENERATION_RATES.get(self.provider, 5.0))
+
     def generate_cover_letter(self, job: JobListing) -> str:
         """Generate a tailored cover letter for a job"""
         if not self.client:
@@ -319,25 +1410,64 @@ Requirements:
 Write the cover letter now:"""
 
         try:
-            if self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=1000,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content
-            elif self.provider == "anthropic":
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-20250514",
-                    max_tokens=1000,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
+            return self._complete(prompt, max_tokens=1000)
         except Exception as e:
             print(f"AI generation failed: {e}")
             return self._generate_template_cover_letter(job)
 
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        """Send a prompt to the configured provider, reusing cached output for identical inputs"""
+        model = GENERATION_MODELS[self.provider]
+        key = generation_cache_key(self.provider, model, prompt)
+        if key in self._memo:
+            return self._memo[key]
+
+        path = os.path.join(self.cache_dir, f"{key}.txt") if self.cache_dir else None
+        if path and os.path.exists(path) and time.time() - os.path.getmtime(path) < self.cache_ttl:
+            with open(path) as f:
+                text = f.read()
+            self._memo[key] = text
+            return text
+        if self.offline:
+            raise OfflineCacheMiss("No cached document for this prompt")
+
+        for attempt in range(GENERATION_MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            try:
+                text = self._request(model, prompt, max_tokens)
+                break
+            except Exception as e:
+                if attempt == GENERATION_MAX_RETRIES or not _is_retryable(e):
+                    raise
+                time.sleep(_retry_delay(e, attempt))
+
+        self._memo[key] = text
+        if path:
+            # Write then rename so a concurrent reader never sees a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return text
+
+    def _request(self, model: str, prompt: str, max_tokens: int) -> str:
+        """One provider round-trip"""
+        if self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                temperature=0.7
+            )
+            return response.choices[0].message.content
+
+        response = self.client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.content[0].text
+
     def _generate_template_cover_letter(self, job: JobListing) -> str:
         """Generate a template-based cover letter"""
         return f"""Dear Hiring Manager,
@@ -394,21 +1524,7 @@ KEY SKILLS:
 """
 
         try:
-            if self.provider == "openai":
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=800,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content
-            elif self.provider == "anthropic":
-                response = self.client.messages.create(
-                    model="claude-sonnet-4-20250514",
-                    max_tokens=800,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
+            return self._complete(prompt, max_tokens=800)
         except Exception as e:
             print(f"AI generation failed: {e}")
             return self._generate_template_resume(job)
@@ -425,17 +1541,255 @@ Tailored for: {job.title} at {job.company}
 """
 
 
-def save_results(jobs: list, output_dir: str = "job_results"):
-    """Save job search results to files"""
+def generate_documents(generator: DocumentGenerator, jobs: list, docs_dir: str,
+                       concurrency: int = DEFAULT_GENERATION_CONCURRENCY) -> list:
+    """Generate a cover letter and tailored resume for each job concurrently.
+
+    Up to `concurrency` documents are generated at once (the generator's rate
+    limiter still applies); each file is written as soon as its document is
+    ready. Returns the paths written, in completion order.
+    """
+    os.makedirs(docs_dir, exist_ok=True)
+    kinds = {
+        "cover_letter": ("cover letter", generator.generate_cover_letter),
+        "resume": ("tailored resume", generator.generate_tailored_resume),
+    }
+
+    written = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="generate") as pool:
+        futures = {
+            pool.submit(generate, job): (i, job, kind)
+            for i, job in enumerate(jobs, 1)
+            for kind, (_, generate) in kinds.items()
+        }
+        for future in as_completed(futures):
+            i, job, kind = futures[future]
+            label = kinds[kind][0]
+            try:
+                content = future.result()
+            except Exception as e:
+                print(f"   [{i}/{len(jobs)}] Failed to generate {label} for {job.title}: {e}")
+                continue
+
+            path = os.path.join(docs_dir, f"{i:02d}_{kind}_{job.company[:20].replace(' ', '_')}.txt")
+            with open(path, "w") as f:
+                f.write(content)
+            written.append(path)
+            print(f"   [{i}/{len(jobs)}] Saved {label} for {job.title} at {job.company} to {path}")
+
+    return written
+
+
+# save_results output formats; each is also the file extension
+OUTPUT_FORMATS = ("json", "ndjson", "ndjson.gz", "ndjson.zst", "parquet")
+
+# Encoded bytes buffered before each write, and rows per Parquet row group
+WRITE_BUFFER_SIZE = 256 * 1024
+PARQUET_ROW_GROUP = 65536
+
+
+def check_output_format(fmt: str):
+    """Raise ValueError if `fmt` is unknown or its optional package isn't installed"""
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r} (choose from {', '.join(OUTPUT_FORMATS)})")
+    if fmt == "ndjson.zst" and not ZSTD_AVAILABLE:
+        raise ValueError("ndjson.zst files need zstandard. Run: pip install zstandard")
+    if fmt == "parquet" and not PYARROW_AVAILABLE:
+        raise ValueError("parquet files need pyarrow. Run: pip install pyarrow")
+
+
+def output_format(path: str) -> str:
+    """Format of a results file, from its extension"""
+    for fmt in sorted(OUTPUT_FORMATS, key=len, reverse=True):
+        if path.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Can't tell the format of {path} (expected one of: {', '.join(OUTPUT_FORMATS)})")
+
+
+def _ndjson_line(row: dict) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+# JobListing fields stored as Parquet strings (match_score is a float64)
+PARQUET_STRING_FIELDS = frozenset(JOB_LISTING_FIELDS) - {"match_score"}
+
+
+def _parquet_schema():
+    return pa.schema([(name, pa.string() if name in PARQUET_STRING_FIELDS else pa.float64())
+                      for name in JOB_LISTING_FIELDS])
+
+
+class JobWriter:
+    """Streams job rows to a results file in one of OUTPUT_FORMATS.
+
+    Rows are encoded as they arrive and written in blocks of WRITE_BUFFER_SIZE
+    bytes (Parquet: one row group per PARQUET_ROW_GROUP rows), so memory doesn't grow
+    with the number of jobs. The file is written under a temporary name and
+    moved into place on close; an exception inside the `with` block discards it.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None):
+        self.path = path
+        self.format = fmt or output_format(path)
+        check_output_format(self.format)
+        self.count = 0
+        self._tmp = f"{path}.{threading.get_ident()}.tmp"
+        self._pending = []
+        self._pending_size = 0
+        self._raw = self._file = self._parquet = self._columns = None
+
+        if self.format == "parquet":
+            self._parquet = pq.ParquetWriter(self._tmp, _parquet_schema())
+            self._columns = {name: [] for name in JOB_LISTING_FIELDS}
+            return
+        self._raw = self._file = open(self._tmp, "wb")
+        if self.format == "ndjson.gz":
+            # Level 6 compresses nearly as well as the default 9 in a fraction of the time
+            self._file = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        elif self.format == "ndjson.zst":
+            self._file = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+
+    def __enter__(self) -> "JobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, row: dict):
+        """Append one row (a job_dict)"""
+        if self._columns is not None:
+            for name in JOB_LISTING_FIELDS:
+                value = row.get(name)
+                # Feeds and older state files can hold numbers where JobListing has strings
+                if value is not None and name in PARQUET_STRING_FIELDS and not isinstance(value, str):
+                    value = str(value)
+                self._columns[name].append(value)
+            if len(self._columns["title"]) >= PARQUET_ROW_GROUP:
+                self._flush_row_group()
+        elif self.format == "json":
+            # Same bytes as json.dump(rows, indent=2)
+            prefix = ",\n  " if self.count else "[\n  "
+            self._buffer((prefix + json.dumps(row, indent=2).replace("\n", "\n  ")).encode("utf-8"))
+        else:
+            self._buffer(_ndjson_line(row))
+        self.count += 1
+
+    def write_jobs(self, jobs):
+        """Append a list of JobListing or a JobBatch, in order"""
+        for row in (jobs.rows() if isinstance(jobs, JobBatch) else map(job_dict, jobs)):
+            self.write(row)
+
+    def close(self):
+        if self._parquet is not None:
+            self._flush_row_group()
+            self._parquet.close()
+        else:
+            if self.format == "json":
+                self._buffer(b"\n]" if self.count else b"[]")
+            self._flush()
+            self._close_files()
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Close and delete the partial file"""
+        try:
+            if self._parquet is not None:
+                self._parquet.close()
+            else:
+                self._close_files()
+        finally:
+            if os.path.exists(self._tmp):
+                os.remove(self._tmp)
+
+    def _buffer(self, data: bytes):
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if self._pending_size >= WRITE_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._file.write(b"".join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def _flush_row_group(self):
+        if self._columns["title"]:
+            self._parquet.write_table(pa.Table.from_pydict(self._columns, schema=_parquet_schema()))
+            self._columns = {name: [] for name in JOB_LISTING_FIELDS}
+
+    def _close_files(self):
+        if self._file is not self._raw:
+            self._file.close()
+        self._raw.close()
+
+
+def load_results(path: str) -> JobBatch:
+    """Read a results file written by save_results (format from its extension) into a JobBatch.
+
+    NDJSON files are memory-mapped and parsed a line at a time, compressed ones
+    decompressed as a stream from the mapping, and Parquet is read column-wise
+    through pyarrow's memory map, so nothing but the batch itself is held in
+    memory. The legacy JSON array is parsed whole.
+    """
+    fmt = output_format(path)
+    check_output_format(fmt)
+    batch = JobBatch()
+
+    if fmt == "parquet":
+        table = pq.read_table(path, memory_map=True)
+        for name in JOB_LISTING_FIELDS:
+            if name not in table.column_names:
+                setattr(batch, name, [None] * table.num_rows)
+                continue
+            column = table.column(name).to_pylist()
+            if name in JobBatch.INTERNED:
+                column = [sys.intern(value) if isinstance(value, str) else value for value in column]
+            setattr(batch, name, column)
+        return batch
+
+    if fmt == "json":
+        with open(path) as f:
+            for row in json.load(f):
+                batch.add(**row)
+        return batch
+
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return batch
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if fmt == "ndjson":
+                lines = iter(mapped.readline, b"")
+            elif fmt == "ndjson.gz":
+                lines = gzip.GzipFile(fileobj=mapped, mode="rb")
+            else:
+                lines = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(mapped))
+            for line in lines:
+                if line.strip():
+                    batch.add(**loads(line))
+    return batch
+
+
+def save_results(jobs, output_dir: str = "job_results", fmt: str = "json"):
+    """Save job search results (a list of JobListing or a JobBatch) to files.
+
+    The full results are streamed to jobs_<timestamp>.<fmt> (see JobWriter),
+    and the top 20 are also written as readable text.
+    """
     os.makedirs(output_dir, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Save as JSON
-    json_file = os.path.join(output_dir, f"jobs_{timestamp}.json")
-    with open(json_file, "w") as f:
-        json.dump([asdict(job) for job in jobs], f, indent=2)
-    print(f"Saved {len(jobs)} jobs to {json_file}")
+    data_file = os.path.join(output_dir, f"jobs_{timestamp}.{fmt}")
+    with JobWriter(data_file, fmt) as writer:
+        writer.write_jobs(jobs)
+    print(f"Saved {writer.count} jobs to {data_file}")
 
     # Save as readable text
     txt_file = os.path.join(output_dir, f"jobs_{timestamp}.txt")
@@ -443,8 +1797,9 @@ def save_results(jobs: list, output_dir: str = "job_results"):
         f.write(f"Job Search Results - {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
         f.write("=" * 80 + "\n\n")
 
-        for i, job in enumerate(jobs[:20], 1):
-            f.write(f"{i}. {job.title}\n")
+        for i in range(min(20, len(jobs))):
+            job = jobs[i]
+            f.write(f"{i + 1}. {job.title}\n")
             f.write(f"   Company: {job.company}\n")
             f.write(f"   Location: {job.location}\n")
             f.write(f"   Match Score: {job.match_score}%\n")
@@ -454,7 +1809,18 @@ def save_results(jobs: list, output_dir: str = "job_results"):
             f.write("-" * 80 + "\n")
 
     print(f"Saved readable results to {txt_file}")
-    return json_file, txt_file
+    return data_file, txt_file
+
+
+def worker_count(value: str) -> int:
+    """argparse type for --workers: a non-negative integer, 0 meaning one per CPU"""
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid worker count: {value!r}")
+    if workers < 0:
+        raise argparse.ArgumentTypeError(f"worker count must be 0 (one per CPU) or more, got {workers}")
+    return workers
 
 
 def main():
@@ -469,8 +1835,44 @@ def main():
                        help="Number of top jobs to generate documents for")
     parser.add_argument("--output", "-o", default="job_results",
                        help="Output directory")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                       help="Overall time budget in seconds for fetching all sources")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_ADZUNA_MAX_PAGES,
+                       help="Maximum number of Adzuna result pages to fetch")
+    parser.add_argument("--workers", "-w", type=worker_count, default=1,
+                       help="Worker processes for match scoring (0 = one per CPU)")
+    parser.add_argument("--cache-dir", default=None,
+                       help="Cache for generated documents (default: <output>/.generation_cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always call the AI provider instead of reusing cached documents")
+    parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_GENERATION_CONCURRENCY,
+                       help="Documents to generate at once in --generate mode")
+    parser.add_argument("--rate", type=float, default=None,
+                       help="Maximum AI requests per second (default depends on provider)")
+    parser.add_argument("--http-cache-dir", default=None,
+                       help="Cache for raw source responses (default: <output>/.http_cache)")
+    parser.add_argument("--http-cache-size", type=int, default=DEFAULT_HTTP_CACHE_SIZE // (1024 * 1024),
+                       help="Maximum size of the response cache in MB")
+    parser.add_argument("--http-cache", action="store_true",
+                       help="Cache raw source responses on disk and reuse them while fresh")
+    parser.add_argument("--offline", action="store_true",
+                       help="Replay cached source responses only; never touch the network")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Send conditional requests and only re-score new or changed jobs")
+    parser.add_argument("--state-file", default=None,
+                       help=f"Incremental ingestion state (default: <output>/{INGEST_STATE_FILE})")
+    parser.add_argument("--format", "-f", default="json", choices=OUTPUT_FORMATS,
+                       help="Format of the saved results (the top 20 are also saved as text)")
+    parser.add_argument("--load", default=None, metavar="FILE",
+                       help="Re-rank a saved results file instead of searching")
 
     args = parser.parse_args()
+    try:
+        check_output_format(args.format)
+        if args.load:
+            check_output_format(output_format(args.load))
+    except ValueError as e:
+        parser.error(str(e))
 
     print(f"\n{'='*60}")
     print("Job Search Automation Tool")
@@ -478,23 +1880,84 @@ def main():
 
     # Initialize components
     profile = ResumeProfile()
-    searcher = JobSearcher()
     matcher = JobMatcher(profile)
 
-    # Search for jobs
-    print(f"Searching for jobs with keywords: {args.keywords}")
-    print(f"Looking back {args.days} days...\n")
-
-    searcher.search_remotive(args.keywords)
-    searcher.search_github_jobs_api(args.keywords)
-    searcher.search_adzuna(args.keywords, days=args.days)
-
-    if not searcher.jobs:
-        print("No jobs found. Try different keywords or check API credentials.")
-        return
-
-    # Rank jobs by match score
-    ranked_jobs = matcher.rank_jobs(searcher.jobs)
+    if args.load:
+        # Re-rank earlier results (e.g. after editing the profile) without fetching
+        print(f"Loading saved jobs from {args.load}")
+        ranked_jobs = matcher.rank_batch(load_results(args.load))
+    else:
+        state = None
+        if args.incremental:
+            state = IngestState(args.state_file or os.path.join(args.output, INGEST_STATE_FILE), profile)
+        cache = None
+        # Off by default: a plain run always sees the sources' current listings
+        if args.offline or args.http_cache:
+            cache = HTTPCache(args.http_cache_dir or os.path.join(args.output, ".http_cache"),
+                              max_bytes=args.http_cache_size * 1024 * 1024, offline=args.offline)
+        # With one worker, each Adzuna page and feed is deduped and scored as it arrives,
+        # while the remaining pages and sources download; --workers scores everything afterwards
+        deduper = JobDeduper()
+        scoring_lock = threading.Lock()
+        counts = {"fetched": 0, "scored": 0}
+        # ids of the jobs scored this run (the rest of the kept jobs reuse a stored score)
+        scored_ids = set()
+        # The searcher doesn't keep jobs handed to score_arrivals; incremental runs keep
+        # them here (duplicates included) for the ingest state
+        fetched_jobs = []
+
+        def score_arrivals(jobs: list):
+            with scoring_lock:
+                counts["fetched"] += len(jobs)
+                if state is not None:
+                    fetched_jobs.extend(jobs)
+                # Cross-source duplicates are dropped before they are diffed or scored
+                kept = deduper.add(jobs)
+                # Incremental runs only score jobs that are new or changed since the last run
+                to_score = state.diff(kept) if state is not None else kept
+                matcher.score_jobs(to_score)
+                counts["scored"] += len(to_score)
+                scored_ids.update(map(id, to_score))
+
+        searcher = JobSearcher(state=state, cache=cache,
+                               on_jobs=score_arrivals if args.workers == 1 else None)
+
+        # Search for jobs
+        print(f"Searching for jobs with keywords: {args.keywords}")
+        print(f"Looking back {args.days} days...\n")
+
+        searcher.search_all(args.keywords, days=args.days, deadline=args.deadline, max_pages=args.max_pages)
+        searcher.close()
+
+        if args.workers != 1:
+            fetched_jobs = searcher.jobs
+            counts["fetched"] = len(fetched_jobs)
+        if not counts["fetched"]:
+            print("No jobs found. Try different keywords or check API credentials.")
+            return
+
+        if args.workers == 1:
+            jobs = deduper.jobs
+        else:
+            # The same posting from several sources is scored, saved and generated for once
+            jobs = dedupe_jobs(fetched_jobs)
+            to_score = state.diff(jobs) if state is not None else jobs
+            counts["scored"] = len(to_score)
+            scored_ids.update(map(id, to_score))
+            matcher.score_jobs_parallel(to_score, workers=args.workers or None)
+        if len(jobs) < counts["fetched"]:
+            print(f"Collapsed {counts['fetched'] - len(jobs)} cross-source duplicates")
+        if state is not None:
+            unchanged = sum(id(job) not in scored_ids for job in jobs)
+            print(f"{counts['scored']} new or changed jobs scored, {unchanged} unchanged")
+
+        # Rank jobs by match score (ties keep fetch order, as in rank_jobs)
+        ranked_jobs = sorted(jobs, key=lambda x: x.match_score or 0, reverse=True)
+
+        if state is not None:
+            # Duplicates too (unscored), so Adzuna's stored catalog stays complete
+            state.record(fetched_jobs, searcher.completed)
+            state.save()
 
     print(f"\nFound {len(ranked_jobs)} total jobs")
     print(f"\nTop {min(10, len(ranked_jobs))} matches:")
@@ -507,32 +1970,16 @@ def main():
         print()
 
     # Save results
-    save_results(ranked_jobs, args.output)
+    save_results(ranked_jobs, args.output, args.format)
 
     # Generate documents for top matches
     if args.generate:
         print(f"\nGenerating documents for top {args.top} matches...")
-        generator = DocumentGenerator(profile)
+        cache_dir = None if args.no_cache else (args.cache_dir or os.path.join(args.output, ".generation_cache"))
+        generator = DocumentGenerator(profile, cache_dir=cache_dir, rate=args.rate, offline=args.offline)
 
         docs_dir = os.path.join(args.output, "applications")
-        os.makedirs(docs_dir, exist_ok=True)
-
-        for i, job in enumerate(ranked_jobs[:args.top], 1):
-            print(f"\n[{i}/{args.top}] Generating for: {job.title} at {job.company}")
-
-            # Generate cover letter
-            cover_letter = generator.generate_cover_letter(job)
-            cl_file = os.path.join(docs_dir, f"{i:02d}_cover_letter_{job.company[:20].replace(' ', '_')}.txt")
-            with open(cl_file, "w") as f:
-                f.write(cover_letter)
-            print(f"   Saved cover letter to {cl_file}")
-
-            # Generate tailored resume section
-            resume = generator.generate_tailored_resume(job)
-            resume_file = os.path.join(docs_dir, f"{i:02d}_resume_{job.company[:20].replace(' ', '_')}.txt")
-            with open(resume_file, "w") as f:
-                f.write(resume)
-            print(f"   Saved tailored resume to {resume_file}")
+        generate_documents(generator, ranked_jobs[:args.top], docs_dir, concurrency=args.concurrency)
 
     print(f"\n{'='*60}")
     print("Done! Check the output directory for results.")
@@ -0,0 +1,7 @@
+"""
+The CLI is a script, not a package: make `import job_automation` work as it does from tools/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,123 @@
+"""
+CLI fetching, dedup, scoring and result files, against local stub servers
+"""
+import argparse
+import glob
+import threading
+import time
+
+import pytest
+
+import job_automation
+from benchmark import FakeAdzunaServer, StubServer, _stub_payloads, synthetic_jobs
+from job_automation import (
+    ADZUNA_PAGE_SIZE, JobDeduper, JobListing, JobMatcher, JobSearcher, KeywordMatcher, ResumeProfile,
+    dedupe_jobs, job_dict, load_results, save_results, worker_count
+)
+
+
+def _job(**overrides):
+    fields = dict(title="Platform Engineer", company="Acme", location="Remote", description="Kubernetes",
+                  url="https://example.com/1", posted_date="2026-10-01T00:00:00Z", source="Adzuna",
+                  match_score=42.5)
+    fields.update(overrides)
+    return JobListing(**fields)
+
+
+def test_parquet_round_trip_with_numeric_salary(tmp_path):
+    pytest.importorskip("pyarrow")
+    # A state file from before salaries were normalized to strings
+    jobs = [_job(salary=120000.0), _job(url="https://example.com/2", salary=None)]
+
+    save_results(jobs, str(tmp_path), "parquet")
+
+    (path,) = glob.glob(str(tmp_path / "jobs_*.parquet"))
+    loaded = [job_dict(job) for job in load_results(path)]
+    assert [row["salary"] for row in loaded] == ["120000.0", None]
+    assert [row["url"] for row in loaded] == ["https://example.com/1", "https://example.com/2"]
+    assert loaded[0]["match_score"] == 42.5
+
+
+def test_dedupe_jobs_merges_across_sources_only():
+    jobs = [_job(source="Adzuna", description="short"),
+            _job(source="Remotive", url="https://example.com/2", description="a longer description"),
+            _job(source="Remotive", url="https://example.com/3", description="another team's opening")]
+
+    assert [job.url for job in dedupe_jobs(jobs)] == ["https://example.com/2", "https://example.com/3"]
+
+
+def test_job_deduper_keeps_longest_copy_of_arriving_pages():
+    deduper = JobDeduper()
+    first = _job(source="Remotive", description="short")
+    longer = _job(source="Adzuna", url="https://example.com/2", description="a longer description")
+    shorter = _job(source="Arbeitnow", url="https://example.com/3", description="tiny")
+
+    assert deduper.add([first]) == [first]
+    assert deduper.add([longer, shorter]) == [longer]
+    assert deduper.jobs == [longer]
+
+
+def test_adzuna_pages_go_to_on_jobs_without_being_kept(monkeypatch):
+    monkeypatch.setenv("ADZUNA_APP_ID", "test")
+    monkeypatch.setenv("ADZUNA_APP_KEY", "test")
+    delivered = []
+    with FakeAdzunaServer(pages=3) as server:
+        searcher = JobSearcher(endpoints={"Adzuna": server.url}, on_jobs=delivered.append)
+        try:
+            searcher.search_adzuna("cloud", days=1, max_pages=3)
+        finally:
+            searcher.close()
+
+    assert [len(page) for page in delivered] == [ADZUNA_PAGE_SIZE] * 3
+    assert searcher.jobs == []
+
+
+def test_search_all_drops_sources_past_the_deadline(monkeypatch):
+    monkeypatch.setenv("ADZUNA_APP_ID", "test")
+    monkeypatch.setenv("ADZUNA_APP_KEY", "test")
+    delivered = []
+    latency = {"/remotive": 1.0, "/arbeitnow": 0, "/adzuna": 0}
+    with StubServer(_stub_payloads(5), latency) as server:
+        endpoints = {source: f"{server.url}/{source.lower()}" for source in ("Remotive", "Arbeitnow", "Adzuna")}
+        searcher = JobSearcher(endpoints=endpoints, on_jobs=lambda jobs: delivered.append(jobs[0].source))
+        started = time.monotonic()
+        searcher.search_all("platform", max_pages=1, deadline=0.3)
+        searcher.close()
+        assert time.monotonic() - started < 0.9
+        assert searcher.completed == {"Arbeitnow", "Adzuna"}
+
+        # The abandoned fetch finishes in the background without delivering anything
+        remotive = next(t for t in threading.enumerate() if t.name == "job-source-Remotive")
+        assert remotive.daemon
+        remotive.join(timeout=5)
+    assert sorted(delivered) == ["Adzuna", "Arbeitnow"]
+
+
+def test_score_jobs_parallel_matches_score_jobs():
+    matcher = JobMatcher(ResumeProfile())
+    jobs = synthetic_jobs(50, words=40)
+    expected = [_job(title=job.title, description=job.description) for job in jobs]
+    matcher.score_jobs(expected)
+
+    matcher.score_jobs_parallel(jobs, workers=2, chunk_size=8)
+
+    assert [job.match_score for job in jobs] == [job.match_score for job in expected]
+
+
+@pytest.mark.parametrize("value", ["-1", "two"])
+def test_worker_count_rejects_invalid_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        worker_count(value)
+
+
+def test_keyword_matcher_automaton_matches_substring_search(monkeypatch):
+    pytest.importorskip("ahocorasick")
+    keywords = ["aws", "kubernetes", "net", "go", "terraform"]
+    texts = ["kubernetes on aws", "dotnet and golang", "", "terraform terraform"]
+    monkeypatch.setattr(job_automation, "AHOCORASICK_MIN_KEYWORDS", len(keywords))
+    compiled = KeywordMatcher(keywords)
+    monkeypatch.setattr(job_automation, "AHOCORASICK_MIN_KEYWORDS", len(keywords) + 1)
+    scanned = KeywordMatcher(keywords)
+
+    assert compiled._automaton is not None and scanned._automaton is None
+    assert [compiled.mask(text) for text in texts] == [scanned.mask(text) for text in texts]